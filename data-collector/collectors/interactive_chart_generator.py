@@ -10,9 +10,16 @@ from __future__ import annotations
 
 import json
 import os
+import sys
 from datetime import datetime
 from typing import TYPE_CHECKING
 
+# 日足ストア（shared/price_store.py）をインポートするためのパス追加
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "shared"))
+from price_store import PriceStore  # noqa: E402
+
+from config.settings import PRICE_STORE_PATH  # noqa: E402
+
 if TYPE_CHECKING:
     from .sheets_writer import SheetsDataWriter
 
@@ -20,8 +27,20 @@ if TYPE_CHECKING:
 class InteractiveChartGenerator:
     """インタラクティブHTMLチャート生成クラス"""
 
-    def __init__(self, sheets_writer: SheetsDataWriter) -> None:
+    def __init__(
+        self,
+        sheets_writer: SheetsDataWriter,
+        price_store: PriceStore | None = None,
+    ) -> None:
         self.sheets_writer = sheets_writer
+        self._price_store = price_store
+
+    @property
+    def price_store(self) -> PriceStore:
+        """日足ストア（初回参照時に PRICE_STORE_PATH を開く）"""
+        if self._price_store is None:
+            self._price_store = PriceStore(PRICE_STORE_PATH)
+        return self._price_store
 
     def generate(
         self,
@@ -184,13 +203,9 @@ class InteractiveChartGenerator:
             end_date = datetime(year + 1, 1, 1)
         else:
             end_date = datetime(year, month + 1, 1)
-        # yfinanceのendは排他的なので翌日にする
         month_last = end_date - timedelta(days=1)
-        end_date_yf = end_date + timedelta(days=1)
 
         try:
-            import yfinance as yf
-
             portfolio_sheet = (
                 self.sheets_writer.spreadsheet.worksheet(
                     "ポートフォリオ"
@@ -223,22 +238,14 @@ class InteractiveChartGenerator:
                     pdt = datetime.strptime(
                         purchase_date, "%Y-%m-%d"
                     )
-                    ticker = yf.Ticker(symbol)
-                    hist = ticker.history(
-                        start=pdt, end=end_date_yf
+                    # 日足ストア経由で取得（取得済みの日は通信しない）。
+                    # 従来の Ticker.history と同じ調整後の値を使う
+                    hist = self.price_store.history(
+                        symbol, pdt, month_last, adjusted=True
                     )
                     if hist.empty:
                         continue
 
-                    # 月末日以降のデータを除外
-                    cutoff = month_last.strftime("%Y-%m-%d")
-                    hist = hist[
-                        hist.index.strftime("%Y-%m-%d")
-                        <= cutoff
-                    ]
-                    if hist.empty:
-                        continue
-
                     dates = [
                         d.strftime("%Y-%m-%d") for d in hist.index
                     ]
@@ -268,10 +275,8 @@ class InteractiveChartGenerator:
                         fx_pair = f"{currency}JPY=X"
                         if fx_pair not in fx_cache:
                             try:
-                                fx = yf.Ticker(fx_pair)
-                                fx_hist = fx.history(
-                                    start=pdt,
-                                    end=end_date_yf,
+                                fx_hist = self.price_store.history(
+                                    fx_pair, pdt, month_last, adjusted=True
                                 )
                                 fx_cache[fx_pair] = fx_hist
                             except Exception:
@@ -330,8 +335,6 @@ class InteractiveChartGenerator:
                 except Exception as e:
                     print(f"  ⚠️ {name}の日次データ取得失敗: {e}")
 
-        except ImportError:
-            print("⚠️ yfinance未インストール")
         except Exception as e:
             print(f"⚠️ 日次データ取得エラー: {e}")
 
@@ -13,6 +13,12 @@ GOOGLE_APPLICATION_CREDENTIALS = os.getenv(
 )
 SPREADSHEET_ID = os.getenv('SPREADSHEET_ID', '')
 
+# 日足のローカルストア（yfinance の取得済み期間を再取得しない）
+PRICE_STORE_PATH = os.getenv(
+    "PRICE_STORE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "price_store.db"),
+)
+
 # デフォルト銘柄設定（外貨情報付き）
 # purchase_price: 円建て取得単価（= purchase_price_foreign × purchase_exchange_rate）
 # purchase_price_foreign: 外貨建て取得単価（日本株は円そのまま）
@@ -5,8 +5,6 @@ from __future__ import annotations
 from collections import defaultdict
 from datetime import datetime
 
-import yfinance as yf
-
 from .db_writer import DbWriter
 from .purchase_math import time_weighted_returns
 
@@ -47,16 +45,18 @@ class BenchmarkCollector:
         nikkei_returns = self._fetch_index_returns("^N225", dates)
         sp500_returns = self._fetch_index_returns("^GSPC", dates)
 
-        # benchmark_data に保存
-        for d in dates:
-            self.db.save_benchmark(
+        # benchmark_data に保存（全月を 1 トランザクションで）
+        self.db.save_benchmarks(
+            [
                 {
                     "date": d,
                     "portfolio": portfolio_returns.get(d, 0.0),
                     "nikkei225": nikkei_returns.get(d),
                     "sp500": sp500_returns.get(d),
                 }
-            )
+                for d in dates
+            ]
+        )
 
         print(f"  ベンチマークデータ {len(dates)} 件保存しました")
 
@@ -64,6 +64,8 @@ class BenchmarkCollector:
         self, symbol: str, dates: list[str]
     ) -> dict[str, float | None]:
         """指数の累積リターンを取得（初月基準）"""
+        import yfinance as yf
+
         try:
             # 日付範囲を YYYY-MM-末 形式から推定
             # 最初の月の開始〜最後の月の終了
@@ -1,4 +1,4 @@
-"""yfinance + matplotlib による株価折れ線チャート生成モジュール。
+"""日足ストア（yfinance）+ matplotlib による株価折れ線チャート生成モジュール。
 
 取得日から報告月末までの終値推移を折れ線で描画する。
 ヘッドレス環境（GCE 等）での実行を前提に Agg バックエンドを使用する。
@@ -7,7 +7,7 @@
 from __future__ import annotations
 
 import os
-from datetime import datetime, timedelta
+from datetime import datetime
 
 import matplotlib
 
@@ -16,9 +16,10 @@ matplotlib.use("Agg")
 
 import matplotlib.dates as mdates  # noqa: E402
 import matplotlib.pyplot as plt  # noqa: E402
-import yfinance as yf  # noqa: E402
 from matplotlib.ticker import FuncFormatter  # noqa: E402
 
+from .price_history import get_price_store  # noqa: E402
+
 # 日本語フォントの候補（システムに存在するものを順に試す）
 _JP_FONT_CANDIDATES = [
     "Hiragino Sans",  # macOS
@@ -77,31 +78,16 @@ class ChartGenerator:
             保存先の絶対パス
 
         Raises:
-            RuntimeError: yfinance からデータが取得できなかった場合
+            RuntimeError: 株価データが取得できなかった場合
         """
-        # yfinance の end は排他なので +1 日する
-        fetch_end = (
-            datetime.strptime(end_date, "%Y-%m-%d") + timedelta(days=1)
-        ).strftime("%Y-%m-%d")
-
-        df = yf.download(
-            symbol,
-            start=start_date,
-            end=fetch_end,
-            progress=False,
-            auto_adjust=False,
-        )
-        if df is None or df.empty:
+        # 日足ストア経由で取得（取得済みの日は通信しない）
+        df = get_price_store().history(symbol, start_date, end_date)
+        if df.empty:
             raise RuntimeError(
                 f"株価データが取得できませんでした: "
                 f"{symbol} {start_date}〜{end_date}"
             )
-
-        # Close 列を取得（yfinance の MultiIndex 対応）
-        if isinstance(df.columns, type(df.columns)) and ("Close", symbol) in df.columns:
-            close = df[("Close", symbol)]
-        else:
-            close = df["Close"]
+        close = df["Close"]
 
         os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
 
@@ -1,7 +1,14 @@
-from datetime import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date as Date
+from datetime import datetime, timedelta
 
 import requests
-import yfinance as yf
+
+from config.settings import BACKFILL_WORKERS
+
+from .fx_rate_store import LOOKBACK_DAYS, FxRateStore, get_fx_rate_store
+from .rate_limit import get_rate_limiter
 
 # ECB参照レート（frankfurter API）のタイムアウト秒数
 FRANKFURTER_TIMEOUT_SECONDS = 30
@@ -10,8 +17,14 @@ FRANKFURTER_TIMEOUT_SECONDS = 30
 class CurrencyConverter:
     """為替レート取得・通貨換算クラス"""
 
-    def __init__(self) -> None:
-        """初期化"""
+    def __init__(self, rate_store: FxRateStore | None = None) -> None:
+        """初期化
+
+        Args:
+            rate_store (FxRateStore, optional): ECB参照レートのキャッシュ
+                （未指定時はプロセス共有のストアを最初の利用時に開く）
+        """
+        self._rate_store = rate_store
         # 対応通貨ペア
         self.supported_pairs = {
             "USD": "USDJPY=X",
@@ -22,6 +35,15 @@ class CurrencyConverter:
             "HKD": "HKDJPY=X",
             "SGD": "SGDJPY=X",
         }
+        # (通貨, 日付) → ECB参照レート。prefetch_rates で先読みした値もここに入る
+        self._rate_cache: dict[tuple[str, str], float] = {}
+        self._cache_lock = threading.Lock()
+
+    @property
+    def rate_store(self) -> FxRateStore:
+        if self._rate_store is None:
+            self._rate_store = get_fx_rate_store()
+        return self._rate_store
 
     def get_exchange_rate(
         self, currency: str, date: datetime | None = None
@@ -46,20 +68,29 @@ class CurrencyConverter:
 
             if date:
                 # 特定日はECB参照レート（frankfurter API）を使う。
-                # 非営業日は frankfurter 側で直前営業日の値に自動フォールバックする
-                date_str = date.strftime("%Y-%m-%d")
-                url = f"https://api.frankfurter.dev/v1/{date_str}"
-                response = requests.get(
-                    url,
-                    params={"base": currency, "symbols": "JPY"},
-                    timeout=FRANKFURTER_TIMEOUT_SECONDS,
-                )
-                response.raise_for_status()
-                payload = response.json()
-                rate = payload["rates"]["JPY"]
-                return float(rate)
+                # 非営業日は直前営業日の値を使う（frankfurter と同じ扱い）
+                on = date.date() if isinstance(date, datetime) else date
+                key = (currency, on.isoformat())
+                with self._cache_lock:
+                    cached = self._rate_cache.get(key)
+                if cached is not None:
+                    return cached
+                rate = self.rate_store.rate_on(currency, on)
+                if rate is None:
+                    self.fetch_rate_range(currency, on, on)
+                    # 当日など確定前の日付は取得済み期間に入らないため直近の値を使う
+                    rate = self.rate_store.rate_on(currency, on, require_coverage=False)
+                if rate is None:
+                    print(f"⚠️ {currency}/JPY の {on} のレートが取得できませんでした")
+                    return None
+                with self._cache_lock:
+                    self._rate_cache[key] = rate
+                return rate
 
             # 日付未指定は最新レート取得（ダッシュボードのライブ表示用）
+            import yfinance as yf
+
+            get_rate_limiter("yfinance").acquire()
             pair = self.supported_pairs[currency]
             ticker = yf.Ticker(pair)
             data = ticker.history(period="1d")
@@ -75,6 +106,75 @@ class CurrencyConverter:
             print(f"為替レート取得エラー ({currency}): {e}")
             return None
 
+    def _fetch_ecb_range(
+        self, currency: str, start: Date, end: Date
+    ) -> dict[str, float]:
+        """frankfurter API の時系列エンドポイントで start〜end の対円レートを取得
+
+        Returns:
+            dict: 日付（YYYY-MM-DD）→ レート（営業日のみ）
+        """
+        get_rate_limiter("frankfurter").acquire()
+        response = requests.get(
+            f"https://api.frankfurter.dev/v1/{start.isoformat()}..{end.isoformat()}",
+            params={"base": currency, "symbols": "JPY"},
+            timeout=FRANKFURTER_TIMEOUT_SECONDS,
+        )
+        response.raise_for_status()
+        payload = response.json()
+        return {d: float(r["JPY"]) for d, r in payload.get("rates", {}).items()}
+
+    def fetch_rate_range(self, currency: str, start: Date, end: Date) -> None:
+        """start〜end のうち未取得の期間を通貨ごとに 1 リクエストで取り足す
+
+        期間の先頭が休日でも直前営業日の値を持てるよう、LOOKBACK_DAYS 日遡って取得する。
+        """
+        for span_start, span_end in self.rate_store.missing(currency, start, end):
+            try:
+                rates = self._fetch_ecb_range(
+                    currency, span_start - timedelta(days=LOOKBACK_DAYS), span_end
+                )
+            except Exception as e:
+                print(
+                    f"為替レート取得エラー ({currency} {span_start}〜{span_end}): {e}"
+                )
+                continue
+            if rates:
+                self.rate_store.save(currency, rates, span_start, span_end)
+
+    def prefetch_rates(
+        self,
+        currencies: list[str],
+        dates: list[datetime],
+        workers: int = BACKFILL_WORKERS,
+    ) -> int:
+        """通貨ごとに dates 全体の ECB 参照レートを並列に取得してキャッシュする
+
+        期間範囲収集で月ごとの処理より先に呼ぶ。1 通貨につき時系列エンドポイントへの
+        1 リクエストで最初の日付から最後の日付までを取得し、ローカルストアに保存する。
+        呼び出し間隔は rate_limit の共有リミッターで抑えるため、workers を増やしても
+        frankfurter の上限は超えない。
+
+        Args:
+            currencies (list[str]): 通貨コードのリスト（JPY・未対応通貨は無視）
+            dates (list[datetime]): 取得日付のリスト
+            workers (int): 並列に取得するスレッド数
+
+        Returns:
+            int: 取得できた（キャッシュ済みを含む）通貨 × 日付のレートの件数
+        """
+        currencies = [c for c in dict.fromkeys(currencies) if c in self.supported_pairs]
+        if not currencies or not dates:
+            return 0
+        start, end = min(dates).date(), max(dates).date()
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            list(pool.map(lambda c: self.fetch_rate_range(c, start, end), currencies))
+        return sum(
+            self.get_exchange_rate(currency, d) is not None
+            for currency in currencies
+            for d in dates
+        )
+
     def convert_to_jpy(
         self, amount: float, currency: str, date: datetime | None = None
     ) -> float | None:
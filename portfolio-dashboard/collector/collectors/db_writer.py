@@ -1,6 +1,8 @@
 """SQLite データ書き込みモジュール"""
 
 import sqlite3
+from collections.abc import Generator
+from contextlib import contextmanager
 
 
 class DbWriter:
@@ -9,89 +11,144 @@ class DbWriter:
     def __init__(self, db_path: str) -> None:
         self.conn = sqlite3.connect(db_path)
         self.conn.execute("PRAGMA journal_mode=WAL")
+        # transaction() の入れ子の深さ（0 のときだけ commit する）
+        self._depth = 0
 
     def close(self) -> None:
         self.conn.close()
 
+    @contextmanager
+    def transaction(self) -> Generator[None]:
+        """ブロック内の書き込みを 1 トランザクションにまとめる。
+
+        ブロックを抜けるときに 1 回だけ commit し、例外時は rollback する。
+        入れ子にした場合は一番外側のブロックだけが commit / rollback する。
+        save_* / update_* はブロック内では個別に commit しない。
+        """
+        self._depth += 1
+        try:
+            yield
+        except BaseException:
+            if self._depth == 1:
+                self.conn.rollback()
+            raise
+        else:
+            if self._depth == 1:
+                self.conn.commit()
+        finally:
+            self._depth -= 1
+
+    def _commit(self) -> None:
+        """transaction() の外なら commit する"""
+        if self._depth == 0:
+            self.conn.commit()
+
     def save_monthly_price(self, data: dict) -> None:
         """月次市場データを保存（UPSERT）"""
-        self.conn.execute(
-            """
-            INSERT INTO monthly_prices (
-                date, code, price_jpy, high, low, average,
-                change_rate, avg_volume, created_at)
-            VALUES (
-                :date, :code, :price_jpy, :high, :low, :average,
-                :change_rate, :avg_volume, :created_at)
-            ON CONFLICT(date, code) DO UPDATE SET
-                price_jpy=excluded.price_jpy, high=excluded.high, low=excluded.low,
-                average=excluded.average, change_rate=excluded.change_rate,
-                avg_volume=excluded.avg_volume, created_at=excluded.created_at
-        """,
-            data,
-        )
-        self.conn.commit()
+        self.save_monthly_prices([data])
+
+    def save_monthly_prices(self, rows: list[dict]) -> None:
+        """月次市場データを 1 トランザクションでまとめて保存（UPSERT）"""
+        if not rows:
+            return
+        with self.transaction():
+            self.conn.executemany(
+                """
+                INSERT INTO monthly_prices (
+                    date, code, price_jpy, high, low, average,
+                    change_rate, avg_volume, created_at)
+                VALUES (
+                    :date, :code, :price_jpy, :high, :low, :average,
+                    :change_rate, :avg_volume, :created_at)
+                ON CONFLICT(date, code) DO UPDATE SET
+                    price_jpy=excluded.price_jpy, high=excluded.high, low=excluded.low,
+                    average=excluded.average, change_rate=excluded.change_rate,
+                    avg_volume=excluded.avg_volume, created_at=excluded.created_at
+            """,
+                rows,
+            )
 
     def save_monthly_pnl(self, data: dict) -> None:
         """月次損益を保存（UPSERT）"""
-        self.conn.execute(
-            """
-            INSERT INTO monthly_pnl (date, code, name, acquired_price, current_price,
-                shares, cost, value, profit, profit_rate, currency,
-                acquired_price_foreign, current_price_foreign,
-                acquired_exchange_rate, current_exchange_rate, updated_at)
-            VALUES (:date, :code, :name, :acquired_price, :current_price,
-                :shares, :cost, :value, :profit, :profit_rate, :currency,
-                :acquired_price_foreign, :current_price_foreign,
-                :acquired_exchange_rate, :current_exchange_rate, :updated_at)
-            ON CONFLICT(date, code) DO UPDATE SET
-                name=excluded.name, current_price=excluded.current_price,
-                value=excluded.value, profit=excluded.profit,
-                profit_rate=excluded.profit_rate,
-                current_price_foreign=excluded.current_price_foreign,
-                current_exchange_rate=excluded.current_exchange_rate,
-                updated_at=excluded.updated_at
-        """,
-            data,
-        )
-        self.conn.commit()
+        self.save_monthly_pnls([data])
+
+    def save_monthly_pnls(self, rows: list[dict]) -> None:
+        """月次損益を 1 トランザクションでまとめて保存（UPSERT）"""
+        if not rows:
+            return
+        with self.transaction():
+            self.conn.executemany(
+                """
+                INSERT INTO monthly_pnl (
+                    date, code, name, acquired_price, current_price,
+                    shares, cost, value, profit, profit_rate, currency,
+                    acquired_price_foreign, current_price_foreign,
+                    acquired_exchange_rate, current_exchange_rate, updated_at)
+                VALUES (
+                    :date, :code, :name, :acquired_price, :current_price,
+                    :shares, :cost, :value, :profit, :profit_rate, :currency,
+                    :acquired_price_foreign, :current_price_foreign,
+                    :acquired_exchange_rate, :current_exchange_rate, :updated_at)
+                ON CONFLICT(date, code) DO UPDATE SET
+                    name=excluded.name, current_price=excluded.current_price,
+                    value=excluded.value, profit=excluded.profit,
+                    profit_rate=excluded.profit_rate,
+                    current_price_foreign=excluded.current_price_foreign,
+                    current_exchange_rate=excluded.current_exchange_rate,
+                    updated_at=excluded.updated_at
+            """,
+                rows,
+            )
 
     def save_exchange_rate(self, data: dict) -> None:
         """為替レートを保存（UPSERT）"""
-        self.conn.execute(
-            """
-            INSERT INTO exchange_rates (
-                date, pair, rate, prev_rate, change_rate, high, low, updated_at)
-            VALUES (
-                :date, :pair, :rate, :prev_rate, :change_rate, :high, :low, :updated_at)
-            ON CONFLICT(date, pair) DO UPDATE SET
-                rate=excluded.rate, prev_rate=excluded.prev_rate,
-                change_rate=excluded.change_rate, high=excluded.high, low=excluded.low,
-                updated_at=excluded.updated_at
-        """,
-            data,
-        )
-        self.conn.commit()
+        self.save_exchange_rates([data])
+
+    def save_exchange_rates(self, rows: list[dict]) -> None:
+        """為替レートを 1 トランザクションでまとめて保存（UPSERT）"""
+        if not rows:
+            return
+        with self.transaction():
+            self.conn.executemany(
+                """
+                INSERT INTO exchange_rates (
+                    date, pair, rate, prev_rate, change_rate, high, low, updated_at)
+                VALUES (
+                    :date, :pair, :rate, :prev_rate, :change_rate, :high, :low,
+                    :updated_at)
+                ON CONFLICT(date, pair) DO UPDATE SET
+                    rate=excluded.rate, prev_rate=excluded.prev_rate,
+                    change_rate=excluded.change_rate, high=excluded.high,
+                    low=excluded.low, updated_at=excluded.updated_at
+            """,
+                rows,
+            )
 
     def save_dividend(self, data: dict) -> None:
         """配当受取記録を保存（UPSERT）"""
-        self.conn.execute(
-            """
-            INSERT INTO dividends (
-                date, code, name, dividend_foreign, shares,
-                total_foreign, currency, exchange_rate, total_jpy)
-            VALUES (
-                :date, :code, :name, :dividend_foreign, :shares,
-                :total_foreign, :currency, :exchange_rate, :total_jpy)
-            ON CONFLICT(date, code) DO UPDATE SET
-                name=excluded.name, dividend_foreign=excluded.dividend_foreign,
-                shares=excluded.shares, total_foreign=excluded.total_foreign,
-                currency=excluded.currency, exchange_rate=excluded.exchange_rate,
-                total_jpy=excluded.total_jpy
-        """,
-            data,
-        )
-        self.conn.commit()
+        self.save_dividends([data])
+
+    def save_dividends(self, rows: list[dict]) -> None:
+        """配当受取記録を 1 トランザクションでまとめて保存（UPSERT）"""
+        if not rows:
+            return
+        with self.transaction():
+            self.conn.executemany(
+                """
+                INSERT INTO dividends (
+                    date, code, name, dividend_foreign, shares,
+                    total_foreign, currency, exchange_rate, total_jpy)
+                VALUES (
+                    :date, :code, :name, :dividend_foreign, :shares,
+                    :total_foreign, :currency, :exchange_rate, :total_jpy)
+                ON CONFLICT(date, code) DO UPDATE SET
+                    name=excluded.name, dividend_foreign=excluded.dividend_foreign,
+                    shares=excluded.shares, total_foreign=excluded.total_foreign,
+                    currency=excluded.currency, exchange_rate=excluded.exchange_rate,
+                    total_jpy=excluded.total_jpy
+            """,
+                rows,
+            )
 
     def get_dividend_keys(self) -> set[tuple[str, str]]:
         """dividends テーブルに既に存在する (date, code) の組を取得する。
@@ -115,7 +172,7 @@ class DbWriter:
         """,
             data,
         )
-        self.conn.commit()
+        self._commit()
 
     def get_holding_by_code(self, code: str) -> dict | None:
         """holdings から銘柄コードで1件取得する（配当記録の銘柄名・通貨引き当て用）。
@@ -137,17 +194,23 @@ class DbWriter:
 
     def save_benchmark(self, data: dict) -> None:
         """ベンチマークデータを保存（UPSERT）"""
-        self.conn.execute(
-            """
-            INSERT INTO benchmark_data (date, portfolio, nikkei225, sp500)
-            VALUES (:date, :portfolio, :nikkei225, :sp500)
-            ON CONFLICT(date) DO UPDATE SET
-                portfolio=excluded.portfolio, nikkei225=excluded.nikkei225,
-                sp500=excluded.sp500
-        """,
-            data,
-        )
-        self.conn.commit()
+        self.save_benchmarks([data])
+
+    def save_benchmarks(self, rows: list[dict]) -> None:
+        """ベンチマークデータを 1 トランザクションでまとめて保存（UPSERT）"""
+        if not rows:
+            return
+        with self.transaction():
+            self.conn.executemany(
+                """
+                INSERT INTO benchmark_data (date, portfolio, nikkei225, sp500)
+                VALUES (:date, :portfolio, :nikkei225, :sp500)
+                ON CONFLICT(date) DO UPDATE SET
+                    portfolio=excluded.portfolio, nikkei225=excluded.nikkei225,
+                    sp500=excluded.sp500
+            """,
+                rows,
+            )
 
     def get_portfolio_data(self) -> list[dict]:
         """holdings テーブルから保有銘柄を取得"""
@@ -280,18 +343,30 @@ class DbWriter:
             kind: コメント種別（"stock" | "intro" | "summary"）
             content: コメント本文
         """
+        self.save_ai_comments([(date, code, kind, content)])
+
+    def save_ai_comments(self, rows: list[tuple[str, str, str, str]]) -> None:
+        """AI コメントを 1 トランザクションでまとめて保存（UPSERT）。
+
+        Args:
+            rows: (date, code, kind, content) のリスト。各要素は save_ai_comment の
+                引数と同じ
+        """
         from datetime import datetime
 
-        self.conn.execute(
-            """
-            INSERT INTO ai_comments (date, code, kind, content, created_at)
-            VALUES (?, ?, ?, ?, ?)
-            ON CONFLICT(date, code, kind) DO UPDATE SET
-                content=excluded.content, created_at=excluded.created_at
-            """,
-            (date, code, kind, content, datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
-        )
-        self.conn.commit()
+        if not rows:
+            return
+        created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with self.transaction():
+            self.conn.executemany(
+                """
+                INSERT INTO ai_comments (date, code, kind, content, created_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(date, code, kind) DO UPDATE SET
+                    content=excluded.content, created_at=excluded.created_at
+                """,
+                [(*row, created_at) for row in rows],
+            )
 
     def get_ai_comments(self, date: str) -> dict[tuple[str, str], str]:
         """指定月の AI コメントを {(code, kind): content} 形式で取得する。
@@ -423,7 +498,7 @@ class DbWriter:
             """,
             rows,
         )
-        self.conn.commit()
+        self._commit()
         return cursor.rowcount
 
     def display_portfolio_summary(self, year: int, month: int) -> None:
@@ -0,0 +1,135 @@
+"""ECB 参照レート（frankfurter API）の日次ローカルキャッシュ（SQLite）
+
+(通貨, 日付) をキーに対円レートを保存し、通貨ごとに取得済みの期間（連続した 1 区間）
+を記録する。取得済みの期間内の日付は通信せずに答え、期間外は frankfurter の
+時系列エンドポイントで不足分だけを 1 リクエストで取り足す。
+
+保存先は日足ストアと同じ PRICE_STORE_PATH（drizzle 管理の portfolio.db とは分ける）。
+exchange_rates テーブルは月末値のダッシュボード表示用なので、日次の値はここに持つ。
+"""
+
+import sqlite3
+import threading
+from collections.abc import Callable
+from datetime import date, timedelta
+from functools import lru_cache
+from pathlib import Path
+
+from config.settings import PRICE_STORE_PATH
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ecb_rates (
+    currency TEXT NOT NULL,
+    date TEXT NOT NULL,
+    rate REAL NOT NULL,
+    PRIMARY KEY (currency, date)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS ecb_coverage (
+    currency TEXT PRIMARY KEY,
+    start TEXT NOT NULL,
+    end TEXT NOT NULL
+);
+"""
+
+# 期間の先頭が休日でも直前営業日の値を持てるよう、取得開始を遡らせる日数
+LOOKBACK_DAYS = 7
+
+
+class FxRateStore:
+    """(通貨, 日付) をキーにした ECB 参照レートのストア
+
+    スレッド間で共有してよい（DB 操作はロックで直列化する）。
+    """
+
+    def __init__(
+        self, path: str | Path, today: Callable[[], date] = date.today
+    ) -> None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(path), timeout=10, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(_SCHEMA)
+        self._today = today
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def coverage(self, currency: str) -> tuple[date, date] | None:
+        """取得済みの期間 (開始日, 終了日) を返す（未取得なら None）"""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT start, end FROM ecb_coverage WHERE currency = ?", (currency,)
+            ).fetchone()
+        if row is None:
+            return None
+        return date.fromisoformat(row[0]), date.fromisoformat(row[1])
+
+    def missing(self, currency: str, start: date, end: date) -> list[tuple[date, date]]:
+        """start〜end のうち取得が必要な期間のリスト"""
+        covered = self.coverage(currency)
+        if covered is None:
+            return [(start, end)]
+        spans = []
+        if start < covered[0]:
+            spans.append((start, covered[0] - timedelta(days=1)))
+        if end > covered[1]:
+            spans.append((covered[1] + timedelta(days=1), end))
+        return spans
+
+    def rate_on(
+        self, currency: str, on: date, require_coverage: bool = True
+    ) -> float | None:
+        """on 時点のレート（休日は直前営業日の値）
+
+        require_coverage=True なら取得済み期間外の日付は None（取り足しが必要）。
+        False なら期間外（当日など）でも保存済みの直近の値を返す。
+        """
+        covered = self.coverage(currency)
+        if require_coverage and (covered is None or not covered[0] <= on <= covered[1]):
+            return None
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT rate FROM ecb_rates WHERE currency = ? AND date <= ?"
+                " ORDER BY date DESC LIMIT 1",
+                (currency, on.isoformat()),
+            ).fetchone()
+        return None if row is None else float(row[0])
+
+    def save(
+        self, currency: str, rates: dict[str, float], start: date, end: date
+    ) -> None:
+        """start〜end の取得結果を保存し、取得済み期間を広げる
+
+        当日分は確定していないため、取得済み期間は前日までにする。
+        """
+        last_complete = min(end, self._today() - timedelta(days=1))
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO ecb_rates (currency, date, rate)"
+                " VALUES (?, ?, ?)",
+                [(currency, d, rate) for d, rate in rates.items()],
+            )
+            row = self.conn.execute(
+                "SELECT start, end FROM ecb_coverage WHERE currency = ?", (currency,)
+            ).fetchone()
+            new_start, new_end = start, last_complete
+            if row is not None:
+                old_start = date.fromisoformat(row[0])
+                old_end = date.fromisoformat(row[1])
+                # 取得済み期間と離れている場合は 1 区間にできないので新しい方だけ残す
+                gap = timedelta(days=1)
+                if start <= old_end + gap and old_start <= end + gap:
+                    new_start = min(old_start, start)
+                    new_end = max(old_end, last_complete)
+            if new_start <= new_end:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO ecb_coverage (currency, start, end)"
+                    " VALUES (?, ?, ?)",
+                    (currency, new_start.isoformat(), new_end.isoformat()),
+                )
+
+
+@lru_cache(maxsize=1)
+def get_fx_rate_store() -> FxRateStore:
+    """プロセス内で共有する FxRateStore を返す"""
+    return FxRateStore(PRICE_STORE_PATH)
@@ -0,0 +1,31 @@
+"""日足の取得窓口（shared/price_store.py の PriceStore を使う）
+
+yfinance の日次履歴はこのストアを経由して取得し、取得済みの日は通信しない。
+保存先は PRICE_STORE_PATH（既定は portfolio.db と同じ data/ 配下）。
+"""
+
+import os
+import sys
+from datetime import date
+from functools import lru_cache
+
+# shared/price_store.py をインポートするためのパス設定
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "..", "shared"))
+from config.settings import PRICE_STORE_PATH  # noqa: E402
+from price_store import PriceStore, download_daily, split_by_ticker  # noqa: E402
+
+from .rate_limit import get_rate_limiter  # noqa: E402
+
+__all__ = ["PriceStore", "get_price_store", "split_by_ticker"]
+
+
+def _rate_limited_download(symbols: list[str], start: date, end: date) -> dict:
+    """yfinance の共有リミッターを通して download_daily を呼ぶ"""
+    get_rate_limiter("yfinance").acquire()
+    return download_daily(symbols, start, end)
+
+
+@lru_cache(maxsize=1)
+def get_price_store() -> PriceStore:
+    """プロセス内で共有する PriceStore を返す"""
+    return PriceStore(PRICE_STORE_PATH, downloader=_rate_limited_download)
@@ -0,0 +1,49 @@
+"""外部 API 呼び出しのプロセス全体のレート制限
+
+サービス（yfinance・frankfurter）ごとに 1 つの RateLimiter を共有し、
+スレッドから並列に呼んでも呼び出し間隔が 1 / rate 秒を下回らないようにする。
+固定の time.sleep で待つ代わりに、必要な分だけ待つ。
+"""
+
+import threading
+import time
+from collections.abc import Callable
+from functools import cache
+
+from config.settings import RATE_LIMITS
+
+# RATE_LIMITS に無いサービスの上限（回/秒）
+DEFAULT_RATE = 1.0
+
+
+class RateLimiter:
+    """呼び出しを rate 回/秒以下に抑える（スレッドセーフ）"""
+
+    def __init__(
+        self,
+        rate: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._clock = clock
+        self._sleep = sleep
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """次の呼び出し枠まで待つ。待った秒数を返す"""
+        with self._lock:
+            now = self._clock()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        wait = slot - now
+        if wait > 0:
+            self._sleep(wait)
+        return wait
+
+
+@cache
+def get_rate_limiter(service: str) -> RateLimiter:
+    """service の呼び出しで共有する RateLimiter を返す"""
+    return RateLimiter(RATE_LIMITS.get(service, DEFAULT_RATE))
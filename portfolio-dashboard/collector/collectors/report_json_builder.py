@@ -10,10 +10,10 @@ import itertools
 from datetime import date, timedelta
 from typing import TYPE_CHECKING
 
-import yfinance as yf
-
 from config.settings import BACKFILLED_MONTHS
 
+from .price_history import get_price_store
+
 if TYPE_CHECKING:
     from .db_writer import DbWriter
 
@@ -194,9 +194,10 @@ def _fetch_price_series(
 ) -> dict | None:
     """priceSeries（株価・加重平均取得単価の日次/週次系列）を構築する。
 
-    yfinance から最初の購入日〜対象月末の日次終値（ネイティブ通貨）を取得し、
-    _thin_price_series で間引いたうえで、各時点の加重平均取得単価を添える。
-    取得失敗（yfinance が空を返す・例外）時は None を返し、警告を出力する
+    日足ストア（未取得の日は yfinance）から最初の購入日〜対象月末の日次終値
+    （ネイティブ通貨）を取得し、_thin_price_series で間引いたうえで、
+    各時点の加重平均取得単価を添える。
+    取得失敗（データが空・例外）時は None を返し、警告を出力する
     （呼び出し元はこれを許容し、他の処理を止めない）。
 
     Args:
@@ -211,14 +212,9 @@ def _fetch_price_series(
         取得失敗時は None。
     """
     try:
-        # auto_adjust=False: 既存DBの値は未調整終値のため、yfinanceの
-        # 既定変更（調整後値）が混入しないよう明示する（stock_collector.py と同じ理由）
-        end_exclusive = _date_from_iso(month_end_date) + timedelta(days=1)
-        raw = yf.Ticker(symbol).history(
-            start=first_purchase_date,
-            end=end_exclusive.strftime("%Y-%m-%d"),
-            auto_adjust=False,
-        )
+        # 日足ストア経由で取得（取得済みの日は通信しない）。ストアは未調整終値を
+        # 持つ（既存DBの値は未調整終値のため。stock_collector.py と同じ理由）
+        raw = get_price_store().history(symbol, first_purchase_date, month_end_date)
     except Exception as e:
         print(f"⚠️ priceSeries 取得エラー（{symbol}）: {e}")
         return None
@@ -1,8 +1,23 @@
-from datetime import datetime, timedelta
+from __future__ import annotations
 
-import yfinance as yf
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
 
 from .currency_converter import CurrencyConverter
+from .price_history import get_price_store
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+def _month_range(year: int, month: int) -> tuple[datetime, datetime]:
+    """月の開始日と終了日（月末日）を返す"""
+    start_date = datetime(year, month, 1)
+    if month == 12:
+        end_date = datetime(year + 1, 1, 1) - timedelta(days=1)
+    else:
+        end_date = datetime(year, month + 1, 1) - timedelta(days=1)
+    return start_date, end_date
 
 
 class StockDataCollector:
@@ -14,7 +29,7 @@ class StockDataCollector:
 
     def get_stock_data(
         self, symbol: str, year: int, month: int
-    ) -> dict[str, object] | None:
+    ) -> pd.DataFrame | None:
         """株価データを取得
 
         Args:
@@ -26,22 +41,11 @@ class StockDataCollector:
             pd.DataFrame: 株価データ
         """
         try:
-            # 月の開始日と終了日を計算
-            start_date = datetime(year, month, 1)
-            if month == 12:
-                end_date = datetime(year + 1, 1, 1) - timedelta(days=1)
-            else:
-                end_date = datetime(year, month + 1, 1) - timedelta(days=1)
-
-            # yfinanceでデータ取得
-            # auto_adjust=False: 既存DBの値は未調整終値のため、
-            # yfinanceの既定変更（調整後値）が混入しないよう明示する
-            ticker = yf.Ticker(symbol)
-            data = ticker.history(
-                start=start_date,
-                end=end_date + timedelta(days=1),
-                auto_adjust=False,
-            )
+            start_date, end_date = _month_range(year, month)
+
+            # 日足ストア経由で取得（未取得の日だけ yfinance から取り足す）
+            # 既存DBの値は未調整終値のため、ストアも未調整（auto_adjust=False）で持つ
+            data = get_price_store().history(symbol, start_date, end_date)
 
             if data.empty:
                 print(f"⚠️ {symbol} のデータが取得できませんでした")
@@ -53,9 +57,71 @@ class StockDataCollector:
             print(f"株価データ取得エラー ({symbol}): {e}")
             return None
 
+    def get_stock_data_batch(
+        self, symbols: list[str], year: int, month: int
+    ) -> dict[str, pd.DataFrame]:
+        """複数銘柄の株価データを日足ストア経由でまとめて取得
+
+        Args:
+            symbols (list[str]): 銘柄コードのリスト
+            year (int): 年
+            month (int): 月
+
+        Returns:
+            dict: 銘柄コード → 株価データ（pd.DataFrame）。
+                取得できなかった銘柄は含まない（呼び出し側で get_stock_data に
+                フォールバックする）
+        """
+        symbols = list(dict.fromkeys(symbols))
+        if not symbols:
+            return {}
+        try:
+            start_date, end_date = _month_range(year, month)
+            # 未取得の期間が同じ銘柄は yf.download 1 回でまとめて取り足す
+            histories = get_price_store().histories(symbols, start_date, end_date)
+        except Exception as e:
+            print(f"株価データ一括取得エラー: {e}")
+            return {}
+
+        frames = {s: df for s, df in histories.items() if not df.empty}
+        missing = [s for s in symbols if s not in frames]
+        if missing:
+            print(f"⚠️ 一括取得できなかった銘柄: {', '.join(missing)}")
+        return frames
+
+    def prefetch_stock_data(
+        self,
+        symbols: list[str],
+        start_year: int,
+        start_month: int,
+        end_year: int,
+        end_month: int,
+    ) -> None:
+        """期間全体の日足を日足ストアへまとめて取り足す（期間範囲収集の先読み）
+
+        未取得の期間が同じ銘柄は yf.download 1 回で取得するため、
+        以降の月ごとの get_stock_data_batch はストアから読むだけになる。
+
+        Args:
+            symbols (list[str]): 銘柄コードのリスト
+            start_year (int): 開始年
+            start_month (int): 開始月
+            end_year (int): 終了年
+            end_month (int): 終了月
+        """
+        symbols = list(dict.fromkeys(symbols))
+        if not symbols:
+            return
+        start_date, _ = _month_range(start_year, start_month)
+        _, end_date = _month_range(end_year, end_month)
+        try:
+            get_price_store().top_up(symbols, start_date.date(), end_date.date())
+        except Exception as e:
+            print(f"株価データ先読みエラー: {e}")
+
     def calculate_stock_metrics(
         self,
-        stock_data: dict[str, object],
+        stock_data: pd.DataFrame,
         symbol: str,
         purchase_price_foreign: float,
         purchase_exchange_rate: float,
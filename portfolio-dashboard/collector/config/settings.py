@@ -22,6 +22,20 @@ DB_PATH = os.getenv(
     "DB_PATH",
     str(Path(__file__).parent.parent.parent / "data" / "portfolio.db"),
 )
+# 日足のローカルストア（yfinance の取得済み期間を再取得しない）
+PRICE_STORE_PATH = os.getenv(
+    "PRICE_STORE_PATH",
+    str(Path(__file__).parent.parent.parent / "data" / "price_store.db"),
+)
+
+# 外部 API のプロセス全体の呼び出し上限（回/秒）
+# バックフィルの並列取得もこの範囲に収める
+RATE_LIMITS = {
+    "yfinance": float(os.getenv("YFINANCE_RATE_LIMIT", "2")),
+    "frankfurter": float(os.getenv("FRANKFURTER_RATE_LIMIT", "5")),
+}
+# 期間範囲収集（--range）の先行取得で使うスレッド数
+BACKFILL_WORKERS = int(os.getenv("BACKFILL_WORKERS", "4"))
 
 # WordPress 設定（ブログ自動投稿用）
 WP_URL = os.getenv("WP_URL", "")
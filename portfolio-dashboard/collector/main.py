@@ -54,6 +54,13 @@ def _get_next_month_date(year: int, month: int) -> str:
     return f"{next_year:04d}-{next_month:02d}-01T09:00:00"
 
 
+def _month_end(year: int, month: int) -> datetime:
+    """対象月の月末日を返す"""
+    if month == 12:
+        return datetime(year + 1, 1, 1) - timedelta(days=1)
+    return datetime(year, month + 1, 1) - timedelta(days=1)
+
+
 def _format_decimal(value: Decimal) -> str:
     """Decimal をカンマ区切りの表示用文字列に変換する（整数値は小数点を出さない）。"""
     if value == value.to_integral_value():
@@ -249,15 +256,20 @@ class PortfolioDataCollector:
             return False
 
         # 月末日付を計算
-        if month == 12:
-            last_day = datetime(year + 1, 1, 1) - timedelta(days=1)
-        else:
-            last_day = datetime(year, month + 1, 1) - timedelta(days=1)
+        last_day = _month_end(year, month)
         last_day_str = last_day.strftime("%Y-%m-%d")
         now_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
         price_count = 0
         pnl_count = 0
+        # 書き込みは月の最後に 1 トランザクションでまとめて行う
+        price_rows: list[dict] = []
+        pnl_rows: list[dict] = []
+        rate_rows: list[dict] = []
+
+        # 全銘柄の株価を 1 回の通信でまとめて取得する
+        codes = [str(h.get("code", "")) for h in portfolio_data if h.get("code")]
+        batch_data = self.stock_collector.get_stock_data_batch(codes, year, month)
 
         for holding in portfolio_data:
             code = holding.get("code", "")
@@ -301,8 +313,10 @@ class PortfolioDataCollector:
 
             print(f"  処理中: {name} ({code})")
 
-            # 株価データ取得
-            stock_data = self.stock_collector.get_stock_data(code, year, month)
+            # 株価データ取得（一括取得で取れなかった銘柄だけ個別に取得）
+            stock_data = batch_data.get(code)
+            if stock_data is None:
+                stock_data = self.stock_collector.get_stock_data(code, year, month)
             if stock_data is None:
                 continue
 
@@ -318,8 +332,8 @@ class PortfolioDataCollector:
             if metrics is None:
                 continue
 
-            # monthly_prices に保存
-            self.db_writer.save_monthly_price(
+            # monthly_prices に保存する行
+            price_rows.append(
                 {
                     "date": last_day_str,
                     "code": code,
@@ -340,13 +354,15 @@ class PortfolioDataCollector:
                 currency = str(metrics.get("currency", "JPY"))
                 if currency != "JPY" and metrics.get("current_exchange_rate"):
                     current_rate = float(metrics["current_exchange_rate"])
-                    self._save_exchange_rate(
-                        currency, current_rate, last_day_str, now_str
+                    rate_rows.append(
+                        self._exchange_rate_row(
+                            currency, current_rate, last_day_str, now_str
+                        )
                     )
 
-            # monthly_pnl に保存（保有期間のみ）
+            # monthly_pnl に保存する行（保有期間のみ）
             if is_owned_in_month:
-                self.db_writer.save_monthly_pnl(
+                pnl_rows.append(
                     {
                         "date": f"{year}-{month:02d}-末",
                         "code": code,
@@ -386,18 +402,24 @@ class PortfolioDataCollector:
             else:
                 print(f"    {name}: 市場データのみ記録（取得日: {acquired_date_str}）")
 
-        print(f"\n  市場データ保存: {price_count}件 / 損益レポート保存: {pnl_count}件")
-
         # 日本株のみの場合は為替レート取得がスキップされているため、ここで取得
-        self._update_all_currency_rates(last_day_str, now_str)
-
-        # 収集直後に purchase_history 基準で取得系カラムを補正する。
-        # holdings 集約は「現在の合計」を対象月に適用するため、
-        # 過去月の収集（--range 等）では shares/cost が不正確になる。
-        if price_count > 0:
-            repair_monthly_pnl(
-                self.db_writer, target_months=[(year, month)], verbose=False
-            )
+        rate_rows.extend(self._all_currency_rate_rows(last_day_str, now_str))
+
+        # 月の書き込みは 1 トランザクションにまとめる（途中で失敗したら月ごと戻す）
+        with self.db_writer.transaction():
+            self.db_writer.save_monthly_prices(price_rows)
+            self.db_writer.save_exchange_rates(rate_rows)
+            self.db_writer.save_monthly_pnls(pnl_rows)
+
+            # 収集直後に purchase_history 基準で取得系カラムを補正する。
+            # holdings 集約は「現在の合計」を対象月に適用するため、
+            # 過去月の収集（--range 等）では shares/cost が不正確になる。
+            if price_count > 0:
+                repair_monthly_pnl(
+                    self.db_writer, target_months=[(year, month)], verbose=False
+                )
+
+        print(f"\n  市場データ保存: {price_count}件 / 損益レポート保存: {pnl_count}件")
 
         return price_count > 0
 
@@ -409,34 +431,34 @@ class PortfolioDataCollector:
             ai_comments: generate_all の戻り値辞書（stock_comments / summary / intro）
         """
         stock_comments = ai_comments.get("stock_comments") or {}
-        for code, content in stock_comments.items():
-            if content:
-                self.db_writer.save_ai_comment(target_date, code, "stock", content)
+        rows = [
+            (target_date, code, "stock", content)
+            for code, content in stock_comments.items()
+            if content
+        ]
         summary = ai_comments.get("summary")
         if summary:
-            self.db_writer.save_ai_comment(target_date, "", "summary", summary)
+            rows.append((target_date, "", "summary", summary))
         intro = ai_comments.get("intro")
         if intro:
-            self.db_writer.save_ai_comment(target_date, "", "intro", intro)
+            rows.append((target_date, "", "intro", intro))
+        self.db_writer.save_ai_comments(rows)
         print(f"  AI コメントを DB に保存しました（{target_date}）")
 
-    def _save_exchange_rate(
+    def _exchange_rate_row(
         self, currency: str, rate: float, date_str: str, now_str: str
-    ) -> None:
-        """為替レートを SQLite に保存"""
-        pair = f"{currency}/JPY"
-        self.db_writer.save_exchange_rate(
-            {
-                "date": date_str,
-                "pair": pair,
-                "rate": rate,
-                "prev_rate": None,
-                "change_rate": None,
-                "high": None,
-                "low": None,
-                "updated_at": now_str,
-            }
-        )
+    ) -> dict:
+        """exchange_rates に保存する行を作る"""
+        return {
+            "date": date_str,
+            "pair": f"{currency}/JPY",
+            "rate": rate,
+            "prev_rate": None,
+            "change_rate": None,
+            "high": None,
+            "low": None,
+            "updated_at": now_str,
+        }
 
     def _save_wp_post(self, year: int, month: int, url: str, title: str) -> None:
         """WordPress 投稿URLを wp_posts に保存する。
@@ -462,10 +484,10 @@ class PortfolioDataCollector:
         except Exception as e:
             print(f"  [警告] WordPress 投稿URLの保存に失敗しました: {e}")
 
-    def _update_all_currency_rates(self, date_str: str, now_str: str) -> None:
-        """全通貨の為替レートを取得・保存"""
+    def _all_currency_rate_rows(self, date_str: str, now_str: str) -> list[dict]:
+        """全通貨の為替レートを取得し、exchange_rates に保存する行のリストを返す"""
         if not CURRENCY_SETTINGS.get("update_rates_with_stocks", True):
-            return
+            return []
 
         print("\n  為替レート取得中...")
         # date_str（月末日）基準のECB参照レートを使う（実行日スポットではない）
@@ -473,10 +495,12 @@ class PortfolioDataCollector:
         rates = self.stock_collector.currency_converter.get_all_current_rates(
             on_date
         )
-        for currency, rate in rates.items():
-            if rate:
-                self._save_exchange_rate(currency, float(rate), date_str, now_str)
-        print(f"  為替レート保存: {len(rates)}通貨")
+        print(f"  為替レート取得: {len(rates)}通貨")
+        return [
+            self._exchange_rate_row(currency, float(rate), date_str, now_str)
+            for currency, rate in rates.items()
+            if rate
+        ]
 
     def sync_holdings_only(self) -> bool:
         """Sheets 同期のみ実行"""
@@ -767,12 +791,9 @@ class PortfolioDataCollector:
           フェーズ1: 保存レコードを全件確定させる（外国株は受取日の為替
               レートを取得する）。1件でも為替レートが取得できなければ、
               何も書き込まずエラー終了する（フェイルファスト）。
-          フェーズ2: dry_run なら表示のみ。本実行なら1件ずつ保存してサマリを
-              表示する。save_dividend は1件ごとに commit するため厳密な
-              原子性は無い点に注意（フェーズ1を通過すれば書き込み自体が
-              失敗することは想定していないが、保存ループの途中で中断した
-              場合は部分的にしか入らない）。dividends は date+code の
-              UPSERT なので、再実行すれば必ず揃う。
+          フェーズ2: dry_run なら表示のみ。本実行なら全件を1トランザクション
+              で保存してサマリを表示する。途中で失敗した場合は1件も書き込まない
+              （dividends は date+code の UPSERT なので、再実行すれば必ず揃う）。
 
         Args:
             csv_path: CSV ファイルパス。
@@ -915,9 +936,9 @@ class PortfolioDataCollector:
             print("\n  [dry-run] DB へは書き込んでいません")
             return True
 
-        # フェーズ2: 保存
-        for rec in save_records:
-            self.db_writer.save_dividend(rec)
+        # フェーズ2: 保存（全件で1トランザクション）
+        with self.db_writer.transaction():
+            self.db_writer.save_dividends(save_records)
 
         print(f"\n✅ {len(save_records)}件の配当を保存しました")
         return True
@@ -1054,15 +1075,16 @@ class PortfolioDataCollector:
             f"{start_year}年{start_month}月 〜 {end_year}年{end_month}月 ==="
         )
 
-        # 総月数計算
-        total_months = 0
+        # 対象月の一覧
+        months: list[tuple[int, int]] = []
         ty, tm = start_year, start_month
         while (ty, tm) <= (end_year, end_month):
-            total_months += 1
+            months.append((ty, tm))
             tm += 1
             if tm > 12:
                 tm = 1
                 ty += 1
+        total_months = len(months)
 
         print(f"実行予定: {total_months}ヶ月分")
 
@@ -1072,15 +1094,15 @@ class PortfolioDataCollector:
                 print("実行をキャンセルしました")
                 return {"status": "cancelled"}
 
+        # 期間全体の株価・為替レートを先に取得し、月ごとの処理は通信しない
+        if months:
+            self._prefetch_range(months)
+
         success_count = 0
         error_count = 0
         error_details: list[str] = []
 
-        current_year, current_month = start_year, start_month
-        current_count = 0
-
-        while (current_year, current_month) <= (end_year, end_month):
-            current_count += 1
+        for current_count, (current_year, current_month) in enumerate(months, 1):
             print(
                 f"\n[{current_count}/{total_months}] "
                 f"{current_year}年{current_month}月..."
@@ -1100,16 +1122,6 @@ class PortfolioDataCollector:
                 error_details.append(f"{current_year}年{current_month}月: {e}")
                 print(f"❌ エラー: {e}")
 
-            # API制限回避（最後の月以外）
-            if (current_year, current_month) < (end_year, end_month):
-                print("  10秒待機中...")
-                time.sleep(10)
-
-            current_month += 1
-            if current_month > 12:
-                current_month = 1
-                current_year += 1
-
         print(f"\n=== 完了: 成功 {success_count}/{total_months}件 ===")
         if error_details:
             print("エラー詳細:")
@@ -1124,6 +1136,36 @@ class PortfolioDataCollector:
             "error_details": error_details,
         }
 
+    def _prefetch_range(self, months: list[tuple[int, int]]) -> None:
+        """期間範囲収集の前に、全期間の株価と月末の為替レートをまとめて取得する
+
+        株価は全銘柄の全期間を日足ストアへ取り足し（未取得の期間が同じ銘柄は
+        1 回の通信）、為替レートは通貨 × 月末日をスレッドで並列に取得して
+        CurrencyConverter のキャッシュに置く。呼び出し間隔は collectors.rate_limit
+        の共有リミッターが抑えるため、月の間に固定の待機は入れない。
+
+        Args:
+            months: 対象の (年, 月) のリスト（昇順）
+        """
+        portfolio_data = self.db_writer.get_portfolio_data()
+        codes = [str(h.get("code", "")) for h in portfolio_data if h.get("code")]
+        (start_year, start_month), (end_year, end_month) = months[0], months[-1]
+
+        print(f"\n📥 株価を一括取得中（{len(codes)}銘柄）...")
+        self.stock_collector.prefetch_stock_data(
+            codes, start_year, start_month, end_year, end_month
+        )
+
+        converter = self.stock_collector.currency_converter
+        if CURRENCY_SETTINGS.get("update_rates_with_stocks", True):
+            currencies = list(converter.supported_pairs)
+        else:
+            currencies = [converter.get_currency_from_symbol(c) for c in codes]
+        dates = [_month_end(y, m) for y, m in months]
+        print("📥 為替レートを一括取得中...")
+        fetched = converter.prefetch_rates(currencies, dates)
+        print(f"  為替レート取得: {fetched}件")
+
     def run_interactive(self) -> None:
         """対話型メインメニュー"""
         print("=== ポートフォリオデータ収集システム（SQLite版）===")
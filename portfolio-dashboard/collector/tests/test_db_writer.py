@@ -0,0 +1,85 @@
+"""collectors.db_writer の一括保存とトランザクションのユニットテスト。
+
+drizzle のマイグレーションは使わず、UPSERT に必要な列と一意制約だけの
+テーブルを一時 DB に作って検証する。
+"""
+
+from __future__ import annotations
+
+import sqlite3
+
+import pytest
+
+from collectors.db_writer import DbWriter
+
+SCHEMA = """
+CREATE TABLE exchange_rates (
+    date TEXT NOT NULL, pair TEXT NOT NULL, rate REAL, prev_rate REAL,
+    change_rate REAL, high REAL, low REAL, updated_at TEXT,
+    UNIQUE (date, pair)
+);
+CREATE TABLE ai_comments (
+    date TEXT NOT NULL, code TEXT NOT NULL, kind TEXT NOT NULL,
+    content TEXT, created_at TEXT,
+    UNIQUE (date, code, kind)
+);
+"""
+
+
+def _rate(pair: str, rate: float) -> dict:
+    return {
+        "date": "2024-01-31",
+        "pair": pair,
+        "rate": rate,
+        "prev_rate": None,
+        "change_rate": None,
+        "high": None,
+        "low": None,
+        "updated_at": "2024-02-01 00:00:00",
+    }
+
+
+@pytest.fixture
+def db(tmp_path):
+    path = tmp_path / "portfolio.db"
+    with sqlite3.connect(path) as conn:
+        conn.executescript(SCHEMA)
+    writer = DbWriter(str(path))
+    yield writer
+    writer.close()
+
+
+def _rates(db: DbWriter) -> dict[str, float]:
+    # 別接続から読み、commit 済みの行だけを見る
+    path = db.conn.execute("PRAGMA database_list").fetchone()[2]
+    with sqlite3.connect(path) as conn:
+        return dict(conn.execute("SELECT pair, rate FROM exchange_rates").fetchall())
+
+
+def test_save_exchange_rates_はまとめて保存しUPSERTする(db):
+    db.save_exchange_rates([_rate("USD/JPY", 148.0), _rate("EUR/JPY", 160.0)])
+    db.save_exchange_rate(_rate("USD/JPY", 149.0))
+
+    assert _rates(db) == {"USD/JPY": 149.0, "EUR/JPY": 160.0}
+
+
+def test_transaction_内の書き込みは抜けるまでcommitしない(db):
+    with db.transaction():
+        db.save_exchange_rate(_rate("USD/JPY", 148.0))
+        db.save_ai_comments([("2024-01-末", "", "intro", "こんにちは")])
+        assert _rates(db) == {}
+
+    assert _rates(db) == {"USD/JPY": 148.0}
+    assert db.get_ai_comments("2024-01-末") == {("", "intro"): "こんにちは"}
+
+
+def test_transaction_例外時は全件を戻す(db):
+    with pytest.raises(RuntimeError), db.transaction():
+        db.save_exchange_rates([_rate("USD/JPY", 148.0)])
+        with db.transaction():
+            db.save_exchange_rate(_rate("EUR/JPY", 160.0))
+        raise RuntimeError("途中で失敗")
+
+    assert _rates(db) == {}
+    db.save_exchange_rate(_rate("GBP/JPY", 190.0))
+    assert _rates(db) == {"GBP/JPY": 190.0}
@@ -0,0 +1,96 @@
+"""collectors.fx_rate_store と CurrencyConverter の期間取得のユニットテスト。
+
+frankfurter API はスタブに差し替え、ネットワークには触れない。
+"""
+
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from collectors.currency_converter import CurrencyConverter
+from collectors.fx_rate_store import FxRateStore
+from collectors.rate_limit import RateLimiter
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = FxRateStore(tmp_path / "fx.db", today=lambda: date(2024, 12, 31))
+    yield store
+    store.close()
+
+
+class FakeFrankfurter:
+    """時系列エンドポイントの代わりに営業日ごとのレート（日の数 + 140）を返す"""
+
+    def __init__(self) -> None:
+        self.requests: list[str] = []
+
+    def __call__(self, url: str, params: dict, timeout: float) -> MagicMock:
+        self.requests.append(url.rsplit("/", 1)[-1])
+        start, end = (date.fromisoformat(d) for d in url.rsplit("/", 1)[-1].split(".."))
+        rates = {}
+        day = start
+        while day <= end:
+            if day.weekday() < 5:
+                rates[day.isoformat()] = {"JPY": 140.0 + day.day}
+            day += timedelta(days=1)
+        response = MagicMock()
+        response.json.return_value = {"rates": rates}
+        return response
+
+
+@pytest.fixture
+def frankfurter():
+    fake = FakeFrankfurter()
+    with (
+        patch("collectors.currency_converter.requests.get", fake),
+        patch(
+            "collectors.currency_converter.get_rate_limiter",
+            return_value=RateLimiter(0),
+        ),
+    ):
+        yield fake
+
+
+def test_rate_on_休日は直前営業日の値を返す(store):
+    store.save("USD", {"2024-03-29": 151.0}, date(2024, 3, 29), date(2024, 3, 31))
+
+    assert store.rate_on("USD", date(2024, 3, 31)) == 151.0
+    assert store.rate_on("USD", date(2024, 4, 1)) is None
+    assert store.rate_on("USD", date(2024, 4, 1), require_coverage=False) == 151.0
+
+
+def test_missing_は取得済み期間の外側だけを返す(store):
+    store.save("USD", {}, date(2024, 2, 1), date(2024, 2, 29))
+
+    assert store.missing("USD", date(2024, 1, 15), date(2024, 3, 10)) == [
+        (date(2024, 1, 15), date(2024, 1, 31)),
+        (date(2024, 3, 1), date(2024, 3, 10)),
+    ]
+    assert store.missing("USD", date(2024, 2, 5), date(2024, 2, 20)) == []
+
+
+def test_prefetch_rates_は通貨ごとに1リクエストで期間を取得する(store, frankfurter):
+    converter = CurrencyConverter(rate_store=store)
+    dates = [datetime(2024, 1, 31), datetime(2024, 2, 29), datetime(2024, 3, 31)]
+
+    assert converter.prefetch_rates(["USD", "EUR", "JPY", "USD"], dates) == 6
+    assert sorted(frankfurter.requests) == ["2024-01-24..2024-03-31"] * 2
+
+    # 3/31 は日曜なので 3/29（金）の値
+    assert converter.get_exchange_rate("USD", datetime(2024, 3, 31)) == 169.0
+    assert converter.get_exchange_rate("EUR", datetime(2024, 2, 15)) == 155.0
+    assert len(frankfurter.requests) == 2
+
+
+def test_get_exchange_rate_取得済みの日はストアから返す(store, frankfurter):
+    CurrencyConverter(rate_store=store).get_exchange_rate("USD", datetime(2024, 1, 31))
+    rate = CurrencyConverter(rate_store=store).get_exchange_rate(
+        "USD", datetime(2024, 1, 31)
+    )
+
+    assert rate == 171.0
+    assert frankfurter.requests == ["2024-01-24..2024-01-31"]
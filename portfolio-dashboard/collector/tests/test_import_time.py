@@ -0,0 +1,48 @@
+"""collector の起動時インポートのテスト（python -X importtime で計測）。
+
+yfinance・pandas は株価・為替・ベンチマークを実際に取得する関数の中で
+読み込む。--import-dividends や --add-purchase など取得を伴わないコマンドの
+起動を重くしないよう、main と各 collectors モジュールのインポートで
+読み込まれないことを別プロセスで確認する。
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+COLLECTOR_DIR = Path(__file__).resolve().parent.parent
+
+# shared/import_time.py をインポートするためのパス設定
+sys.path.insert(0, str(COLLECTOR_DIR.parent.parent / "shared"))
+from import_time import measure_import_time  # noqa: E402
+
+# main のインポートにかけてよい時間（マイクロ秒）。遅い CI では環境変数で広げる
+BUDGET_US = int(os.environ.get("IMPORT_TIME_BUDGET_US", 2_000_000))
+
+LAZY_PACKAGES = ("yfinance", "pandas")
+
+MODULES = (
+    "main",
+    "collectors.stock_collector",
+    "collectors.currency_converter",
+    "collectors.benchmark_collector",
+    "collectors.report_json_builder",
+)
+
+
+@pytest.mark.parametrize("module", MODULES)
+def test_heavy_packages_are_not_imported(module: str) -> None:
+    """インポートしただけでは yfinance・pandas を読み込まない。"""
+    timings = measure_import_time(module, COLLECTOR_DIR)
+    assert module in timings
+    for package in LAZY_PACKAGES:
+        assert package not in timings, f"{module} が {package} を読み込んでいる"
+
+
+def test_main_import_within_budget() -> None:
+    """main のインポート時間が予算内に収まる。"""
+    assert measure_import_time("main", COLLECTOR_DIR)["main"] < BUDGET_US
@@ -0,0 +1,178 @@
+"""shared/price_store.py（日足のローカルストア）のユニットテスト。
+
+yfinance の代わりに呼び出しを記録するスタブを注入し、ネットワークには触れない。
+"""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+import pandas as pd
+import pytest
+
+from collectors.price_history import PriceStore, split_by_ticker
+
+FIELDS = ["Open", "High", "Low", "Close", "Adj Close", "Volume"]
+
+
+class FakeMarket:
+    """営業日（平日）ごとに決まった値を返す yf.download の代替"""
+
+    def __init__(self) -> None:
+        self.calls: list[tuple[list[str], date, date]] = []
+        # 銘柄ごとの終値の倍率（分割を模して途中で変える）
+        self.scale: dict[str, float] = {}
+        # 銘柄ごとの調整後終値の倍率（配当の権利落ちを模して途中で変える）
+        self.adj_scale: dict[str, float] = {}
+        # 何も返さない銘柄（上場廃止・誤ったティッカー）
+        self.unknown: set[str] = set()
+
+    def __call__(self, symbols: list[str], start: date, end: date) -> dict:
+        self.calls.append((list(symbols), start, end))
+        days = [
+            start + timedelta(days=i)
+            for i in range((end - start).days)
+            if (start + timedelta(days=i)).weekday() < 5
+        ]
+        frames = {}
+        for symbol in symbols:
+            if symbol in self.unknown:
+                continue
+            scale = self.scale.get(symbol, 1.0)
+            adj = scale * self.adj_scale.get(symbol, 1.0)
+            rows = [
+                [d.day, d.day + 2, d.day - 1, d.day * scale, d.day * adj, 100]
+                for d in days
+            ]
+            frames[symbol] = pd.DataFrame(
+                rows, index=pd.to_datetime(days), columns=FIELDS, dtype=float
+            )
+        return frames
+
+
+@pytest.fixture
+def market():
+    return FakeMarket()
+
+
+@pytest.fixture
+def store(tmp_path, market):
+    price_store = PriceStore(
+        tmp_path / "prices.db", downloader=market, today=lambda: date(2024, 6, 1)
+    )
+    yield price_store
+    price_store.close()
+
+
+def test_2回目は通信せずに保存済みの日足を返す(store, market):
+    first = store.history("NVDA", "2024-01-01", "2024-01-31")
+    second = store.history("NVDA", "2024-01-01", "2024-01-31")
+
+    assert len(market.calls) == 1
+    assert len(first) == 23  # 2024年1月の平日
+    pd.testing.assert_frame_equal(first, second)
+    assert list(first.columns) == FIELDS
+
+
+def test_不足している期間だけを取り足す(store, market):
+    store.history("NVDA", "2024-01-01", "2024-01-31")
+    store.history("NVDA", "2024-01-01", "2024-02-29")
+
+    # 2 回目は取得済み区間の最終日（比較用）から 2 月末まで
+    assert market.calls[1][1:] == (date(2024, 1, 31), date(2024, 3, 1))
+    assert store.coverage("NVDA") == (date(2024, 1, 1), date(2024, 2, 29))
+
+
+def test_前方の期間も取り足す(store, market):
+    store.history("NVDA", "2024-02-01", "2024-02-29")
+    frame = store.history("NVDA", "2024-01-01", "2024-02-29")
+
+    assert market.calls[1][1:] == (date(2024, 1, 1), date(2024, 2, 2))
+    assert frame.index[0] == pd.Timestamp("2024-01-01")
+
+
+def test_同じ期間が足りない銘柄はまとめて1回で取得する(store, market):
+    store.histories(["NVDA", "7974.T", "NVDA"], "2024-01-01", "2024-01-31")
+
+    assert market.calls == [
+        (["NVDA", "7974.T"], date(2024, 1, 1), date(2024, 2, 1))
+    ]
+
+
+def test_当日分は取得済みにしない(store, market):
+    store.history("NVDA", "2024-05-20", "2024-06-01")
+    assert store.coverage("NVDA") == (date(2024, 5, 20), date(2024, 5, 31))
+
+
+def test_過去の値が調整されていたら取り直す(store, market):
+    store.history("NVDA", "2024-01-01", "2024-01-31")
+    # 株式分割で過去の終値が 1/10 に調整し直された
+    market.scale["NVDA"] = 0.1
+    frame = store.history("NVDA", "2024-01-01", "2024-02-29")
+
+    assert market.calls[-1][1:] == (date(2024, 1, 1), date(2024, 3, 1))
+    assert frame.loc["2024-01-02", "Close"] == pytest.approx(0.2)
+
+
+def test_配当で調整後終値だけ変わったら取り直さずに掛け直す(store, market):
+    store.history("NVDA", "2024-01-01", "2024-01-31")
+    # 配当の権利落ちで過去の調整後終値が 0.98 倍になった
+    market.adj_scale["NVDA"] = 0.98
+    frame = store.history("NVDA", "2024-01-01", "2024-02-29")
+
+    assert len(market.calls) == 2
+    assert store.coverage("NVDA") == (date(2024, 1, 1), date(2024, 2, 29))
+    assert frame.loc["2024-01-02", "Close"] == pytest.approx(2.0)
+    assert frame.loc["2024-01-02", "Adj Close"] == pytest.approx(1.96)
+    assert frame.loc["2024-02-01", "Adj Close"] == pytest.approx(0.98)
+
+
+def test_何も返らない銘柄は当日中は取り直さない(tmp_path, market):
+    today = [date(2024, 6, 1)]
+    store = PriceStore(
+        tmp_path / "prices.db", downloader=market, today=lambda: today[0]
+    )
+    market.unknown.add("DELISTED")
+    assert store.history("DELISTED", "2024-01-01", "2024-01-31").empty
+    assert store.history("DELISTED", "2024-01-01", "2024-01-31").empty
+    assert len(market.calls) == 1
+    assert store.coverage("DELISTED") is None
+
+    today[0] = date(2024, 6, 2)
+    store.history("DELISTED", "2024-01-01", "2024-01-31")
+    assert len(market.calls) == 2
+    store.close()
+
+
+def test_adjustedはAdj_Closeの比でOHLCを調整する(store, market):
+    market.scale["NVDA"] = 1.0
+    store.history("NVDA", "2024-01-02", "2024-01-02")
+    store.conn.execute("UPDATE daily_prices SET adj_close = close / 2")
+    frame = store.load("NVDA", "2024-01-02", "2024-01-02", adjusted=True)
+    assert frame.loc["2024-01-02", "Close"] == pytest.approx(1.0)
+    assert frame.loc["2024-01-02", "High"] == pytest.approx(2.0)
+
+
+def test_取得に失敗したら空を返し取得済みにしない(tmp_path):
+    def offline(symbols, start, end):
+        raise OSError("offline")
+
+    failing = PriceStore(tmp_path / "prices.db", downloader=offline)
+    assert failing.history("NVDA", "2024-01-01", "2024-01-31").empty
+    assert failing.coverage("NVDA") is None
+    failing.close()
+
+
+def test_split_by_ticker_銘柄ごとに分け欠損行を落とす():
+    columns = pd.MultiIndex.from_product([["AAPL", "7203.T"], FIELDS])
+    data = pd.DataFrame(
+        [[1.0] * 12, [1.0] * 6 + [float("nan")] * 6],
+        index=pd.to_datetime(["2024-01-04", "2024-01-05"]),
+        columns=columns,
+    )
+
+    frames = split_by_ticker(data, ["AAPL", "7203.T", "MISSING"])
+
+    assert set(frames) == {"AAPL", "7203.T"}
+    assert len(frames["AAPL"]) == 2
+    assert len(frames["7203.T"]) == 1
@@ -0,0 +1,44 @@
+"""collectors.rate_limit のユニットテスト。"""
+
+from __future__ import annotations
+
+import pytest
+
+from collectors.rate_limit import RateLimiter
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.slept: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+def test_RateLimiter_は呼び出し間隔を空ける():
+    clock = FakeClock()
+    limiter = RateLimiter(2.0, clock=clock, sleep=clock.sleep)
+
+    limiter.acquire()
+    limiter.acquire()
+    clock.now += 0.25
+    limiter.acquire()
+
+    assert clock.slept == pytest.approx([0.5, 0.25])
+
+
+def test_RateLimiter_間隔が空いていれば待たない():
+    clock = FakeClock()
+    limiter = RateLimiter(1.0, clock=clock, sleep=clock.sleep)
+
+    limiter.acquire()
+    clock.now += 5.0
+
+    assert limiter.acquire() == 0
+    assert clock.slept == []
+
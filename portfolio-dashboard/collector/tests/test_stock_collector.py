@@ -0,0 +1,76 @@
+"""collectors.stock_collector の一括取得のユニットテスト。
+
+日足ストアはスタブのダウンローダーを注入した一時 DB に差し替え、
+ネットワークには触れない。
+"""
+
+from __future__ import annotations
+
+from datetime import date
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from collectors.price_history import PriceStore
+from collectors.stock_collector import StockDataCollector
+
+FIELDS = ["Open", "High", "Low", "Close", "Adj Close", "Volume"]
+
+
+def _frame(closes: list[float]) -> pd.DataFrame:
+    days = pd.bdate_range("2024-01-01", periods=len(closes))
+    rows = [[c, c + 1, c - 1, c, c, 1000] for c in closes]
+    return pd.DataFrame(rows, index=days, columns=FIELDS, dtype=float)
+
+
+@pytest.fixture
+def calls(tmp_path):
+    recorded: list[list[str]] = []
+
+    def downloader(symbols: list[str], start: date, end: date) -> dict:
+        recorded.append(list(symbols))
+        return {s: _frame([10.0, 11.0]) for s in symbols if s != "MISSING"}
+
+    store = PriceStore(tmp_path / "prices.db", downloader=downloader)
+    with patch("collectors.stock_collector.get_price_store", return_value=store):
+        yield recorded
+    store.close()
+
+
+def test_get_stock_data_batch_は1回の取得で全銘柄を返す(calls):
+    collector = StockDataCollector()
+    frames = collector.get_stock_data_batch(["AAPL", "MSFT", "AAPL"], 2024, 1)
+
+    assert calls == [["AAPL", "MSFT"]]
+    assert set(frames) == {"AAPL", "MSFT"}
+
+    metrics = collector.calculate_stock_metrics(
+        frames["AAPL"], "AAPL", 10.0, 1.0, 1, convert_to_jpy=False
+    )
+    assert metrics is not None
+    assert metrics["month_end_price_foreign"] == pytest.approx(11.0)
+
+
+def test_get_stock_data_batch_取得できない銘柄は含めない(calls):
+    frames = StockDataCollector().get_stock_data_batch(["AAPL", "MISSING"], 2024, 1)
+    assert set(frames) == {"AAPL"}
+
+
+def test_get_stock_data_取得済みの月は通信しない(calls):
+    collector = StockDataCollector()
+    collector.get_stock_data_batch(["AAPL"], 2024, 1)
+    data = collector.get_stock_data("AAPL", 2024, 1)
+
+    assert calls == [["AAPL"]]
+    assert data is not None
+    assert list(data["Close"]) == [10.0, 11.0]
+
+
+def test_prefetch_stock_data_後の月ごとの取得は通信しない(calls):
+    collector = StockDataCollector()
+    collector.prefetch_stock_data(["AAPL", "MSFT"], 2024, 1, 2024, 3)
+    for month in (1, 2, 3):
+        collector.get_stock_data_batch(["AAPL", "MSFT"], 2024, month)
+
+    assert calls == [["AAPL", "MSFT"]]
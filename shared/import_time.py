@@ -0,0 +1,28 @@
+"""python -X importtime によるインポート時間の計測
+portfolio-dashboard/collector と web-app/backend の起動時インポートのテストで使用
+
+別プロセスでモジュールをインポートし、読み込まれたモジュールごとの
+累積時間を返す。
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+
+def measure_import_time(module: str, cwd: str | Path) -> dict[str, int]:
+    """cwd で module をインポートし、{モジュール名: 累積時間(us)} を返す"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    timings: dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self, cumulative, name = line.removeprefix("import time:").split("|")
+        timings[name.strip()] = int(cumulative)
+    return timings
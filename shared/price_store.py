@@ -0,0 +1,381 @@
+"""日次 OHLCV のローカルストア（SQLite）
+portfolio-dashboard/collector と data-collector の両方で使用
+
+(銘柄, 日付) をキーに日足を保存し、銘柄ごとに取得済みの期間（連続した 1 区間）を
+記録する。要求された期間のうち取得済みの区間の外側だけを yfinance から取り足すため、
+月次バッチやバックフィルで通信するのは新しい日の分だけになる。
+
+価格は未調整（auto_adjust=False）で保存し、調整後終値（Adj Close）も持つ。
+取り足すときは取得済み区間の端の日も取り直して比較する。終値が変わっていれば
+（株式分割で過去の値が調整し直された）その銘柄を丸ごと取り直し、調整後終値だけが
+変わっていれば（配当）端の日の新旧の比で保存済みの調整後終値を掛け直す。
+
+yfinance が何も返さなかった銘柄（上場廃止・誤ったティッカー）は、その期間を
+当日中は取り直さない。
+"""
+
+from __future__ import annotations
+
+import math
+import sqlite3
+import threading
+from collections.abc import Callable, Iterable
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# DataFrame の列（yfinance の history / download と同じ名前）
+COLUMNS = ["Open", "High", "Low", "Close", "Adj Close", "Volume"]
+
+# 取得済みの日の値が変わったとみなす相対誤差
+REVISION_TOLERANCE = 1e-4
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS daily_prices (
+    symbol TEXT NOT NULL,
+    date TEXT NOT NULL,
+    open REAL,
+    high REAL,
+    low REAL,
+    close REAL NOT NULL,
+    adj_close REAL,
+    volume REAL,
+    PRIMARY KEY (symbol, date)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS price_coverage (
+    symbol TEXT PRIMARY KEY,
+    start TEXT NOT NULL,
+    end TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS price_misses (
+    symbol TEXT NOT NULL,
+    start TEXT NOT NULL,
+    end TEXT NOT NULL,
+    checked TEXT NOT NULL,
+    PRIMARY KEY (symbol, start, end)
+) WITHOUT ROWID;
+"""
+
+DateLike = date | datetime | str
+Downloader = Callable[[list[str], date, date], dict]
+
+
+def _to_date(value: DateLike) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
+
+
+def _to_float(value: object) -> float | None:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(number) else number
+
+
+def split_by_ticker(
+    data: pd.DataFrame | None, symbols: list[str]
+) -> dict[str, pd.DataFrame]:
+    """yf.download(group_by="ticker") の結果を銘柄ごとの DataFrame に分ける
+
+    取得できなかった銘柄（列がない・全行欠損）は結果に含めない。
+    """
+    frames: dict[str, pd.DataFrame] = {}
+    if data is None or data.empty:
+        return frames
+    multi = data.columns.nlevels > 1
+    tickers = set(data.columns.get_level_values(0)) if multi else set()
+    for symbol in symbols:
+        if multi:
+            if symbol not in tickers:
+                continue
+            frame = data[symbol]
+        elif len(symbols) == 1:
+            frame = data
+        else:
+            continue
+        # 他銘柄の営業日に合わせて入る欠損行を落とす
+        frame = frame.dropna(how="all")
+        if not frame.empty:
+            frames[symbol] = frame
+    return frames
+
+
+def download_daily(
+    symbols: list[str], start: date, end: date
+) -> dict[str, pd.DataFrame]:
+    """symbols の日足を yf.download 1 回で取得する（end は含まない）"""
+    import yfinance as yf
+
+    data = yf.download(
+        symbols,
+        start=start.isoformat(),
+        end=end.isoformat(),
+        auto_adjust=False,
+        actions=False,
+        group_by="ticker",
+        progress=False,
+        threads=True,
+    )
+    return split_by_ticker(data, symbols)
+
+
+def _rows(frame: pd.DataFrame) -> list[tuple]:
+    """DataFrame を (日付, open, high, low, close, adj_close, volume) の行にする"""
+    adj = frame["Adj Close"] if "Adj Close" in frame.columns else frame["Close"]
+    rows = []
+    for ts, o, h, low, c, a, v in zip(
+        frame.index,
+        frame["Open"],
+        frame["High"],
+        frame["Low"],
+        frame["Close"],
+        adj,
+        frame["Volume"],
+        strict=True,
+    ):
+        close = _to_float(c)
+        if close is None:
+            continue
+        rows.append((
+            ts.strftime("%Y-%m-%d"),
+            _to_float(o),
+            _to_float(h),
+            _to_float(low),
+            close,
+            _to_float(a),
+            _to_float(v),
+        ))
+    return rows
+
+
+def _revised(old: float | None, new: float | None) -> bool:
+    if old is None or new is None:
+        return old is not new
+    return abs(new - old) > REVISION_TOLERANCE * max(abs(old), 1e-9)
+
+
+class PriceStore:
+    """(銘柄, 日付) をキーにした日次 OHLCV のストア
+
+    スレッド間で共有してよい（DB 操作はロックで直列化する）。
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        downloader: Downloader = download_daily,
+        today: Callable[[], date] = date.today,
+    ) -> None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(path), timeout=10, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(_SCHEMA)
+        self._downloader = downloader
+        self._today = today
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def coverage(self, symbol: str) -> tuple[date, date] | None:
+        """取得済みの期間 (開始日, 終了日) を返す（未取得なら None）"""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT start, end FROM price_coverage WHERE symbol = ?", (symbol,)
+            ).fetchone()
+        return None if row is None else (_to_date(row[0]), _to_date(row[1]))
+
+    def history(
+        self,
+        symbol: str,
+        start: DateLike,
+        end: DateLike,
+        adjusted: bool = False,
+    ) -> pd.DataFrame:
+        """start〜end（両端を含む）の日足を DataFrame で返す。足りない分は取り足す"""
+        return self.histories([symbol], start, end, adjusted)[symbol]
+
+    def histories(
+        self,
+        symbols: Iterable[str],
+        start: DateLike,
+        end: DateLike,
+        adjusted: bool = False,
+    ) -> dict[str, pd.DataFrame]:
+        """複数銘柄の日足を {銘柄: DataFrame} で返す
+
+        取り足しが必要な銘柄は、不足している期間が同じものごとに
+        yf.download 1 回でまとめて取得する。取得できなかった銘柄は空の DataFrame。
+        adjusted=True なら Adj Close / Close の比で OHLC を調整する
+        （yfinance の auto_adjust=True 相当）。
+        """
+        symbols = list(dict.fromkeys(symbols))
+        start, end = _to_date(start), _to_date(end)
+        self.top_up(symbols, start, end)
+        return {s: self.load(s, start, end, adjusted) for s in symbols}
+
+    def top_up(self, symbols: list[str], start: date, end: date) -> None:
+        """symbols の start〜end のうち未取得の期間だけを取得して保存する"""
+        plans: dict[tuple[date, date], list[str]] = {}
+        for symbol in symbols:
+            for span in self._missing(symbol, start, end):
+                plans.setdefault(span, []).append(symbol)
+
+        revised: list[str] = []
+        for (fetch_start, fetch_end), group in plans.items():
+            frames = self._fetch(group, fetch_start, fetch_end)
+            if frames is None:
+                continue
+            for symbol in group:
+                frame = frames.get(symbol)
+                if frame is None or frame.empty:
+                    self._record_miss(symbol, fetch_start, fetch_end)
+                elif not self._merge(symbol, _rows(frame), fetch_start, fetch_end):
+                    revised.append(symbol)
+
+        if revised:
+            # 分割で調整し直された銘柄は保存済みの値を捨てて、要求期間を取り直す
+            print(f"  🔁 過去の株価が調整されたため取り直します: {', '.join(revised)}")
+            frames = self._fetch(revised, start, end) or {}
+            for symbol in revised:
+                frame = frames.get(symbol)
+                if frame is not None and not frame.empty:
+                    self._merge(symbol, _rows(frame), start, end)
+
+    def load(
+        self, symbol: str, start: DateLike, end: DateLike, adjusted: bool = False
+    ) -> pd.DataFrame:
+        """保存済みの日足だけを DataFrame で返す（通信しない）"""
+        import pandas as pd
+
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT date, open, high, low, close, adj_close, volume"
+                " FROM daily_prices WHERE symbol = ? AND date BETWEEN ? AND ?"
+                " ORDER BY date",
+                (symbol, _to_date(start).isoformat(), _to_date(end).isoformat()),
+            ).fetchall()
+        frame = pd.DataFrame(
+            [row[1:] for row in rows],
+            index=pd.DatetimeIndex([row[0] for row in rows], name="Date"),
+            columns=COLUMNS,
+            dtype=float,
+        )
+        if adjusted and not frame.empty:
+            factor = (frame["Adj Close"] / frame["Close"]).fillna(1.0)
+            for column in ("Open", "High", "Low", "Close"):
+                frame[column] = frame[column] * factor
+        return frame
+
+    def _missing(self, symbol: str, start: date, end: date) -> list[tuple[date, date]]:
+        """取得が必要な期間のリスト（取得済み区間の端の日を含めて比較に使う）"""
+        covered = self.coverage(symbol)
+        if covered is None:
+            spans = [(start, end)]
+        else:
+            spans = []
+            if start < covered[0]:
+                spans.append((start, covered[0]))
+            if end > covered[1]:
+                spans.append((covered[1], end))
+        # 当日中に何も返らなかった期間は取り直さない
+        with self._lock:
+            missed = {
+                (_to_date(s), _to_date(e))
+                for s, e in self.conn.execute(
+                    "SELECT start, end FROM price_misses"
+                    " WHERE symbol = ? AND checked = ?",
+                    (symbol, self._today().isoformat()),
+                )
+            }
+        return [span for span in spans if span not in missed]
+
+    def _record_miss(self, symbol: str, start: date, end: date) -> None:
+        """取得は成功したが何も返らなかった期間を記録する"""
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO price_misses (symbol, start, end, checked)"
+                " VALUES (?, ?, ?, ?)",
+                (symbol, start.isoformat(), end.isoformat(), self._today().isoformat()),
+            )
+
+    def _fetch(self, symbols: list[str], start: date, end: date) -> dict | None:
+        """取得に失敗したら None（通信エラーは取得済みにも未取得の記録にもしない）"""
+        try:
+            return self._downloader(symbols, start, end + timedelta(days=1))
+        except Exception as e:
+            print(f"⚠️ 日足の取得エラー ({', '.join(symbols)}): {e}")
+            return None
+
+    def _merge(
+        self, symbol: str, rows: list[tuple], fetch_start: date, fetch_end: date
+    ) -> bool:
+        """取得した行を保存し、取得済み期間を広げる
+
+        取得済み期間内の日の終値が保存済みと違えば何も保存せず、保存済みの値と
+        期間を消して False を返す。調整後終値だけが違う場合は、その日の新旧の比で
+        保存済みの調整後終値を掛け直してから保存する。
+        """
+        # 当日分は確定していないため、取得済み期間は前日までにする
+        last_complete = min(fetch_end, self._today() - timedelta(days=1))
+        with self._lock, self.conn:
+            row = self.conn.execute(
+                "SELECT start, end FROM price_coverage WHERE symbol = ?", (symbol,)
+            ).fetchone()
+            if row is not None:
+                stored = {
+                    d: (c, a)
+                    for d, c, a in self.conn.execute(
+                        "SELECT date, close, adj_close FROM daily_prices"
+                        " WHERE symbol = ? AND date BETWEEN ? AND ?",
+                        (symbol, row[0], row[1]),
+                    )
+                }
+                ratio = None
+                for d, _o, _h, _l, close, adj, _v in rows:
+                    old = stored.get(d)
+                    if old is None:
+                        continue
+                    if _revised(old[0], close):
+                        self.conn.execute(
+                            "DELETE FROM daily_prices WHERE symbol = ?", (symbol,)
+                        )
+                        self.conn.execute(
+                            "DELETE FROM price_coverage WHERE symbol = ?", (symbol,)
+                        )
+                        return False
+                    if ratio is None and old[1] and adj is not None:
+                        ratio = adj / old[1]
+                if ratio is not None and _revised(1.0, ratio):
+                    # 保存後に権利落ちした配当の分だけ過去の調整後終値が下がる
+                    self.conn.execute(
+                        "UPDATE daily_prices SET adj_close = adj_close * ?"
+                        " WHERE symbol = ?",
+                        (ratio, symbol),
+                    )
+
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO daily_prices"
+                " (symbol, date, open, high, low, close, adj_close, volume)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(symbol, *r) for r in rows],
+            )
+            if row is not None:
+                new_start = min(_to_date(row[0]), fetch_start)
+                new_end = max(_to_date(row[1]), last_complete)
+            else:
+                new_start, new_end = fetch_start, last_complete
+            if new_start <= new_end:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO price_coverage (symbol, start, end)"
+                    " VALUES (?, ?, ?)",
+                    (symbol, new_start.isoformat(), new_end.isoformat()),
+                )
+        return True
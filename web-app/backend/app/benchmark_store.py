@@ -0,0 +1,247 @@
+"""ベンチマーク指数（日経225・S&P500）の月次終値ローカルストア
+
+確定済みの月（当月より前）の終値は変わらないため一度保存したら再取得しない。
+未保存の月と当月だけを yfinance から取得して SQLite に追記する。
+当月かどうかは指数ごとに取引所の現地時間で判定する（JST の月初でも
+ニューヨークがまだ前月なら S&P500 の前月は確定させない）。
+yfinance に繋がらない場合は保存済みの値だけで応答する。
+"""
+
+import logging
+import math
+import sqlite3
+import time
+from contextlib import closing
+from datetime import UTC, date, datetime
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+from app.cache_backend import get_cache_backend
+from app.metrics import timed
+
+# web-app/backend/data/benchmark.db
+_DB_PATH = Path(__file__).resolve().parent.parent / "data" / "benchmark.db"
+
+# 列名 → yfinance ティッカー
+INDEX_SYMBOLS = {"nikkei225": "^N225", "sp500": "^GSPC"}
+# 列名 → 取引所のタイムゾーン（月の確定はその地の日付で判定する）
+INDEX_TIMEZONES = {"nikkei225": "Asia/Tokyo", "sp500": "America/New_York"}
+
+# 未確定の月・欠損月を再取得する最短間隔（秒）
+REFRESH_INTERVAL = 3600
+# 取得に失敗した（何も保存できなかった）あと再試行するまでの間隔（秒）
+RETRY_INTERVAL = 300
+
+# 複数ワーカーで同時に取得しないためのリースと、その保持上限（秒）
+DOWNLOAD_LEASE = "benchmark-download"
+LEASE_TTL = 60.0
+
+logger = logging.getLogger(__name__)
+
+# このプロセスで最後に取得に失敗した時刻（失敗は fetch_log に残さない）
+_failed_at: float | None = None
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS index_closes (
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    nikkei225 REAL,
+    sp500 REAL,
+    closed INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (year, month)
+);
+CREATE TABLE IF NOT EXISTS fetch_log (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    fetched_at REAL NOT NULL,
+    start_year INTEGER NOT NULL,
+    start_month INTEGER NOT NULL
+);
+"""
+
+
+def _connect() -> sqlite3.Connection:
+    _DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(_DB_PATH, timeout=10)
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def _months_between(
+    start: tuple[int, int], end: tuple[int, int]
+) -> list[tuple[int, int]]:
+    """start から end までの (年, 月) を昇順で返す（両端を含む）"""
+    months = []
+    year, month = start
+    while (year, month) <= end:
+        months.append((year, month))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+def _now() -> datetime:
+    return datetime.now(UTC)
+
+
+def _current_months(today: date | None = None) -> dict[str, tuple[int, int]]:
+    """列ごとの当月 (年, 月)。today を渡すと全取引所でその日の月とする"""
+    if today is not None:
+        return {column: (today.year, today.month) for column in INDEX_SYMBOLS}
+    now = _now()
+    months = {}
+    for column, tz in INDEX_TIMEZONES.items():
+        local = now.astimezone(ZoneInfo(tz))
+        months[column] = (local.year, local.month)
+    return months
+
+
+def _to_close(value) -> float | None:
+    try:
+        close = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(close) or close == 0 else close
+
+
+def _download(start: tuple[int, int]) -> dict[tuple[int, int], dict]:
+    """start の月以降の月次終値を yfinance から取得する"""
+    import yfinance as yf
+
+    with timed("yfinance", "download"):
+        df = yf.download(
+            " ".join(INDEX_SYMBOLS.values()),
+            start=f"{start[0]}-{start[1]:02d}-01",
+            interval="1mo",
+            auto_adjust=True,
+            progress=False,
+        )["Close"]
+    closes: dict[tuple[int, int], dict] = {}
+    for ts, row in df.iterrows():
+        closes[(ts.year, ts.month)] = {
+            column: _to_close(row.get(symbol))
+            for column, symbol in INDEX_SYMBOLS.items()
+        }
+    return closes
+
+
+def _fetch_pending(
+    conn: sqlite3.Connection,
+    start: tuple[int, int],
+    current: dict[str, tuple[int, int]],
+    stored: dict[tuple[int, int], tuple],
+) -> bool:
+    """start 月以降を取得して保存し、stored も更新する
+
+    終値を 1 件も保存できなかった（取得失敗・空）場合は fetch_log を書かずに
+    False を返す。fetch_log はデータのバージョンを兼ねるため、失敗で
+    ETag を変えず、取得間隔の制限にも数えない。
+    """
+    try:
+        fetched = _download(start)
+    except Exception:
+        logger.exception("ベンチマーク指数の取得に失敗しました")
+        fetched = {}
+    rows = []
+    for (y, m), values in fetched.items():
+        if (y, m) < start:
+            continue
+        complete = all(v is not None for v in values.values())
+        # どちらの取引所でも月が明けてから確定扱いにする
+        closed = complete and all((y, m) < month for month in current.values())
+        rows.append((y, m, values["nikkei225"], values["sp500"], int(closed)))
+    if not rows:
+        return False
+    with conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO index_closes"
+            " (year, month, nikkei225, sp500, closed)"
+            " VALUES (?, ?, ?, ?, ?)",
+            rows,
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO fetch_log"
+            " (id, fetched_at, start_year, start_month) VALUES (1, ?, ?, ?)",
+            (time.time(), *start),
+        )
+    for y, m, n225, sp500, closed in rows:
+        stored[(y, m)] = (n225, sp500, bool(closed))
+    return True
+
+
+def data_version() -> str:
+    """保存済みの終値のバージョン（最後に取得して書き込んだ時刻）
+
+    index_closes は取得のたびに fetch_log と同じトランザクションで書くため、
+    fetch_log.fetched_at が変わらなければ終値も変わっていない。
+    通信も終値の読み込みもしないので ETag の計算に使える。
+    """
+    with closing(_connect()) as conn:
+        row = conn.execute("SELECT fetched_at FROM fetch_log").fetchone()
+    return "" if row is None else repr(row[0])
+
+
+def refresh_if_due(start_year: int, start_month: int) -> None:
+    """取得間隔を過ぎていれば start 月以降の未確定の月を取り足す
+
+    /api/benchmark の ETag 計算から呼ぶ。If-None-Match が一致し続けて本体が
+    実行されない間も、当月の終値が REFRESH_INTERVAL ごとに更新されるようにする。
+    間隔内なら fetch_log を 1 行読むだけで終わる。
+    """
+    if _failed_at is not None and time.time() - _failed_at < RETRY_INTERVAL:
+        return
+    with closing(_connect()) as conn:
+        last = conn.execute(
+            "SELECT fetched_at, start_year, start_month FROM fetch_log"
+        ).fetchone()
+    if (
+        last is not None
+        and time.time() - last[0] < REFRESH_INTERVAL
+        and (start_year, start_month) >= (last[1], last[2])
+    ):
+        return
+    get_monthly_closes(start_year, start_month)
+
+
+def get_monthly_closes(
+    start_year: int, start_month: int, today: date | None = None
+) -> dict[tuple[int, int], dict]:
+    """start 月以降の {(年, 月): {"nikkei225": 終値, "sp500": 終値}} を返す"""
+    global _failed_at
+    current = _current_months(today)
+    start = (start_year, start_month)
+
+    with closing(_connect()) as conn:
+        rows = conn.execute(
+            "SELECT year, month, nikkei225, sp500, closed FROM index_closes"
+            " WHERE (year, month) >= (?, ?) ORDER BY year, month",
+            start,
+        ).fetchall()
+        stored = {(y, m): (n225, sp500, closed) for y, m, n225, sp500, closed in rows}
+
+        # 確定済みとして保存されていない月（当月を含む）だけを取り直す
+        pending = [
+            ym for ym in _months_between(start, max(current.values()))
+            if ym not in stored or not stored[ym][2]
+        ]
+        # 直近の取得でカバー済みの範囲は REFRESH_INTERVAL の間は取り直さない
+        last = conn.execute(
+            "SELECT fetched_at, start_year, start_month FROM fetch_log"
+        ).fetchone()
+        throttled = (
+            last is not None
+            and time.time() - last[0] < REFRESH_INTERVAL
+            and pending
+            and pending[0] >= (last[1], last[2])
+        ) or (_failed_at is not None and time.time() - _failed_at < RETRY_INTERVAL)
+        backend = get_cache_backend()
+        # 他のワーカー（スレッド）が取得中なら保存済みの値で応答する
+        if pending and not throttled and backend.acquire(DOWNLOAD_LEASE, LEASE_TTL):
+            try:
+                saved = _fetch_pending(conn, pending[0], current, stored)
+                _failed_at = None if saved else time.time()
+            finally:
+                backend.release(DOWNLOAD_LEASE)
+
+    return {
+        ym: {"nikkei225": n225, "sp500": sp500}
+        for ym, (n225, sp500, _closed) in sorted(stored.items())
+    }
@@ -0,0 +1,192 @@
+"""パース済みスナップショットを保持するキャッシュバックエンド
+
+uvicorn を複数ワーカーで動かすと、ワーカーごとに Sheets を読み込み・
+パースし直してしまう。バックエンドにパース済みデータとバージョンを置き、
+更新は「リース」を取れた 1 ワーカーだけが行うことで、全ワーカーが
+1 回の取得結果を共有する。
+
+- MemoryBackend: プロセス内（既定。単一ワーカー向け）
+- SqliteBackend: SQLite ファイル（同じホスト上の複数ワーカーで共有）
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Protocol
+
+import orjson
+
+# web-app/backend/data/cache.db
+DEFAULT_SQLITE_PATH = Path(__file__).resolve().parent.parent / "data" / "cache.db"
+
+
+@dataclass(frozen=True)
+class StoredSnapshot:
+    value: Any
+    version: str
+    stored_at: float   # 格納時刻（time.time()）
+
+    @property
+    def age(self) -> float:
+        return max(0.0, time.time() - self.stored_at)
+
+
+class CacheBackend(Protocol):
+    # 複数プロセスで共有されるか（False ならシートキャッシュ自体が唯一の保持先）
+    shared: bool
+
+    def load(self, key: str) -> StoredSnapshot | None:
+        """key の格納値を返す（なければ None）"""
+        ...
+
+    def save(self, key: str, value: Any, version: str) -> None:
+        """key に値とバージョンを格納する（格納時刻は現在時刻）"""
+        ...
+
+    def acquire(self, name: str, ttl: float) -> bool:
+        """リース name を ttl 秒間取得する。他者が保持中なら False"""
+        ...
+
+    def release(self, name: str) -> None:
+        """自分が保持しているリース name を手放す"""
+        ...
+
+
+class MemoryBackend:
+    """プロセス内の辞書に保持するバックエンド"""
+
+    shared = False
+
+    def __init__(self) -> None:
+        self._values: dict[str, StoredSnapshot] = {}
+        self._leases: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def load(self, key: str) -> StoredSnapshot | None:
+        with self._lock:
+            return self._values.get(key)
+
+    def save(self, key: str, value: Any, version: str) -> None:
+        with self._lock:
+            self._values[key] = StoredSnapshot(value, version, time.time())
+
+    def acquire(self, name: str, ttl: float) -> bool:
+        now = time.time()
+        with self._lock:
+            if self._leases.get(name, 0.0) > now:
+                return False
+            self._leases[name] = now + ttl
+            return True
+
+    def release(self, name: str) -> None:
+        with self._lock:
+            self._leases.pop(name, None)
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    key TEXT PRIMARY KEY,
+    version TEXT NOT NULL,
+    data BLOB NOT NULL,
+    stored_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS leases (
+    name TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+
+class SqliteBackend:
+    """SQLite ファイルに保持するバックエンド（複数プロセスで共有できる）
+
+    値は orjson でエンコードして保存する（JSON で表せる値のみ）。
+    """
+
+    shared = True
+
+    def __init__(self, path: str | Path = DEFAULT_SQLITE_PATH) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # リースの所有者（プロセス＋インスタンス単位）
+        self._owner = f"{os.getpid()}-{uuid.uuid4().hex}"
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # 接続はスレッドごとに 1 本を使い回す
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA busy_timeout=10000")
+            self._local.conn = conn
+        return conn
+
+    def load(self, key: str) -> StoredSnapshot | None:
+        row = self._connect().execute(
+            "SELECT data, version, stored_at FROM snapshots WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        data, version, stored_at = row
+        return StoredSnapshot(orjson.loads(data), version, stored_at)
+
+    def save(self, key: str, value: Any, version: str) -> None:
+        self._connect().execute(
+            "INSERT OR REPLACE INTO snapshots (key, version, data, stored_at)"
+            " VALUES (?, ?, ?, ?)",
+            (key, version, orjson.dumps(value), time.time()),
+        )
+
+    def acquire(self, name: str, ttl: float) -> bool:
+        now = time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT owner, expires_at FROM leases WHERE name = ?", (name,)
+            ).fetchone()
+            if row is not None and row[1] > now:
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO leases (name, owner, expires_at)"
+                " VALUES (?, ?, ?)",
+                (name, self._owner, now + ttl),
+            )
+            return True
+        finally:
+            conn.execute("COMMIT")
+
+    def release(self, name: str) -> None:
+        self._connect().execute(
+            "DELETE FROM leases WHERE name = ? AND owner = ?", (name, self._owner)
+        )
+
+
+def create_cache_backend(kind: str, path: str | None = None) -> CacheBackend:
+    """設定値（"memory" / "sqlite"）からバックエンドを作る"""
+    if kind == "memory":
+        return MemoryBackend()
+    if kind == "sqlite":
+        return SqliteBackend(path or DEFAULT_SQLITE_PATH)
+    raise ValueError(f"未知のキャッシュバックエンドです: {kind}")
+
+
+_backend: CacheBackend = MemoryBackend()
+
+
+def get_cache_backend() -> CacheBackend:
+    return _backend
+
+
+def set_cache_backend(backend: CacheBackend) -> None:
+    """使用するバックエンドを差し替える（起動時に設定から選ぶ）"""
+    global _backend
+    _backend = backend
@@ -0,0 +1,160 @@
+"""レスポンスの gzip / Brotli 圧縮ミドルウェア
+
+Accept-Encoding に応じて br（brotli パッケージがあれば）または gzip で
+本文を圧縮する。minimum_size 未満の本文・圧縮に向かない Content-Type・
+ストリーミング（NDJSON / SSE）はそのまま返す。圧縮しなかったレスポンスにも
+Vary: Accept-Encoding を付け、共有キャッシュが常に同じキーで保存するようにする。
+
+ETag 付きのレスポンスは (ETag, エンコーディング) をキーに圧縮済みの本文を
+保持する。ETag はスナップショットのバージョンとリクエストから作られるため、
+データが変わらない間は同じレスポンスを圧縮し直さない。
+"""
+
+import gzip
+import threading
+from collections import OrderedDict
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# 圧縮する Content-Type（前方一致）
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "text/",
+)
+
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    """Accept-Encoding から使うエンコーディングを選ぶ（br を優先）"""
+    accepted: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    if brotli is not None and accepted.get("br", 0) > 0:
+        return "br"
+    if accepted.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+
+class CompressionMiddleware:
+    """本文を圧縮し、ETag ごとに圧縮結果を再利用する ASGI ミドルウェア"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 5,
+        cache_size: int = 128,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.cache_size = cache_size
+        self._cache: OrderedDict[tuple[str, str], bytes] = OrderedDict()
+        self._lock = threading.Lock()
+        self.cache_hits = 0
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            # choose_encoding は brotli がある場合にだけ br を選ぶ
+            assert brotli is not None
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    def _cached_compress(self, etag: str | None, body: bytes, encoding: str) -> bytes:
+        if etag is None:
+            return self.compress(body, encoding)
+        key = (etag, encoding)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+                return cached
+        compressed = self.compress(body, encoding)
+        with self._lock:
+            self._cache[key] = compressed
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return compressed
+
+    def _should_compress(self, start: Message, body: bytes) -> bool:
+        headers = Headers(raw=start["headers"])
+        content_type = headers.get("content-type", "")
+        return (
+            200 <= start["status"] < 300
+            and start["status"] != 204
+            and "content-encoding" not in headers
+            and content_type.startswith(COMPRESSIBLE_TYPES)
+            and len(body) >= self.minimum_size
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+
+            async def send_with_vary(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    MutableHeaders(scope=message).add_vary_header("Accept-Encoding")
+                await send(message)
+
+            await self.app(scope, receive, send_with_vary)
+            return
+
+        start: Message | None = None
+        chunks: list[bytes] = []
+        streaming = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, streaming
+            if streaming or message["type"] not in (
+                "http.response.start",
+                "http.response.body",
+            ):
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                # 本文を見てから圧縮するか決めるため送信を保留する
+                start = message
+                MutableHeaders(scope=start).add_vary_header("Accept-Encoding")
+                return
+
+            assert start is not None
+            body = message.get("body", b"")
+            if message.get("more_body", False) and not chunks:
+                # ストリーミングは途中で止めずにそのまま流す
+                streaming = True
+                await send(start)
+                await send(message)
+                return
+            chunks.append(body)
+            if message.get("more_body", False):
+                return
+
+            body = b"".join(chunks)
+            headers = MutableHeaders(raw=start["headers"])
+            if self._should_compress(start, body):
+                body = self._cached_compress(headers.get("etag"), body, encoding)
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(body))
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
@@ -4,8 +4,29 @@ from pydantic_settings import BaseSettings
 
 
 class Settings(BaseSettings):
-    spreadsheet_id: str
-    google_application_credentials: str
+    # data_source=sheets のときに必須
+    spreadsheet_id: str = ""
+    google_application_credentials: str = ""
+    # シートデータの取得元（"sheets" / "sqlite"）
+    data_source: str = "sheets"
+    # data_source=sqlite のときの collector DB（省略時は collector の既定パス）
+    sqlite_db_path: str | None = None
+    # data_source=sqlite のときの読み取り接続プールの本数
+    sqlite_pool_size: int = 4
+    # シート変更を検知するポーリング間隔（秒）。0 で無効
+    sheets_poll_interval: float = 60
+    # パース済みシート・ベンチマーク取得の共有先（"memory" / "sqlite"）
+    cache_backend: str = "memory"
+    # cache_backend=sqlite のときのファイルパス（省略時は data/cache.db）
+    cache_path: str | None = None
+    # Sheets API を 1 分間に呼び出してよい回数（0 で無制限）
+    sheets_quota_per_minute: int = 60
+    # 予算切れのとき補充を待つ最長時間（秒）。過ぎたら前回の結果を返す
+    sheets_quota_wait: float = 5.0
+    # 429 / 5xx を再試行する回数
+    sheets_max_retries: int = 4
+    # この大きさ（バイト）未満のレスポンスは圧縮しない
+    compression_min_size: int = 1024
 
     model_config = {"env_file": ".env"}
 
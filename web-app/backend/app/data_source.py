@@ -0,0 +1,237 @@
+"""シートデータの取得元（Google Sheets / collector の SQLite DB）
+
+どちらの取得元もシートと同じ列名（SHEET_NAMES のキーごとの HEADERS）の
+レコードを返すので、各フェッチャーのパーサー・キャッシュ・バージョン計算は
+取得元に関係なく共通で使える。
+
+- SheetsDataSource: values_batch_get による一括取得（既定）
+- SqliteDataSource: portfolio-dashboard の collector が書き込む SQLite DB を
+  読み取り専用で参照する（Sheets API のクォータを消費しない）
+"""
+
+import queue
+import sqlite3
+from collections.abc import Generator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Protocol
+
+from app import benchmark_store
+from app.sheets import client
+
+# portfolio-dashboard/data/portfolio.db（collector の既定 DB_PATH）
+_REPO_ROOT = Path(__file__).resolve().parents[3]
+DEFAULT_DB_PATH = _REPO_ROOT / "portfolio-dashboard" / "data" / "portfolio.db"
+
+# SHEET_NAMES のキー → シートの列名で読み出す SELECT 文
+_QUERIES: dict[str, str] = {
+    "PERFORMANCE": """
+        SELECT date AS "日付", code AS "銘柄コード", name AS "銘柄名",
+               acquired_price AS "取得単価", current_price AS "月末価格",
+               shares AS "保有株数", cost AS "取得額", value AS "評価額",
+               profit AS "損益", profit_rate AS "損益率(%)",
+               updated_at AS "更新日時", currency AS "通貨",
+               acquired_price_foreign AS "取得単価（外貨）",
+               current_price_foreign AS "月末価格（外貨）",
+               acquired_exchange_rate AS "取得時為替レート",
+               current_exchange_rate AS "現在為替レート"
+        FROM monthly_pnl ORDER BY date, id
+    """,
+    "PORTFOLIO": """
+        SELECT code AS "銘柄コード", name AS "銘柄名", acquired_date AS "取得日",
+               acquired_price_jpy AS "取得単価（円）",
+               acquired_price_foreign AS "取得単価（外貨）",
+               acquired_exchange_rate AS "取得時為替レート",
+               shares AS "保有株数",
+               acquired_price_jpy * shares AS "取得額合計",
+               currency AS "通貨",
+               CASE WHEN is_foreign THEN '○' ELSE '' END AS "外国株フラグ",
+               updated_at AS "最終更新", memo AS "備考"
+        FROM holdings ORDER BY id
+    """,
+    "DATA_RECORD": """
+        SELECT date AS "月末日付", code AS "銘柄コード", price_jpy AS "月末価格（円）",
+               high AS "最高値", low AS "最安値", average AS "平均価格",
+               change_rate AS "月間変動率(%)", avg_volume AS "平均出来高",
+               created_at AS "取得日時"
+        FROM monthly_prices ORDER BY date, id
+    """,
+    "CURRENCY": """
+        SELECT date AS "取得日", pair AS "通貨ペア", rate AS "レート",
+               prev_rate AS "前回レート", change_rate AS "変動率(%)",
+               high AS "最高値", low AS "最安値", updated_at AS "更新日時"
+        FROM exchange_rates ORDER BY date, id
+    """,
+    "DIVIDEND": """
+        SELECT date AS "受取日", code AS "銘柄コード", name AS "銘柄名",
+               dividend_foreign AS "1株配当（外貨）", shares AS "保有株数",
+               total_foreign AS "配当合計（外貨）", currency AS "通貨",
+               exchange_rate AS "為替レート", total_jpy AS "配当合計（円）"
+        FROM dividends ORDER BY date, id
+    """,
+}
+
+# benchmark_data の累積リターン（%）を指数値に換算する基準値
+_BENCHMARK_BASE = 100.0
+
+
+class DataSource(Protocol):
+    def load_snapshot(self, sheet_keys: list[str]) -> dict[str, list[dict]]:
+        """キーごとのレコード（シートと同じ列名の dict のリスト）を返す"""
+        ...
+
+    def last_update_time(self) -> str:
+        """データが変わると変わる文字列を返す（変更検知用）"""
+        ...
+
+    def monthly_closes(
+        self, start_year: int, start_month: int
+    ) -> dict[tuple[int, int], dict]:
+        """start 月以降の {(年, 月): {"nikkei225": 値, "sp500": 値}} を返す"""
+        ...
+
+    def benchmark_version(self, start_year: int, start_month: int) -> str:
+        """start 月以降の monthly_closes の結果が変わると変わる文字列を返す
+
+        終値そのものは読まない。取得間隔を過ぎていれば先に取り足してよい。
+        """
+        ...
+
+
+class SheetsDataSource:
+    """Google Sheets から読む取得元（ベンチマークは yfinance のローカルストア）"""
+
+    def load_snapshot(self, sheet_keys: list[str]) -> dict[str, list[dict]]:
+        return client.load_snapshot(sheet_keys)
+
+    def last_update_time(self) -> str:
+        return client.get_last_update_time()
+
+    def monthly_closes(
+        self, start_year: int, start_month: int
+    ) -> dict[tuple[int, int], dict]:
+        return benchmark_store.get_monthly_closes(start_year, start_month)
+
+    def benchmark_version(self, start_year: int, start_month: int) -> str:
+        benchmark_store.refresh_if_due(start_year, start_month)
+        return benchmark_store.data_version()
+
+
+class SqliteDataSource:
+    """collector の SQLite DB を読み取り専用で参照する取得元
+
+    DB は collector が WAL モードで書き込むため、読み取り中も書き込みを
+    妨げない。接続は pool_size 本までプールして使い回す。
+    """
+
+    def __init__(self, path: str | Path = DEFAULT_DB_PATH, pool_size: int = 4) -> None:
+        self.path = Path(path)
+        self._pool: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue(pool_size)
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            f"{self.path.resolve().as_uri()}?mode=ro",
+            uri=True,
+            timeout=10,
+            check_same_thread=False,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA query_only=1")
+        return conn
+
+    @contextmanager
+    def _connection(self) -> Generator[sqlite3.Connection]:
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self._open()
+        try:
+            yield conn
+        finally:
+            try:
+                self._pool.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def load_snapshot(self, sheet_keys: list[str]) -> dict[str, list[dict]]:
+        snapshot: dict[str, list[dict]] = {}
+        with self._connection() as conn:
+            # 全テーブルを 1 つの読み取りトランザクションで読み、同じ時点の値を揃える
+            conn.execute("BEGIN")
+            try:
+                for key in sheet_keys:
+                    query = _QUERIES.get(key)
+                    snapshot[key] = (
+                        [dict(row) for row in conn.execute(query)] if query else []
+                    )
+            finally:
+                conn.rollback()
+        return snapshot
+
+    def last_update_time(self) -> str:
+        # WAL への追記でも本体ファイルの更新でも変わるよう両方の mtime を使う
+        stamps = []
+        for suffix in ("", "-wal"):
+            path = self.path.with_name(self.path.name + suffix)
+            stamps.append(str(path.stat().st_mtime_ns) if path.exists() else "-")
+        return ":".join(stamps)
+
+    def benchmark_version(self, start_year: int, start_month: int) -> str:
+        # benchmark_data は同じ DB ファイルにあるため更新日時で足りる
+        return self.last_update_time()
+
+    def monthly_closes(
+        self, start_year: int, start_month: int
+    ) -> dict[tuple[int, int], dict]:
+        """benchmark_data の累積リターンを指数値（初月 = 100 基準）に換算して返す
+
+        ルーター側で起点の月を基準に比率を取り直すため、値の基準は問わない。
+        """
+        with self._connection() as conn:
+            rows = conn.execute(
+                "SELECT date, nikkei225, sp500 FROM benchmark_data"
+                " WHERE date >= ? ORDER BY date",
+                (f"{start_year}-{start_month:02d}",),
+            ).fetchall()
+
+        def level(value: float | None) -> float | None:
+            return None if value is None else _BENCHMARK_BASE + value
+
+        return {
+            (int(row["date"][:4]), int(row["date"][5:7])): {
+                "nikkei225": level(row["nikkei225"]),
+                "sp500": level(row["sp500"]),
+            }
+            for row in rows
+        }
+
+
+def create_data_source(
+    kind: str, path: str | None = None, pool_size: int = 4
+) -> DataSource:
+    """設定値（"sheets" / "sqlite"）から取得元を作る"""
+    if kind == "sheets":
+        return SheetsDataSource()
+    if kind == "sqlite":
+        return SqliteDataSource(path or DEFAULT_DB_PATH, pool_size=pool_size)
+    raise ValueError(f"未知のデータ取得元です: {kind}")
+
+
+_source: DataSource = SheetsDataSource()
+
+
+def get_data_source() -> DataSource:
+    return _source
+
+
+def set_data_source(source: DataSource) -> None:
+    """使用する取得元を差し替える（起動時に設定から選ぶ）"""
+    global _source
+    _source = source
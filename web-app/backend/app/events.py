@@ -0,0 +1,146 @@
+"""損益スナップショットの変更を Server-Sent Events で配信する
+
+シートキャッシュの PERFORMANCE が別の版に置き換わったとき、
+新旧の集計を比べた差分（KPI・変化した構成比の行・新しい履歴点）を
+1 回だけ計算し、接続中の全クライアントのキューに配る。
+"""
+
+import asyncio
+import logging
+import threading
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+from typing import Any
+
+import orjson
+
+from app.sheets.aggregates import PerformanceAggregates, build_performance_aggregates
+from app.sheets.cache import sheet_cache
+from app.sheets.performance import PerformanceFrame
+
+logger = logging.getLogger(__name__)
+
+# 1 クライアントが溜められる未送信イベント数（超えたら古いものから捨てる）
+QUEUE_SIZE = 16
+
+# 履歴点として送る項目（MonthlyProfitPoint と同じ）
+_POINT_FIELDS = (
+    "date", "code", "name", "profit", "value", "profitRate",
+    "currency", "stockProfit", "fxProfit",
+)
+
+
+def _kpi(agg: PerformanceAggregates) -> dict[str, Any]:
+    profit_rate = agg.total_profit / agg.total_cost * 100 if agg.total_cost else 0.0
+    return {
+        "totalValue": agg.total_value,
+        "totalProfit": agg.total_profit,
+        "profitRate": round(profit_rate, 2),
+        "baseDate": agg.latest_date,
+    }
+
+
+def _aggregates(records: list[dict] | None) -> PerformanceAggregates:
+    return build_performance_aggregates(PerformanceFrame.from_records(records or []))
+
+
+def performance_diff(
+    old_records: list[dict] | None, new_records: list[dict]
+) -> dict[str, Any]:
+    """新旧の損益レコードから配信用の差分を作る
+
+    - kpi: 新しい KPI（ダッシュボードの KpiSummary と同じ形）
+    - allocation: 追加・変化した構成比の行
+    - removedAllocation: 構成比から消えた銘柄名
+    - history: 追加・変化した (date, code) の履歴点
+    """
+    old_agg = _aggregates(old_records)
+    new_agg = _aggregates(new_records)
+
+    old_allocation = {a["name"]: a for a in old_agg.allocation}
+    allocation = [a for a in new_agg.allocation if old_allocation.get(a["name"]) != a]
+    new_names = {a["name"] for a in new_agg.allocation}
+    removed = [name for name in old_allocation if name not in new_names]
+
+    old_points = {
+        (r["date"], r["code"]): r for r in old_records or []
+    }
+    history = [
+        {f: r[f] for f in _POINT_FIELDS}
+        for r in new_records
+        if old_points.get((r["date"], r["code"])) != r
+    ]
+
+    return {
+        "kpi": _kpi(new_agg),
+        "allocation": allocation,
+        "removedAllocation": removed,
+        "history": history,
+    }
+
+
+def format_sse(event: str, data: Any, event_id: str | None = None) -> bytes:
+    """1 件の SSE メッセージを組み立てる"""
+    lines = [f"event: {event}".encode()]
+    if event_id is not None:
+        lines.append(f"id: {event_id}".encode())
+    lines.append(b"data: " + orjson.dumps(data))
+    return b"\n".join(lines) + b"\n\n"
+
+
+def _offer(queue: asyncio.Queue, message: bytes) -> None:
+    """キューが一杯なら最も古いメッセージを捨てて入れる（イベントループ上で呼ぶ）"""
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(message)
+
+
+class Broadcaster:
+    """スレッドから発行されたメッセージを各購読者の asyncio.Queue に配る"""
+
+    def __init__(self, queue_size: int = QUEUE_SIZE) -> None:
+        self.queue_size = queue_size
+        self._subscribers: set[tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = set()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    def publish(self, message: bytes) -> None:
+        """全購読者に message を送る（任意のスレッドから呼べる）"""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(_offer, queue, message)
+            except RuntimeError:
+                # ループが閉じている（切断処理中）
+                pass
+
+    @asynccontextmanager
+    async def subscribe(self) -> AsyncGenerator[asyncio.Queue]:
+        """購読者用のキューを登録し、抜けるときに外す"""
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue(self.queue_size))
+        with self._lock:
+            self._subscribers.add(subscriber)
+        try:
+            yield subscriber[1]
+        finally:
+            with self._lock:
+                self._subscribers.discard(subscriber)
+
+
+broadcaster = Broadcaster()
+
+
+def _on_sheet_change(key: str, old_value: Any, new_value: Any) -> None:
+    if key != "PERFORMANCE" or not len(broadcaster):
+        return
+    diff = performance_diff(old_value, new_value)
+    broadcaster.publish(
+        format_sse("performance", diff, event_id=sheet_cache.version(key))
+    )
+
+
+sheet_cache.subscribe(_on_sheet_change)
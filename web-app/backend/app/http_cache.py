@@ -0,0 +1,63 @@
+"""GET エンドポイント用の ETag / 条件付きリクエスト（304）処理
+
+各ルーターは「データのバージョン文字列」を返す関数を Depends に渡す。
+バージョンはシートキャッシュのスナップショットハッシュやファイルの mtime など、
+レスポンス本体を作らずに安く求められるものを使う。
+If-None-Match が一致すればルーター本体を実行せずに 304 を返す。
+"""
+
+import asyncio
+from collections.abc import Callable
+
+from fastapi import HTTPException, Request, Response
+
+from app.sheets.cache import sheet_cache, snapshot_version
+from app.sheets.snapshot import fetch_sheet
+
+VersionProvider = Callable[[Request], str]
+
+
+def sheets_version(*sheet_keys: str) -> VersionProvider:
+    """指定シートのキャッシュ上のバージョンを連結して返す関数を作る"""
+
+    def provider(request: Request) -> str:
+        versions = []
+        for key in sheet_keys:
+            # キャッシュが温まっていれば Sheets には出ない
+            fetch_sheet(key)
+            versions.append(sheet_cache.version(key) or "")
+        return ":".join(versions)
+
+    return provider
+
+
+def make_etag(request: Request, version: str) -> str:
+    """バージョンとリクエスト（パス・クエリ・Accept）から弱い ETag を作る"""
+    digest = snapshot_version([
+        version,
+        request.url.path,
+        request.url.query,
+        request.headers.get("accept", ""),
+    ])
+    return f'W/"{digest}"'
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or any(t.removeprefix("W/") == etag[2:] for t in tags)
+
+
+def conditional_get(provider: VersionProvider) -> Callable:
+    """ETag を付与し、If-None-Match が一致すれば 304 を返す依存関数を作る"""
+
+    async def dependency(request: Request, response: Response) -> str:
+        version = await asyncio.to_thread(provider, request)
+        etag = make_etag(request, version)
+        if_none_match = request.headers.get("if-none-match")
+        headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept"}
+        if if_none_match and _matches(if_none_match, etag):
+            raise HTTPException(status_code=304, headers=headers)
+        response.headers.update(headers)
+        return etag
+
+    return dependency
@@ -0,0 +1,254 @@
+"""レイテンシ・外部呼び出しの計測と Prometheus 形式での公開
+
+- ルートごとのレイテンシヒストグラム（MetricsMiddleware）
+- Sheets / yfinance 呼び出しの回数と所要時間（timed で囲んだ箇所）
+- シートキャッシュのヒット/ミス（SheetCache の統計をそのまま出す）
+- Sheets のクォータ予算・再試行・前回結果での応答（sheets_quota の統計）
+
+/metrics で Prometheus のテキスト形式を返し、各レスポンスには
+そのリクエスト中の外部呼び出し時間を Server-Timing ヘッダーで付ける。
+"""
+
+import bisect
+import threading
+import time
+from collections.abc import Generator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.sheets.cache import sheet_cache
+from app.sheets.quota import sheets_quota
+
+# ヒストグラムのバケット上限（秒）
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+Labels = tuple[tuple[str, str], ...]
+
+
+class Histogram:
+    """累積バケット・合計・件数を持つ Prometheus 互換のヒストグラム"""
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)   # 末尾は +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        """(le, 累積件数) のリストを返す"""
+        result = []
+        total = 0
+        for bound, count in zip(
+            [*map(_format_float, self.buckets), "+Inf"], self.counts, strict=True
+        ):
+            total += count
+            result.append((bound, total))
+        return result
+
+
+def _format_float(value: float) -> str:
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Labels, **extra: str) -> str:
+    pairs = [*labels, *extra.items()]
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+class Metrics:
+    """プロセス内のメトリクスを保持する"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._requests: dict[Labels, int] = {}
+        self._latency: dict[Labels, Histogram] = {}
+        self._calls: dict[Labels, int] = {}
+        self._call_latency: dict[Labels, Histogram] = {}
+
+    def observe_request(
+        self, method: str, route: str, status: int, seconds: float
+    ) -> None:
+        labels = (("method", method), ("route", route))
+        with self._lock:
+            key = (*labels, ("status", str(status)))
+            self._requests[key] = self._requests.get(key, 0) + 1
+            self._latency.setdefault(labels, Histogram()).observe(seconds)
+
+    def observe_call(
+        self, service: str, operation: str, seconds: float, ok: bool = True
+    ) -> None:
+        labels = (("service", service), ("operation", operation))
+        with self._lock:
+            key = (*labels, ("outcome", "ok" if ok else "error"))
+            self._calls[key] = self._calls.get(key, 0) + 1
+            self._call_latency.setdefault(labels, Histogram()).observe(seconds)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._requests.clear()
+            self._latency.clear()
+            self._calls.clear()
+            self._call_latency.clear()
+
+    def render(self) -> str:
+        """Prometheus のテキスト形式（0.0.4）で出力する"""
+        lines: list[str] = []
+        with self._lock:
+            _render_counter(
+                lines, "http_requests_total", "HTTP リクエスト数", self._requests
+            )
+            _render_histogram(
+                lines,
+                "http_request_duration_seconds",
+                "ルートごとのレスポンス時間（秒）",
+                self._latency,
+            )
+            _render_counter(
+                lines, "upstream_calls_total", "外部 API の呼び出し回数", self._calls
+            )
+            _render_histogram(
+                lines,
+                "upstream_call_duration_seconds",
+                "外部 API 呼び出しの所要時間（秒）",
+                self._call_latency,
+            )
+        stats = sheet_cache.stats()
+        _render_counter(
+            lines,
+            "sheet_cache_events_total",
+            "シートキャッシュの参照結果",
+            {
+                (("result", "hit"),): stats["hits"],
+                (("result", "stale"),): stats["staleHits"],
+                (("result", "miss"),): stats["misses"],
+                (("result", "refresh"),): stats["refreshes"],
+                (("result", "error"),): stats["errors"],
+            },
+        )
+        lines += [
+            "# HELP sheet_cache_entries シートキャッシュのエントリ数",
+            "# TYPE sheet_cache_entries gauge",
+            f"sheet_cache_entries {stats['size']}",
+        ]
+        quota = sheets_quota.stats()
+        _render_counter(
+            lines,
+            "sheets_quota_events_total",
+            "Sheets 呼び出しの予算・再試行・集約の結果",
+            {(("event", event),): count for event, count in quota.items()},
+        )
+        return "\n".join(lines) + "\n"
+
+
+def _render_counter(
+    lines: list[str], name: str, help_text: str, values: dict[Labels, int]
+) -> None:
+    lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+    for labels, value in sorted(values.items()):
+        lines.append(f"{name}{_format_labels(labels)} {value}")
+
+
+def _render_histogram(
+    lines: list[str], name: str, help_text: str, values: dict[Labels, Histogram]
+) -> None:
+    lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for labels, histogram in sorted(values.items()):
+        for le, count in histogram.cumulative():
+            lines.append(f"{name}_bucket{_format_labels(labels, le=le)} {count}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {histogram.sum}")
+        lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+
+
+metrics = Metrics()
+
+# リクエスト中の外部呼び出し {service: [回数, 合計秒]}（Server-Timing 用）
+_request_timings: ContextVar[dict[str, list[float]] | None] = ContextVar(
+    "request_timings", default=None
+)
+
+
+@contextmanager
+def timed(service: str, operation: str) -> Generator[None]:
+    """外部 API 呼び出しを囲み、回数と所要時間を記録する
+
+    asyncio.to_thread はコンテキストを引き継ぐため、スレッドプール上の
+    呼び出しも元のリクエストの Server-Timing に載る。
+    """
+    start = time.perf_counter()
+    ok = False
+    try:
+        yield
+        ok = True
+    finally:
+        seconds = time.perf_counter() - start
+        metrics.observe_call(service, operation, seconds, ok=ok)
+        timings = _request_timings.get()
+        if timings is not None:
+            entry = timings.setdefault(service, [0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+
+
+def server_timing(total: float, timings: dict[str, list[float]]) -> str:
+    """Server-Timing ヘッダーの値を組み立てる（時間はミリ秒）"""
+    parts = [f"app;dur={total * 1000:.1f}"]
+    for service, (count, seconds) in sorted(timings.items()):
+        parts.append(f'{service};dur={seconds * 1000:.1f};desc="{int(count)} calls"')
+    return ", ".join(parts)
+
+
+class MetricsMiddleware:
+    """ルートごとのレイテンシを記録し、Server-Timing ヘッダーを付ける ASGI ミドルウェア
+
+    ルートのラベルにはパスパラメータを含まないテンプレート（/api/reports/{year}/{month}）
+    を使い、系列数が増えないようにする。
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        timings: dict[str, list[float]] = {}
+        token = _request_timings.set(timings)
+        status = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                header = server_timing(time.perf_counter() - start, timings)
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"server-timing", header.encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_timings.reset(token)
+            route = scope.get("route")
+            metrics.observe_request(
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                status,
+                time.perf_counter() - start,
+            )
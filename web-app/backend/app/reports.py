@@ -1,6 +1,22 @@
+"""data-collector/output/ の月次レポート（blog_draft_YYYY_MM.md）の一覧と読み込み
+
+一覧はディレクトリの mtime が変わったとき（ファイルの追加・削除・改名）だけ
+作り直す。本文は (パス, mtime, サイズ) をキーにした LRU に置き、ファイルが
+変わらない間はディスクを読まない。HTML は要求されたときに 1 回だけ変換して
+本文と一緒に保持する（markdown パッケージがない場合は作らない）。
+"""
+
 import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
 from pathlib import Path
 
+try:
+    import markdown
+except ImportError:
+    markdown = None
+
 # data-collector/output/ への絶対パス
 _OUTPUT_DIR = (
     Path(__file__).resolve().parent.parent.parent.parent
@@ -8,15 +24,38 @@ _OUTPUT_DIR = (
     / "output"
 )
 
+_PATTERN = re.compile(r"blog_draft_(\d{4})_(\d{2})\.md$")
 
-def list_reports() -> list[dict]:
-    """output/ 内の blog_draft_*.md ファイル一覧を返す（降順）"""
-    if not _OUTPUT_DIR.exists():
-        return []
-    pattern = re.compile(r"blog_draft_(\d{4})_(\d{2})\.md$")
+# 本文を保持するレポートの数
+CONTENT_CACHE_SIZE = 32
+
+
+@dataclass
+class _Index:
+    directory: Path
+    mtime_ns: int
+    reports: list[dict]
+
+
+@dataclass
+class _Content:
+    text: str
+    html: str | None = None
+
+
+_lock = threading.Lock()
+_index: _Index | None = None
+_contents: OrderedDict[tuple[Path, int, int], _Content] = OrderedDict()
+
+
+def _report_path(year: int, month: int) -> Path:
+    return _OUTPUT_DIR / f"blog_draft_{year}_{month:02d}.md"
+
+
+def _scan(directory: Path) -> list[dict]:
     reports = []
-    for f in _OUTPUT_DIR.glob("blog_draft_*.md"):
-        m = pattern.match(f.name)
+    for f in directory.glob("blog_draft_*.md"):
+        m = _PATTERN.match(f.name)
         if m:
             year, month = int(m.group(1)), int(m.group(2))
             reports.append({
@@ -28,9 +67,104 @@ def list_reports() -> list[dict]:
     return sorted(reports, key=lambda r: (r["year"], r["month"]), reverse=True)
 
 
+def _current_index() -> _Index | None:
+    """一覧の索引を返す。ディレクトリの mtime が変わっていれば作り直す"""
+    global _index
+    directory = _OUTPUT_DIR
+    try:
+        mtime_ns = directory.stat().st_mtime_ns
+    except OSError:
+        return None
+    with _lock:
+        index = _index
+    if index is not None and (index.directory, index.mtime_ns) == (directory, mtime_ns):
+        return index
+    index = _Index(directory, mtime_ns, _scan(directory))
+    with _lock:
+        _index = index
+    return index
+
+
+def list_reports() -> list[dict]:
+    """output/ 内の blog_draft_*.md ファイル一覧を返す（降順）"""
+    index = _current_index()
+    return [] if index is None else index.reports
+
+
+def reports_version() -> str:
+    """レポート一覧のバージョン（ディレクトリの mtime とファイル名から作る）
+
+    一覧に載るのはファイル名から作る値だけなので、各ファイルの中身の変更では変わらない。
+    """
+    index = _current_index()
+    if index is None:
+        return ""
+    names = ",".join(r["filename"] for r in index.reports)
+    return f"{index.mtime_ns}:{names}"
+
+
+def report_version(year: int, month: int) -> str:
+    """指定年月のレポートファイルのバージョン（mtime・サイズ）。存在しない場合は空文字"""
+    try:
+        st = _report_path(year, month).stat()
+    except OSError:
+        return ""
+    return f"{st.st_mtime_ns}:{st.st_size}"
+
+
+def _load(year: int, month: int) -> _Content | None:
+    """(パス, mtime, サイズ) が同じ間は保持している本文を返す"""
+    path = _report_path(year, month)
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    key = (path, st.st_mtime_ns, st.st_size)
+    with _lock:
+        content = _contents.get(key)
+        if content is not None:
+            _contents.move_to_end(key)
+            return content
+    try:
+        content = _Content(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+    with _lock:
+        # 古い版の本文は捨てる
+        for stale in [k for k in _contents if k[0] == path]:
+            del _contents[stale]
+        _contents[key] = content
+        while len(_contents) > CONTENT_CACHE_SIZE:
+            _contents.popitem(last=False)
+    return content
+
+
 def read_report(year: int, month: int) -> str | None:
     """指定年月の blog_draft を読み込んで返す。存在しない場合は None"""
-    path = _OUTPUT_DIR / f"blog_draft_{year}_{month:02d}.md"
-    if not path.exists():
+    content = _load(year, month)
+    return None if content is None else content.text
+
+
+def read_report_html(year: int, month: int) -> str | None:
+    """指定年月の blog_draft を HTML に変換して返す
+
+    存在しない場合・markdown パッケージがない場合は None。
+    """
+    if markdown is None:
+        return None
+    content = _load(year, month)
+    if content is None:
         return None
-    return path.read_text(encoding="utf-8")
+    if content.html is None:
+        content.html = markdown.markdown(
+            content.text, extensions=["tables", "fenced_code"]
+        )
+    return content.html
+
+
+def clear_cache() -> None:
+    """一覧の索引と本文のキャッシュを捨てる"""
+    global _index
+    with _lock:
+        _index = None
+        _contents.clear()
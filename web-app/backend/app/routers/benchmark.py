@@ -1,55 +1,60 @@
-from collections import defaultdict
-
-import yfinance as yf
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, Request
 
+from app.data_source import get_data_source
+from app.http_cache import conditional_get
 from app.schemas.benchmark import BenchmarkPoint, BenchmarkResponse
-from app.sheets.performance import fetch_performance
+from app.sheets.aggregates import get_performance_aggregates
+from app.sheets.aio import run_coalesced
+from app.sheets.cache import sheet_cache, snapshot_version
 
 router = APIRouter()
 
 
-@router.get("/benchmark", response_model=BenchmarkResponse)
+def _first_month(first_date: str) -> tuple[int, int]:
+    """"YYYY-MM-末" 形式の日付から (年, 月) を取り出す"""
+    return int(first_date[:4]), int(first_date[5:7])
+
+
+def _benchmark_version(request: Request) -> str:
+    """損益レポートのバージョンとベンチマーク終値ストアのバージョンの組み合わせ
+
+    終値そのものは読まない。ただし当月の終値の取得間隔を過ぎていれば
+    ここで取り足す（304 が続いて本体が実行されない間も更新を止めないため）。
+    """
+    # 集計値はスナップショットごとに 1 回だけ作られ、本体でもそのまま使う
+    monthly = get_performance_aggregates().monthly_totals
+    versions = [sheet_cache.version("PERFORMANCE")]
+    if monthly:
+        first_year, first_month = _first_month(next(iter(monthly)))
+        versions.append(
+            get_data_source().benchmark_version(first_year, first_month)
+        )
+    return snapshot_version(versions)
+
+
+@router.get(
+    "/benchmark",
+    response_model=BenchmarkResponse,
+    dependencies=[Depends(conditional_get(_benchmark_version))],
+)
 async def get_benchmark() -> BenchmarkResponse:
     """ポートフォリオとベンチマーク（日経225・S&P500）の累積リターン比較を返す"""
-    records = fetch_performance()
-    if not records:
+    agg = await run_coalesced(get_performance_aggregates)
+    monthly = agg.monthly_totals
+    if not monthly:
         return BenchmarkResponse(data=[])
+    sorted_dates = list(monthly)
 
-    # 月ごとに value/cost を集計
-    monthly: dict[str, dict] = defaultdict(lambda: {"value": 0.0, "cost": 0.0})
-    for r in records:
-        monthly[r["date"]]["value"] += r["value"]
-        monthly[r["date"]]["cost"] += r["cost"]
-    sorted_dates = sorted(monthly.keys())
-
-    # 最初の月から yfinance でベンチマークを取得
-    first_date = sorted_dates[0]  # "YYYY-MM-末" 形式
-    first_year, first_month = int(first_date[:4]), int(first_date[5:7])
-    start_str = f"{first_year}-{first_month:02d}-01"
-
-    try:
-        df = yf.download(
-            "^N225 ^GSPC",
-            start=start_str,
-            interval="1mo",
-            auto_adjust=True,
-            progress=False,
-        )["Close"]
-        bench: dict[tuple[int, int], dict] = {}
-        for ts, row in df.iterrows():
-            key = (ts.year, ts.month)
-            bench[key] = {
-                "nikkei225": float(row.get("^N225", 0) or 0),
-                "sp500": float(row.get("^GSPC", 0) or 0),
-            }
-    except Exception:
-        bench = {}
+    # 最初の月以降のベンチマーク終値を取得元（ローカルストア / DB）から取得
+    first_year, first_month = _first_month(sorted_dates[0])
+    bench = await run_coalesced(
+        get_data_source().monthly_closes, first_year, first_month
+    )
 
     # 基準値（最初の月）
     base_key = (first_year, first_month)
-    base_n225 = bench.get(base_key, {}).get("nikkei225", 0)
-    base_sp500 = bench.get(base_key, {}).get("sp500", 0)
+    base_n225 = bench.get(base_key, {}).get("nikkei225") or 0
+    base_sp500 = bench.get(base_key, {}).get("sp500") or 0
 
     result = []
     for date_str in sorted_dates:
@@ -59,8 +64,8 @@ async def get_benchmark() -> BenchmarkResponse:
         )
         year, month = int(date_str[:4]), int(date_str[5:7])
         bdata = bench.get((year, month), {})
-        n225_val = bdata.get("nikkei225", 0)
-        sp500_val = bdata.get("sp500", 0)
+        n225_val = bdata.get("nikkei225") or 0
+        sp500_val = bdata.get("sp500") or 0
         n225 = (n225_val / base_n225 - 1) * 100 if base_n225 and n225_val else None
         sp500 = (sp500_val / base_sp500 - 1) * 100 if base_sp500 and sp500_val else None
         result.append(
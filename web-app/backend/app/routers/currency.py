@@ -1,17 +1,35 @@
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
 
+from app.http_cache import conditional_get, sheets_version
 from app.schemas.currency import CurrencyRatePoint, CurrencyResponse
+from app.sheets.aio import run_coalesced
 from app.sheets.currency import fetch_currency
+from app.streaming import ndjson_response, wants_ndjson
 
 router = APIRouter()
 
 
-@router.get("/currency", response_model=CurrencyResponse)
+@router.get(
+    "/currency",
+    response_model=CurrencyResponse,
+    dependencies=[Depends(conditional_get(sheets_version("CURRENCY")))],
+)
 async def get_currency(
+    request: Request,
+    response: Response,
     start: str | None = Query(default=None, description="開始年月（YYYY-MM）"),
-) -> CurrencyResponse:
+    fmt: str | None = Query(
+        default=None,
+        alias="format",
+        pattern="^(json|ndjson)$",
+        description="ndjson を指定すると行データを NDJSON でストリーミング",
+    ),
+) -> CurrencyResponse | StreamingResponse:
     """為替レート推移を返す"""
-    records = fetch_currency(start=start)
+    records = await run_coalesced(fetch_currency, start)
+    if wants_ndjson(request, fmt):
+        return ndjson_response(records, response)
     data = [CurrencyRatePoint(**r) for r in records]
     latest_rate = data[-1].rate if data else 0.0
     return CurrencyResponse(data=data, latestRate=latest_rate)
@@ -1,68 +1,44 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 
+from app.http_cache import conditional_get, sheets_version
 from app.schemas.dashboard import (
     AllocationItem,
     DashboardResponse,
     KpiSummary,
     LatestProfitItem,
 )
-from app.sheets.performance import fetch_performance
+from app.sheets.aggregates import get_performance_aggregates
+from app.sheets.aio import run_coalesced
 
 router = APIRouter()
 
 
-@router.get("/dashboard", response_model=DashboardResponse)
+@router.get(
+    "/dashboard",
+    response_model=DashboardResponse,
+    dependencies=[Depends(conditional_get(sheets_version("PERFORMANCE")))],
+)
 async def get_dashboard() -> DashboardResponse:
     """ダッシュボード用データ（KPI・構成比・最新月損益）を返す"""
-    records = fetch_performance()
-    if not records:
+    agg = await run_coalesced(get_performance_aggregates)
+    if not agg.latest_date:
         return DashboardResponse(
             kpi=KpiSummary(totalValue=0, totalProfit=0, profitRate=0, baseDate=""),
             allocation=[],
             latestProfits=[],
         )
 
-    # 最新日付を特定
-    latest_date = max(r["date"] for r in records)
-    latest = [r for r in records if r["date"] == latest_date]
-
-    # KPI 集計
-    total_value = sum(r["value"] for r in latest)
-    total_profit = sum(r["profit"] for r in latest)
-    total_cost = sum(r["cost"] for r in latest)
-    profit_rate = (total_profit / total_cost * 100) if total_cost else 0.0
-
-    # 構成比（DonutChart 用）
-    allocation = []
-    for r in latest:
-        pct = (r["value"] / total_value * 100) if total_value else 0.0
-        allocation.append(
-            AllocationItem(
-                name=r["name"],
-                value=r["value"],
-                percentage=round(pct, 2),
-            )
-        )
-    allocation.sort(key=lambda x: x.value, reverse=True)
-
-    # 最新月損益（BarChart 用）
-    latest_profits = [
-        LatestProfitItem(
-            name=r["name"],
-            profit=r["profit"],
-            profitRate=r["profitRate"],
-        )
-        for r in latest
-    ]
-    latest_profits.sort(key=lambda x: x.profit, reverse=True)
-
+    profit_rate = (
+        agg.total_profit / agg.total_cost * 100 if agg.total_cost else 0.0
+    )
     return DashboardResponse(
         kpi=KpiSummary(
-            totalValue=total_value,
-            totalProfit=total_profit,
+            totalValue=agg.total_value,
+            totalProfit=agg.total_profit,
             profitRate=round(profit_rate, 2),
-            baseDate=latest_date,
+            baseDate=agg.latest_date,
         ),
-        allocation=allocation,
-        latestProfits=latest_profits,
+        # 構成比（DonutChart 用）・最新月損益（BarChart 用）は集計済み
+        allocation=[AllocationItem(**a) for a in agg.allocation],
+        latestProfits=[LatestProfitItem(**p) for p in agg.latest_profits],
     )
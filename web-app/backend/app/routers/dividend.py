@@ -1,15 +1,34 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
 
+from app.http_cache import conditional_get, sheets_version
 from app.schemas.dividend import DividendItem, DividendResponse
+from app.sheets.aio import run_coalesced
 from app.sheets.dividend import fetch_dividend
+from app.streaming import ndjson_response, wants_ndjson
 
 router = APIRouter()
 
 
-@router.get("/dividend", response_model=DividendResponse)
-async def get_dividend() -> DividendResponse:
+@router.get(
+    "/dividend",
+    response_model=DividendResponse,
+    dependencies=[Depends(conditional_get(sheets_version("DIVIDEND")))],
+)
+async def get_dividend(
+    request: Request,
+    response: Response,
+    fmt: str | None = Query(
+        default=None,
+        alias="format",
+        pattern="^(json|ndjson)$",
+        description="ndjson を指定すると行データを NDJSON でストリーミング",
+    ),
+) -> DividendResponse | StreamingResponse:
     """配当・分配金一覧を返す"""
-    records = fetch_dividend()
+    records = await run_coalesced(fetch_dividend)
+    if wants_ndjson(request, fmt):
+        return ndjson_response(records, response)
     data = [DividendItem(**r) for r in records]
     total_jpy = sum(item.totalJpy for item in data)
     return DividendResponse(data=data, totalJpy=total_jpy)
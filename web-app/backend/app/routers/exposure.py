@@ -1,9 +1,9 @@
-from collections import defaultdict
-
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 
+from app.http_cache import conditional_get, sheets_version
 from app.schemas.exposure import ExposureItem, ExposureResponse
-from app.sheets.performance import fetch_performance
+from app.sheets.aggregates import get_performance_aggregates
+from app.sheets.aio import run_coalesced
 
 router = APIRouter()
 
@@ -11,31 +11,26 @@ router = APIRouter()
 TARGET_CURRENCIES = {"JPY", "USD"}
 
 
-@router.get("/exposure", response_model=ExposureResponse)
+@router.get(
+    "/exposure",
+    response_model=ExposureResponse,
+    dependencies=[Depends(conditional_get(sheets_version("PERFORMANCE")))],
+)
 async def get_exposure() -> ExposureResponse:
     """通貨別エクスポージャーサマリーを返す（最新月、JPY/USD のみ）"""
-    records = fetch_performance()
-    if not records:
-        return ExposureResponse(items=[])
-
-    # 最新月を特定
-    latest_date = max(r["date"] for r in records)
-    latest_records = [r for r in records if r["date"] == latest_date]
-
-    # 通貨別に集計
-    agg: dict[str, dict] = defaultdict(lambda: {"value": 0.0, "cost": 0.0})
-    for r in latest_records:
-        currency = str(r.get("currency", "JPY"))
-        if currency not in TARGET_CURRENCIES:
-            continue
-        agg[currency]["value"] += r["value"]
-        agg[currency]["cost"] += r["cost"]
+    agg = await run_coalesced(get_performance_aggregates)
 
-    total_value = sum(v["value"] for v in agg.values())
+    # 最新月の通貨別合計（集計済み）から対象通貨だけを取り出す
+    totals = {
+        currency: v
+        for currency, v in agg.currency_totals.items()
+        if currency in TARGET_CURRENCIES
+    }
+    total_value = sum(v["value"] for v in totals.values())
 
     items = []
-    for currency in sorted(agg.keys()):
-        v = agg[currency]
+    for currency in sorted(totals):
+        v = totals[currency]
         profit = v["value"] - v["cost"]
         profit_rate = profit / v["cost"] * 100 if v["cost"] else 0.0
         percentage = v["value"] / total_value * 100 if total_value else 0.0
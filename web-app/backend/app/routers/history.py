@@ -1,19 +1,91 @@
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 
-from app.schemas.history import HistoryResponse, MonthlyProfitPoint
-from app.sheets.performance import fetch_performance
+from app.http_cache import conditional_get, sheets_version
+from app.schemas.history import (
+    HistoryResponse,
+    MonthlyProfitPoint,
+    MonthlyProfitPointFields,
+)
+from app.sheets.aio import run_coalesced
+from app.sheets.performance import get_performance_frame
+from app.streaming import ndjson_response, wants_ndjson
 
 router = APIRouter()
 
+HISTORY_FIELDS = tuple(MonthlyProfitPoint.model_fields)
 
-@router.get("/history", response_model=HistoryResponse)
+
+def _parse_fields(fields: str | None) -> list[str] | None:
+    if fields is None:
+        return None
+    names = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = sorted(set(names) - set(HISTORY_FIELDS))
+    if unknown:
+        raise HTTPException(
+            status_code=400, detail=f"未知の fields です: {', '.join(unknown)}"
+        )
+    return names
+
+
+def _parse_cursor(cursor: str | None) -> int:
+    if cursor is None:
+        return 0
+    if not cursor.isdigit():
+        raise HTTPException(status_code=400, detail="cursor が不正です")
+    return int(cursor)
+
+
+@router.get(
+    "/history",
+    response_model=HistoryResponse,
+    response_model_exclude_unset=True,
+    dependencies=[Depends(conditional_get(sheets_version("PERFORMANCE")))],
+)
 async def get_history(
+    request: Request,
+    response: Response,
     stock: str | None = Query(default=None, description="銘柄コードでフィルター"),
-) -> HistoryResponse:
-    """月次損益推移を返す"""
-    # 全件を1回だけ取得してメモリ内でフィルター（Sheets API 呼び出しを節約）
-    all_records = fetch_performance()
-    symbols = sorted({r["code"] for r in all_records})
-    filtered = [r for r in all_records if not stock or r["code"] == stock]
-    data = [MonthlyProfitPoint(**r) for r in filtered]
-    return HistoryResponse(data=data, symbols=symbols)
+    start: str | None = Query(default=None, description="開始年月（YYYY-MM）"),
+    end: str | None = Query(default=None, description="終了年月（YYYY-MM、含む）"),
+    limit: int | None = Query(default=None, ge=1, description="1ページの最大件数"),
+    cursor: str | None = Query(default=None, description="前ページの nextCursor"),
+    fields: str | None = Query(default=None, description="返す項目（カンマ区切り）"),
+    fmt: str | None = Query(
+        default=None,
+        alias="format",
+        pattern="^(json|ndjson)$",
+        description="ndjson を指定すると行データを NDJSON でストリーミング",
+    ),
+) -> HistoryResponse | StreamingResponse:
+    """月次損益推移を返す（日付昇順）"""
+    field_names = _parse_fields(fields)
+    offset = _parse_cursor(cursor)
+
+    # キャッシュ済みの列指向データの日付索引から対象行を二分探索で取り出す
+    frame = await run_coalesced(get_performance_frame)
+    rows = frame.rows_between(start, end, stock)
+    stop = len(rows) if limit is None else min(offset + limit, len(rows))
+    records = frame.to_records(rows[offset:stop])
+    next_cursor = str(stop) if stop < len(rows) else None
+
+    if wants_ndjson(request, fmt):
+        # NDJSON は行データだけを送るため、次ページの cursor はヘッダーで返す
+        names = field_names or HISTORY_FIELDS
+        return ndjson_response(
+            ({f: r[f] for f in names} for r in records),
+            response,
+            headers={"X-Next-Cursor": next_cursor} if next_cursor else None,
+        )
+    if field_names is None:
+        data = [MonthlyProfitPoint(**r) for r in records]
+    else:
+        data = [
+            MonthlyProfitPointFields(**{f: r[f] for f in field_names})
+            for r in records
+        ]
+    return HistoryResponse(
+        data=data,
+        symbols=frame.symbols,
+        nextCursor=next_cursor,
+    )
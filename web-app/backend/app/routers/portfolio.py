@@ -1,13 +1,19 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 
+from app.http_cache import conditional_get, sheets_version
 from app.schemas.portfolio import PortfolioItem, PortfolioResponse
+from app.sheets.aio import run_coalesced
 from app.sheets.portfolio import fetch_portfolio
 
 router = APIRouter()
 
 
-@router.get("/portfolio", response_model=PortfolioResponse)
+@router.get(
+    "/portfolio",
+    response_model=PortfolioResponse,
+    dependencies=[Depends(conditional_get(sheets_version("PORTFOLIO")))],
+)
 async def get_portfolio() -> PortfolioResponse:
     """保有銘柄一覧を返す"""
-    items = fetch_portfolio()
+    items = await run_coalesced(fetch_portfolio)
     return PortfolioResponse(items=[PortfolioItem(**item) for item in items])
@@ -1,6 +1,13 @@
-from fastapi import APIRouter, HTTPException, Path
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request
 
-from app.reports import list_reports, read_report
+from app.http_cache import conditional_get
+from app.reports import (
+    list_reports,
+    read_report,
+    read_report_html,
+    report_version,
+    reports_version,
+)
 from app.schemas.reports import (
     ReportContentResponse,
     ReportItem,
@@ -10,20 +17,43 @@ from app.schemas.reports import (
 router = APIRouter()
 
 
-@router.get("/reports", response_model=ReportListResponse)
+def _report_version(request: Request) -> str:
+    try:
+        year = int(request.path_params["year"])
+        month = int(request.path_params["month"])
+    except (KeyError, ValueError):
+        return ""
+    return report_version(year, month)
+
+
+@router.get(
+    "/reports",
+    response_model=ReportListResponse,
+    dependencies=[Depends(conditional_get(lambda _: reports_version()))],
+)
 async def get_reports() -> ReportListResponse:
     """利用可能なレポート一覧を返す"""
     items = list_reports()
     return ReportListResponse(reports=[ReportItem(**r) for r in items])
 
 
-@router.get("/reports/{year}/{month}", response_model=ReportContentResponse)
+@router.get(
+    "/reports/{year}/{month}",
+    response_model=ReportContentResponse,
+    dependencies=[Depends(conditional_get(_report_version))],
+)
 async def get_report(
     year: int = Path(..., ge=2020, le=2100),
     month: int = Path(..., ge=1, le=12),
+    html: bool = Query(False, description="変換済みの HTML も返す"),
 ) -> ReportContentResponse:
     """指定年月のレポート内容を返す"""
     content = read_report(year, month)
     if content is None:
         raise HTTPException(status_code=404, detail="レポートが見つかりません")
-    return ReportContentResponse(year=year, month=month, content=content)
+    return ReportContentResponse(
+        year=year,
+        month=month,
+        content=content,
+        html=read_report_html(year, month) if html else None,
+    )
@@ -0,0 +1,37 @@
+import asyncio
+from collections.abc import AsyncGenerator
+
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
+
+from app.events import broadcaster
+
+router = APIRouter()
+
+# 接続を保つためのコメント行を送る間隔（秒）
+KEEPALIVE_INTERVAL = 15.0
+
+# 切断時にクライアントが再接続を試みるまでの待ち時間（ミリ秒）
+RETRY_MS = 5000
+
+
+async def _events(request: Request) -> AsyncGenerator[bytes]:
+    yield f"retry: {RETRY_MS}\n\n".encode()
+    async with broadcaster.subscribe() as queue:
+        while not await request.is_disconnected():
+            try:
+                message = await asyncio.wait_for(queue.get(), KEEPALIVE_INTERVAL)
+            except TimeoutError:
+                yield b": keepalive\n\n"
+                continue
+            yield message
+
+
+@router.get("/stream")
+async def stream(request: Request) -> StreamingResponse:
+    """損益スナップショットの変更差分を Server-Sent Events で配信する"""
+    return StreamingResponse(
+        _events(request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -13,6 +13,21 @@ class MonthlyProfitPoint(BaseModel):
     fxProfit: float
 
 
+class MonthlyProfitPointFields(BaseModel):
+    """fields 指定時に返す MonthlyProfitPoint の部分集合（指定外の項目は省略）"""
+
+    date: str | None = None
+    code: str | None = None
+    name: str | None = None
+    profit: float | None = None
+    value: float | None = None
+    profitRate: float | None = None
+    currency: str | None = None
+    stockProfit: float | None = None
+    fxProfit: float | None = None
+
+
 class HistoryResponse(BaseModel):
-    data: list[MonthlyProfitPoint]
+    data: list[MonthlyProfitPoint | MonthlyProfitPointFields]
     symbols: list[str]
+    nextCursor: str | None = None   # 続きがある場合に次ページの cursor
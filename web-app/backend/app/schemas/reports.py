@@ -16,3 +16,5 @@ class ReportContentResponse(BaseModel):
     year: int
     month: int
     content: str
+    # ?html=true のときだけ入る（markdown パッケージがなければ null）
+    html: str | None = None
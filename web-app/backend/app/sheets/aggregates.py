@@ -0,0 +1,88 @@
+"""損益レポートの集計結果をスナップショットのバージョンごとに保持する
+
+ダッシュボード・エクスポージャー・ベンチマークが毎回行っていた
+最新月の特定・月別/通貨別の合計・構成比の計算を、シートの内容が
+変わったときに 1 回だけ行う。
+"""
+
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from app.sheets.performance import PerformanceFrame, get_performance_frame
+from app.sheets.snapshot import derive_sheet
+
+
+@dataclass(frozen=True)
+class PerformanceAggregates:
+    latest_date: str = ""
+    # 日付昇順の {date: {"value", "cost", "profit"}}
+    monthly_totals: dict[str, dict[str, float]] = field(default_factory=dict)
+    # 最新月の {currency: {"value", "cost"}}
+    currency_totals: dict[str, dict[str, float]] = field(default_factory=dict)
+    total_value: float = 0.0
+    total_cost: float = 0.0
+    total_profit: float = 0.0
+    # 最新月の構成比（評価額降順）{"name", "value", "percentage"}
+    allocation: list[dict] = field(default_factory=list)
+    # 最新月の銘柄別損益（損益降順）{"name", "profit", "profitRate"}
+    latest_profits: list[dict] = field(default_factory=list)
+
+
+def build_performance_aggregates(frame: PerformanceFrame) -> PerformanceAggregates:
+    """PerformanceFrame から集計値を計算する"""
+    if not len(frame):
+        return PerformanceAggregates()
+
+    monthly_totals = frame.group_by_month()
+    latest_date = frame.latest_date
+    total = monthly_totals[latest_date]
+    latest = frame.latest_rows()
+
+    total_value = total["value"]
+    values = frame.value[latest]
+    percentages = values / total_value * 100 if total_value else values * 0.0
+    # 降順の安定ソート（同値は元の並び順）
+    by_value = np.argsort(-values, kind="stable")
+    allocation = [
+        {
+            "name": frame.names[latest[i]],
+            "value": float(values[i]),
+            "percentage": round(float(percentages[i]), 2),
+        }
+        for i in by_value.tolist()
+    ]
+    profits = frame.profit[latest]
+    by_profit = np.argsort(-profits, kind="stable")
+    latest_profits = [
+        {
+            "name": frame.names[latest[i]],
+            "profit": float(profits[i]),
+            "profitRate": float(frame.profit_rate[latest[i]]),
+        }
+        for i in by_profit.tolist()
+    ]
+
+    return PerformanceAggregates(
+        latest_date=latest_date,
+        monthly_totals=monthly_totals,
+        currency_totals=frame.group_by_currency(latest),
+        total_value=total_value,
+        total_cost=total["cost"],
+        total_profit=total["profit"],
+        allocation=allocation,
+        latest_profits=latest_profits,
+    )
+
+
+def get_performance_aggregates() -> PerformanceAggregates:
+    """現在の損益レポートの集計値を返す（スナップショットのバージョンごとに1回だけ計算）"""
+
+    def build(records: list[dict]) -> PerformanceAggregates:
+        frame = get_performance_frame()
+        if frame.records is not records:
+            # 構築中にスナップショットが更新された場合は同じ版から作り直す
+            frame = PerformanceFrame.from_records(records)
+        return build_performance_aggregates(frame)
+
+    return derive_sheet("PERFORMANCE", "aggregates", build)
@@ -0,0 +1,24 @@
+"""同期フェッチャーをイベントループ外で実行するための非同期ヘルパー
+
+gspread は同期 I/O のため、ルーターから直接呼ぶと Sheets への往復の間
+uvicorn のイベントループが止まる。スレッドプールへ逃がしたうえで、
+同じ関数・引数の同時呼び出しは実行中の 1 回の結果を共有する。
+"""
+
+import asyncio
+from collections.abc import Callable, Hashable
+from typing import Any
+
+_inflight: dict[tuple[Hashable, ...], asyncio.Future] = {}
+
+
+async def run_coalesced(func: Callable[..., Any], *args: Hashable) -> Any:
+    """func(*args) をスレッドプールで実行し、実行中の同一呼び出しがあれば相乗りする"""
+    key = (func, *args)
+    future = _inflight.get(key)
+    if future is None:
+        future = asyncio.ensure_future(asyncio.to_thread(func, *args))
+        _inflight[key] = future
+        future.add_done_callback(lambda _: _inflight.pop(key, None))
+    # 呼び出し元がキャンセルされても共有中の実行は止めない
+    return await asyncio.shield(future)
@@ -0,0 +1,233 @@
+"""パース済みシートデータの TTL キャッシュ（stale-while-revalidate）
+
+TTL 内はキャッシュをそのまま返し、TTL 経過後は古い値を返しつつ
+バックグラウンドスレッドで 1 本だけ再取得を走らせる。
+キャッシュが空のときだけ呼び出し元で同期的に読み込む。
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# シートごとの TTL（秒）
+SHEET_TTLS: dict[str, float] = {
+    "PERFORMANCE": 300,
+    "PORTFOLIO": 300,
+    "CURRENCY": 600,
+    "DIVIDEND": 3600,
+}
+DEFAULT_TTL = 300.0
+
+
+def snapshot_version(data: Any) -> str:
+    """データ内容から短いハッシュを作る（内容が同じなら同じ値になる）"""
+    encoded = json.dumps(data, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.blake2b(encoded.encode(), digest_size=8).hexdigest()
+
+
+@dataclass
+class _Entry:
+    value: Any
+    fetched_at: float
+    version: str
+    refreshing: bool = False
+    # 値から派生させた計算結果（値が置き換われば Entry ごと捨てられる）
+    derived: dict[str, Any] = field(default_factory=dict)
+
+
+class SheetCache:
+    """キー（SHEET_NAMES のキー）ごとにパース済みデータを保持するキャッシュ"""
+
+    def __init__(
+        self,
+        maxsize: int = 32,
+        ttls: dict[str, float] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.maxsize = maxsize
+        self._ttls = dict(SHEET_TTLS if ttls is None else ttls)
+        self._clock = clock
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks: dict[str, threading.Lock] = {}
+        self._listeners: list[Callable[[str, Any, Any], None]] = []
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.errors = 0
+
+    def ttl(self, key: str) -> float:
+        return self._ttls.get(key, DEFAULT_TTL)
+
+    def get(self, key: str, loader: Callable[[], Any]) -> Any:
+        """キャッシュ値を返す。期限切れなら古い値を返してバックグラウンド更新する"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                if self._clock() - entry.fetched_at < self.ttl(key):
+                    self.hits += 1
+                    return entry.value
+                self.stale_hits += 1
+                if not entry.refreshing:
+                    entry.refreshing = True
+                    threading.Thread(
+                        target=self._refresh,
+                        args=(key, loader),
+                        name=f"sheet-cache-refresh-{key}",
+                        daemon=True,
+                    ).start()
+                return entry.value
+            self.misses += 1
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        # コールドミス: 同じキーの同時呼び出しは 1 回の読み込みを共有する
+        with load_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    return entry.value
+            value = loader()
+            self._store(key, value)
+            return value
+
+    def derive(
+        self,
+        key: str,
+        name: str,
+        builder: Callable[[Any], Any],
+        loader: Callable[[], Any],
+    ) -> Any:
+        """キャッシュ値から builder で計算した結果を、値のバージョンごとに1回だけ作る"""
+        value = self.get(key, loader)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.value is not value:
+                entry = None
+            elif name in entry.derived:
+                return entry.derived[name]
+        result = builder(value)
+        if entry is not None:
+            with self._lock:
+                result = entry.derived.setdefault(name, result)
+        return result
+
+    def peek(self, key: str) -> Any | None:
+        """TTL 内の値があれば返す（統計・LRU 順序は更新しない）"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or self._clock() - entry.fetched_at >= self.ttl(key):
+                return None
+            return entry.value
+
+    def current(self, key: str) -> tuple[Any, str] | None:
+        """格納中の (値, バージョン) を TTL に関係なく返す"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return None if entry is None else (entry.value, entry.version)
+
+    def version(self, key: str) -> str | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            return None if entry is None else entry.version
+
+    def set(
+        self, key: str, value: Any, version: str | None = None, age: float = 0.0
+    ) -> None:
+        """値を格納する。maxsize を超えたら最も古く参照されたキーを捨てる
+
+        version を省略した場合は値の内容から計算する。
+        age には他所で取得済みの値を取り込む場合の経過秒数を渡す。
+        バージョンが変わった場合は subscribe 済みの listener に通知する。
+        """
+        if version is None:
+            version = snapshot_version(value)
+        with self._lock:
+            previous = self._entries.get(key)
+            self._entries[key] = _Entry(
+                value=value, fetched_at=self._clock() - age, version=version
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+            listeners = list(self._listeners)
+        if previous is not None and previous.version != version:
+            for listener in listeners:
+                try:
+                    listener(key, previous.value, value)
+                except Exception:
+                    logger.exception("キャッシュ変更通知の処理に失敗しました")
+
+    def subscribe(self, listener: Callable[[str, Any, Any], None]) -> None:
+        """値の内容が変わったときに listener(key, 旧値, 新値) を呼ぶよう登録する
+
+        初回の格納では呼ばない。listener は値を格納したスレッドで呼ばれる。
+        """
+        with self._lock:
+            self._listeners.append(listener)
+
+    def touch(self, key: str, age: float = 0.0) -> None:
+        """内容が最新だと確認できた値の取得時刻を更新する（TTL を延長する）
+
+        age 秒前に確認された場合はその時刻まで進める（巻き戻しはしない）。
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.fetched_at = max(entry.fetched_at, self._clock() - age)
+
+    def _store(self, key: str, value: Any) -> None:
+        """ローダー自身が格納済みならそのまま、未格納なら格納する"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.value is value:
+                return
+        self.set(key, value)
+
+    def invalidate(self, key: str | None = None) -> None:
+        """指定キー（省略時は全キー）を破棄する"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "staleHits": self.stale_hits,
+                "misses": self.misses,
+                "refreshes": self.refreshes,
+                "errors": self.errors,
+                "size": len(self._entries),
+            }
+
+    def _refresh(self, key: str, loader: Callable[[], Any]) -> None:
+        try:
+            value = loader()
+            self._store(key, value)
+            with self._lock:
+                self.refreshes += 1
+        except Exception:
+            logger.exception("シート '%s' のバックグラウンド更新に失敗しました", key)
+            with self._lock:
+                self.errors += 1
+        finally:
+            # 内容が変わらず同じ値の Entry が残った場合も次の更新を起動できるようにする
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry.refreshing = False
+
+
+sheet_cache = SheetCache()
@@ -1,6 +1,8 @@
 import os
 import sys
+from collections.abc import Callable
 from functools import lru_cache
+from typing import Any
 
 import gspread
 from google.oauth2.service_account import Credentials
@@ -10,9 +12,21 @@ sys.path.insert(
     0,
     os.path.join(os.path.dirname(__file__), "..", "..", "..", "..", "shared"),
 )
-from sheets_config import SCOPES, SHEET_NAMES  # noqa: E402
+from sheets_config import COLUMN_RANGES, SCOPES, SHEET_NAMES  # noqa: E402
 
 from app.config import get_settings  # noqa: E402
+from app.metrics import timed  # noqa: E402
+from app.sheets.quota import sheets_quota  # noqa: E402
+
+
+def _guarded(operation: str, fn: Callable[[], Any], key: tuple = ()) -> Any:
+    """Sheets 呼び出しを計測し、クォータ予算・再試行・集約（sheets_quota）を通す"""
+
+    def attempt():
+        with timed("sheets", operation):
+            return fn()
+
+    return sheets_quota.call((operation, *key), attempt)
 
 
 @lru_cache(maxsize=1)
@@ -23,10 +37,76 @@ def get_spreadsheet() -> gspread.Spreadsheet:
         settings.google_application_credentials, scopes=SCOPES
     )
     gc = gspread.authorize(creds)
-    return gc.open_by_key(settings.spreadsheet_id)
+    return _guarded("open_by_key", lambda: gc.open_by_key(settings.spreadsheet_id))
 
 
 def get_sheet(sheet_key: str) -> gspread.Worksheet:
     """SHEET_NAMES のキーでワークシートを取得する"""
     spreadsheet = get_spreadsheet()
     return spreadsheet.worksheet(SHEET_NAMES[sheet_key])
+
+
+# 最後に確認した modifiedTime（変わったらワークシート名を取り直す）
+_last_modified: str | None = None
+
+
+def get_last_update_time() -> str:
+    """スプレッドシートの最終更新日時（Drive の modifiedTime）を返す
+
+    前回と変わっていれば、起動後に追加・改名されたシートを拾えるよう
+    ワークシート名のキャッシュを捨てる。
+    """
+    global _last_modified
+    spreadsheet = get_spreadsheet()
+    modified = _guarded("get_last_update_time", spreadsheet.get_lastUpdateTime)
+    if modified != _last_modified:
+        _worksheet_titles.cache_clear()
+        _last_modified = modified
+    return modified
+
+
+@lru_cache(maxsize=1)
+def _worksheet_titles() -> frozenset[str]:
+    """スプレッドシートに存在するワークシート名を返す
+
+    modifiedTime が変わるまで（get_last_update_time が捨てるまで）使い回す。
+    """
+    spreadsheet = get_spreadsheet()
+    worksheets = _guarded("worksheets", spreadsheet.worksheets)
+    return frozenset(ws.title for ws in worksheets)
+
+
+def rows_to_records(values: list[list]) -> list[dict]:
+    """先頭行をヘッダーとして各行を dict に変換する（get_all_records 相当）"""
+    if not values:
+        return []
+    header = [str(h) for h in values[0]]
+    width = len(header)
+    return [
+        dict(zip(header, row + [""] * (width - len(row)), strict=False))
+        for row in values[1:]
+    ]
+
+
+def load_snapshot(sheet_keys: list[str] | None = None) -> dict[str, list[dict]]:
+    """SHEET_NAMES のシートを values_batch_get 1 回で取得し、キーごとのレコードを返す
+
+    スプレッドシートに存在しないシートは空リストになる。
+    """
+    keys = list(sheet_keys or SHEET_NAMES)
+    titles = _worksheet_titles()
+    present = [k for k in keys if SHEET_NAMES[k] in titles]
+    snapshot: dict[str, list[dict]] = {k: [] for k in keys}
+    if not present:
+        return snapshot
+    ranges = [f"'{SHEET_NAMES[k]}'!{COLUMN_RANGES[k]}" for k in present]
+    spreadsheet = get_spreadsheet()
+    response = _guarded(
+        "values_batch_get",
+        lambda: spreadsheet.values_batch_get(ranges),
+        key=tuple(ranges),
+    )
+    value_ranges = response.get("valueRanges", [])
+    for key, value_range in zip(present, value_ranges, strict=False):
+        snapshot[key] = rows_to_records(value_range.get("values", []))
+    return snapshot
@@ -1,21 +1,9 @@
-import logging
-
-import gspread
-
-from app.sheets.client import get_sheet
+from app.sheets.snapshot import fetch_sheet, register_parser
 from app.sheets.utils import to_float
 
 
-def fetch_dividend() -> list[dict]:
-    """配当・分配金シートから全データを取得。シートが存在しない場合は空リストを返す"""
-    try:
-        sheet = get_sheet("DIVIDEND")
-        records = sheet.get_all_records()
-    except gspread.exceptions.WorksheetNotFound:
-        return []
-    except Exception:
-        logging.exception("配当シート('DIVIDEND')の取得に失敗しました")
-        raise
+def parse_dividend(records: list[dict]) -> list[dict]:
+    """配当・分配金シートの行を配当データに変換する"""
     result = []
     for r in records:
         if not r.get("銘柄コード") or not r.get("受取日"):
@@ -32,3 +20,11 @@ def fetch_dividend() -> list[dict]:
             "totalJpy": to_float(r.get("配当合計（円）", 0)),
         })
     return result
+
+
+register_parser("DIVIDEND", parse_dividend)
+
+
+def fetch_dividend() -> list[dict]:
+    """配当・分配金シートから全データを取得。シートが存在しない場合は空リストを返す"""
+    return list(fetch_sheet("DIVIDEND"))
@@ -1,7 +1,48 @@
-from app.sheets.client import get_sheet
+from dataclasses import dataclass
+
+import numpy as np
+
+from app.sheets.snapshot import derive_sheet, fetch_sheet, register_parser
 from app.sheets.utils import to_float, to_float_or_none
 
 
+def calc_profit_batch(
+    profit: np.ndarray,
+    shares: np.ndarray,
+    currency: np.ndarray,
+    acquired_price_foreign: np.ndarray,
+    current_price_foreign: np.ndarray,
+    acquired_exchange_rate: np.ndarray,
+    current_exchange_rate: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """損益分離計算の配列版。(株価損益, 為替損益) の配列を返す
+
+    外貨建ての価格・為替レートの欠損は NaN で渡す。JPY 建て、または
+    いずれかが欠損している行は損益をそのまま株価損益とし、為替損益は 0 とする。
+    """
+    profit = np.asarray(profit, dtype=np.float64)
+    shares = np.asarray(shares, dtype=np.float64)
+    acquired_price = np.asarray(acquired_price_foreign, dtype=np.float64)
+    current_price = np.asarray(current_price_foreign, dtype=np.float64)
+    acquired_rate = np.asarray(acquired_exchange_rate, dtype=np.float64)
+    current_rate = np.asarray(current_exchange_rate, dtype=np.float64)
+
+    fallback = (
+        (np.asarray(currency) == "JPY")
+        | np.isnan(acquired_price)
+        | np.isnan(current_price)
+        | np.isnan(acquired_rate)
+        | np.isnan(current_rate)
+    )
+    with np.errstate(invalid="ignore"):
+        stock_profit = (current_price - acquired_price) * acquired_rate * shares
+        fx_profit = (current_rate - acquired_rate) * current_price * shares
+    return (
+        np.where(fallback, profit, stock_profit),
+        np.where(fallback, 0.0, fx_profit),
+    )
+
+
 def calc_profit(
     profit: float,
     shares: float,
@@ -11,62 +52,235 @@ def calc_profit(
     acquired_exchange_rate: float | None,
     current_exchange_rate: float | None,
 ) -> tuple[float, float]:
-    """損益分離計算。(株価損益, 為替損益) を返す"""
-    if (
-        currency == "JPY"
-        or acquired_price_foreign is None
-        or current_price_foreign is None
-        or acquired_exchange_rate is None
-        or current_exchange_rate is None
-    ):
-        return profit, 0.0
-    price_diff = current_price_foreign - acquired_price_foreign
-    stock_profit = price_diff * acquired_exchange_rate * shares
-    rate_diff = current_exchange_rate - acquired_exchange_rate
-    fx_profit = rate_diff * current_price_foreign * shares
-    return stock_profit, fx_profit
+    """損益分離計算。(株価損益, 為替損益) を返す（calc_profit_batch の 1 行版）"""
 
+    def column(value: float | None) -> np.ndarray:
+        return np.array([np.nan if value is None else value], dtype=np.float64)
 
-def fetch_performance(stock: str | None = None) -> list[dict]:
-    """損益レポートシートから月次損益データを取得"""
-    sheet = get_sheet("PERFORMANCE")
-    records = sheet.get_all_records()
+    stock_profit, fx_profit = calc_profit_batch(
+        column(profit),
+        column(shares),
+        np.array([currency]),
+        column(acquired_price_foreign),
+        column(current_price_foreign),
+        column(acquired_exchange_rate),
+        column(current_exchange_rate),
+    )
+    return float(stock_profit[0]), float(fx_profit[0])
+
+
+def _nan_if_none(value: float | None) -> float:
+    return np.nan if value is None else value
+
+
+def parse_performance(records: list[dict]) -> list[dict]:
+    """損益レポートシートの行を月次損益データに変換する"""
     result = []
+    columns: dict[str, list] = {
+        "shares": [],
+        "acquired_price": [],
+        "current_price": [],
+        "acquired_rate": [],
+        "current_rate": [],
+    }
     for r in records:
         if not r.get("銘柄コード") or not r.get("日付"):
             continue
-        code = str(r["銘柄コード"])
-        if stock and code != stock:
-            continue
-        profit = to_float(r.get("損益", 0))
-        shares = to_float(r.get("保有株数", 0))
-        currency = str(r.get("通貨", "JPY"))
-
-        acquired_price_foreign = to_float_or_none(r.get("取得単価（外貨）"))
-        current_price_foreign = to_float_or_none(r.get("月末価格（外貨）"))
-        acquired_exchange_rate = to_float_or_none(r.get("取得時為替レート"))
-        current_exchange_rate = to_float_or_none(r.get("現在為替レート"))
-
-        stock_profit, fx_profit = calc_profit(
-            profit,
-            shares,
-            currency,
-            acquired_price_foreign,
-            current_price_foreign,
-            acquired_exchange_rate,
-            current_exchange_rate,
+        columns["shares"].append(to_float(r.get("保有株数", 0)))
+        columns["acquired_price"].append(
+            _nan_if_none(to_float_or_none(r.get("取得単価（外貨）")))
+        )
+        columns["current_price"].append(
+            _nan_if_none(to_float_or_none(r.get("月末価格（外貨）")))
+        )
+        columns["acquired_rate"].append(
+            _nan_if_none(to_float_or_none(r.get("取得時為替レート")))
+        )
+        columns["current_rate"].append(
+            _nan_if_none(to_float_or_none(r.get("現在為替レート")))
         )
-
         result.append({
             "date": str(r["日付"]),
-            "code": code,
+            "code": str(r["銘柄コード"]),
             "name": str(r.get("銘柄名", "")),
             "cost": to_float(r.get("取得額", 0)),
             "value": to_float(r.get("評価額", 0)),
-            "profit": profit,
+            "profit": to_float(r.get("損益", 0)),
             "profitRate": to_float(r.get("損益率(%)", 0)),
-            "currency": currency,
-            "stockProfit": stock_profit,
-            "fxProfit": fx_profit,
+            "currency": str(r.get("通貨", "JPY")),
         })
+
+    # 株価損益・為替損益は全行まとめて 1 回で計算する
+    stock_profit, fx_profit = calc_profit_batch(
+        np.array([row["profit"] for row in result], dtype=np.float64),
+        np.array(columns["shares"], dtype=np.float64),
+        np.array([row["currency"] for row in result], dtype=np.str_),
+        np.array(columns["acquired_price"], dtype=np.float64),
+        np.array(columns["current_price"], dtype=np.float64),
+        np.array(columns["acquired_rate"], dtype=np.float64),
+        np.array(columns["current_rate"], dtype=np.float64),
+    )
+    for row, stock, fx in zip(
+        result, stock_profit.tolist(), fx_profit.tolist(), strict=True
+    ):
+        row["stockProfit"] = stock
+        row["fxProfit"] = fx
     return result
+
+
+register_parser("PERFORMANCE", parse_performance)
+
+
+def fetch_performance(stock: str | None = None) -> list[dict]:
+    """損益レポートシートから月次損益データを取得（キャッシュ経由）"""
+    records = fetch_sheet("PERFORMANCE")
+    if stock:
+        return [r for r in records if r["code"] == stock]
+    return list(records)
+
+
+@dataclass(frozen=True, eq=False)
+class PerformanceFrame:
+    """月次損益レコードの列指向表現
+
+    日付・銘柄コード・通貨はソート済みラベル配列への添字（カテゴリコード）で持ち、
+    金額列は float64 配列で持つ。月別・通貨別の集計は bincount 1 回で済む。
+    """
+
+    records: list[dict]
+    date_labels: np.ndarray
+    date_idx: np.ndarray
+    code_labels: np.ndarray
+    code_idx: np.ndarray
+    currency_labels: np.ndarray
+    currency_idx: np.ndarray
+    names: np.ndarray
+    value: np.ndarray
+    cost: np.ndarray
+    profit: np.ndarray
+    profit_rate: np.ndarray
+    # 日付昇順（同じ日付は元の並び順）の行番号と、その順に並べた日付コード
+    date_order: np.ndarray
+    sorted_date_idx: np.ndarray
+
+    @classmethod
+    def from_records(cls, records: list[dict]) -> "PerformanceFrame":
+        def categorical(column: str) -> tuple[np.ndarray, np.ndarray]:
+            values = np.array([r[column] for r in records], dtype=np.str_)
+            labels, idx = np.unique(values, return_inverse=True)
+            return labels, idx.astype(np.intp)
+
+        def numeric(column: str) -> np.ndarray:
+            return np.fromiter(
+                (r[column] for r in records), dtype=np.float64, count=len(records)
+            )
+
+        date_labels, date_idx = categorical("date")
+        code_labels, code_idx = categorical("code")
+        currency_labels, currency_idx = categorical("currency")
+        date_order = np.argsort(date_idx, kind="stable")
+        return cls(
+            records=records,
+            date_labels=date_labels,
+            date_idx=date_idx,
+            code_labels=code_labels,
+            code_idx=code_idx,
+            currency_labels=currency_labels,
+            currency_idx=currency_idx,
+            names=np.array([r["name"] for r in records], dtype=object),
+            value=numeric("value"),
+            cost=numeric("cost"),
+            profit=numeric("profit"),
+            profit_rate=numeric("profitRate"),
+            date_order=date_order,
+            sorted_date_idx=date_idx[date_order],
+        )
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @property
+    def latest_date(self) -> str:
+        return str(self.date_labels[-1]) if len(self.date_labels) else ""
+
+    @property
+    def symbols(self) -> list[str]:
+        """銘柄コード一覧（昇順）"""
+        return self.code_labels.tolist()
+
+    def latest_rows(self) -> np.ndarray:
+        """最新月の行番号（元の並び順）"""
+        return np.flatnonzero(self.date_idx == len(self.date_labels) - 1)
+
+    def rows_for_code(self, code: str) -> np.ndarray:
+        """指定銘柄の行番号（元の並び順）。存在しない銘柄は空配列"""
+        pos = int(np.searchsorted(self.code_labels, code))
+        if pos == len(self.code_labels) or self.code_labels[pos] != code:
+            return np.empty(0, dtype=np.intp)
+        return np.flatnonzero(self.code_idx == pos)
+
+    def rows_between(
+        self,
+        start: str | None = None,
+        end: str | None = None,
+        code: str | None = None,
+    ) -> np.ndarray:
+        """start〜end（両端を含む）の行番号を日付昇順で返す
+
+        start/end は "YYYY-MM" や "YYYY-MM-DD" の前方一致で比較する。
+        日付ソート済みの索引を二分探索するため全件走査しない。
+        """
+        lo = 0 if start is None else int(np.searchsorted(self.date_labels, start))
+        hi = len(self.date_labels)
+        if end is not None:
+            # end で始まる日付（"2024-03" に対する "2024-03-末" など）も含める
+            hi = int(np.searchsorted(self.date_labels, end + "\uffff", side="right"))
+        first, last = np.searchsorted(self.sorted_date_idx, [lo, hi])
+        rows = self.date_order[first:last]
+        if code is not None:
+            code_rows = self.rows_for_code(code)
+            rows = rows[np.isin(rows, code_rows, assume_unique=True)]
+        return rows
+
+    def to_records(self, rows: np.ndarray) -> list[dict]:
+        return [self.records[i] for i in rows.tolist()]
+
+    def group_by_month(self) -> dict[str, dict[str, float]]:
+        """日付昇順の {date: {"value", "cost", "profit"}}"""
+        n = len(self.date_labels)
+        sums = {
+            column: np.bincount(self.date_idx, weights=weights, minlength=n)
+            for column, weights in (
+                ("value", self.value),
+                ("cost", self.cost),
+                ("profit", self.profit),
+            )
+        }
+        return {
+            str(label): {column: float(total[i]) for column, total in sums.items()}
+            for i, label in enumerate(self.date_labels)
+        }
+
+    def group_by_currency(
+        self, rows: np.ndarray | None = None
+    ) -> dict[str, dict[str, float]]:
+        """{currency: {"value", "cost"}}（rows 指定時はその行だけを集計）"""
+        idx = self.currency_idx if rows is None else self.currency_idx[rows]
+        value = self.value if rows is None else self.value[rows]
+        cost = self.cost if rows is None else self.cost[rows]
+        n = len(self.currency_labels)
+        counts = np.bincount(idx, minlength=n)
+        value_sums = np.bincount(idx, weights=value, minlength=n)
+        cost_sums = np.bincount(idx, weights=cost, minlength=n)
+        return {
+            str(self.currency_labels[i]): {
+                "value": float(value_sums[i]),
+                "cost": float(cost_sums[i]),
+            }
+            for i in np.flatnonzero(counts)
+        }
+
+
+def get_performance_frame() -> PerformanceFrame:
+    """損益レポートの PerformanceFrame を返す（スナップショットごとに1回だけ構築）"""
+    return derive_sheet("PERFORMANCE", "frame", PerformanceFrame.from_records)
@@ -0,0 +1,43 @@
+"""シート変更のバックグラウンドポーリング
+
+取得元の更新日時（Sheets では Drive の modifiedTime、SQLite では
+DB ファイルの mtime）だけを定期的に確認し、変わったときだけ全シートを
+一括取得する。内容（生の行のハッシュ）が変わったシートだけをパースし直して
+キャッシュを差し替え、変わっていなければキャッシュの TTL を延長する。
+定常状態ではシート本体を読みに行かない。
+"""
+
+import asyncio
+import logging
+
+from app.data_source import get_data_source
+from app.sheets.snapshot import refresh_changed, touch_sheets
+
+logger = logging.getLogger(__name__)
+
+
+class SheetPoller:
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self._last_modified: str | None = None
+
+    def poll_once(self) -> list[str]:
+        """1 回分の確認を行い、内容が変わったシートのキーを返す"""
+        modified = get_data_source().last_update_time()
+        if modified == self._last_modified:
+            touch_sheets()
+            return []
+        changed = refresh_changed(modified)
+        self._last_modified = modified
+        if changed:
+            logger.info("シートの変更を検知しました: %s", ", ".join(changed))
+        return changed
+
+    async def run(self) -> None:
+        """interval ごとに poll_once をスレッドプールで実行し続ける"""
+        while True:
+            try:
+                await asyncio.to_thread(self.poll_once)
+            except Exception:
+                logger.exception("シート変更の確認に失敗しました")
+            await asyncio.sleep(self.interval)
@@ -1,11 +1,9 @@
-from app.sheets.client import get_sheet
+from app.sheets.snapshot import fetch_sheet, register_parser
 from app.sheets.utils import to_float, to_float_or_none
 
 
-def fetch_portfolio() -> list[dict]:
-    """ポートフォリオシートから全保有銘柄を取得"""
-    sheet = get_sheet("PORTFOLIO")
-    records = sheet.get_all_records()
+def parse_portfolio(records: list[dict]) -> list[dict]:
+    """ポートフォリオシートの行を保有銘柄データに変換する"""
     result = []
     for r in records:
         # 空行スキップ
@@ -44,3 +42,11 @@ def fetch_portfolio() -> list[dict]:
             "isForeign": is_foreign,
         })
     return result
+
+
+register_parser("PORTFOLIO", parse_portfolio)
+
+
+def fetch_portfolio() -> list[dict]:
+    """ポートフォリオシートから全保有銘柄を取得（キャッシュ経由）"""
+    return list(fetch_sheet("PORTFOLIO"))
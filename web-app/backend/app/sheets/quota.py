@@ -0,0 +1,226 @@
+"""Sheets API 呼び出しのクォータ予算・再試行・重複呼び出しの集約
+
+- トークンバケットで 1 分あたりの呼び出し回数を Sheets のクォータ内に抑える
+- 同じ読み取りが同時に来たら、1 回の呼び出し結果を全員で共有する
+- 429 / 5xx はジッター付き指数バックオフで再試行する
+- 予算切れ・再試行の打ち切り時は、同じ呼び出しの最後の成功結果を返す
+
+アクセスが集中しても Sheets を叩く回数は予算で頭打ちになり、
+エラーではなく少し古いデータを返す形で劣化する。
+"""
+
+import logging
+import random
+import threading
+import time
+from collections.abc import Callable, Hashable
+from typing import Any
+
+import requests
+from gspread.exceptions import APIError
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# 再試行の待ち時間（秒）: base * 2^attempt を上限 cap で切り、[0, その値) の一様乱数
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 16.0
+
+
+class QuotaExceededError(RuntimeError):
+    """呼び出し予算を使い切り、返せる過去の結果もない"""
+
+
+def is_retryable(error: Exception) -> bool:
+    """再試行で回復しうるエラー（429・5xx・接続エラー）か"""
+    if isinstance(error, APIError):
+        status = getattr(error.response, "status_code", error.code)
+        return status == 429 or status >= 500
+    return isinstance(error, requests.ConnectionError | requests.Timeout)
+
+
+class TokenBucket:
+    """rate 個/秒で補充され、最大 capacity 個まで貯まるトークンバケット"""
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def tokens(self) -> float:
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+    def acquire(self, timeout: float = 0.0) -> bool:
+        """トークンを 1 個取る。timeout 秒以内に補充されなければ False"""
+        deadline = self._clock() + timeout
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            # 期限までに補充されないなら待たずに諦める
+            if self._clock() + wait > deadline:
+                return False
+            self._sleep(wait)
+
+
+class _Call:
+    """実行中の呼び出し（同じキーの後続はこれの完了を待つ）"""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Exception | None = None
+
+
+class QuotaGuard:
+    """Sheets 呼び出しを予算・再試行・集約・最後の成功結果で包む
+
+    per_minute が 0 以下なら予算を設けない（再試行・集約は行う）。
+    """
+
+    def __init__(
+        self,
+        per_minute: float,
+        max_retries: int = 4,
+        wait: float = 5.0,
+        retryable: Callable[[Exception], bool] = is_retryable,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+        rand: Callable[[], float] = random.random,
+    ) -> None:
+        self.bucket = (
+            TokenBucket(per_minute / 60, per_minute, clock, sleep)
+            if per_minute > 0
+            else None
+        )
+        self.max_retries = max_retries
+        self.wait = wait
+        self._retryable = retryable
+        self._sleep = sleep
+        self._rand = rand
+        self._lock = threading.Lock()
+        self._inflight: dict[Hashable, _Call] = {}
+        self._last_good: dict[Hashable, Any] = {}
+        self.calls = 0
+        self.coalesced = 0
+        self.retries = 0
+        self.fallbacks = 0
+        self.rejected = 0
+
+    def call(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """fn を実行して結果を返す。同じ key が実行中ならその結果を共有する"""
+        with self._lock:
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = _Call()
+            else:
+                self.coalesced += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._call_with_retry(key, fn)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            call.done.set()
+
+    def backoff(self, attempt: int) -> float:
+        """attempt 回目の再試行までの待ち時間（フルジッター）"""
+        return self._rand() * min(BACKOFF_CAP, BACKOFF_BASE * 2**attempt)
+
+    def _call_with_retry(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        attempt = 0
+        while True:
+            if self.bucket is not None and not self.bucket.acquire(self.wait):
+                with self._lock:
+                    self.rejected += 1
+                return self._fallback(
+                    key, QuotaExceededError("Sheets API の呼び出し予算を使い切りました")
+                )
+            with self._lock:
+                self.calls += 1
+            try:
+                result = fn()
+            except Exception as e:
+                if not self._retryable(e):
+                    raise
+                if attempt >= self.max_retries:
+                    return self._fallback(key, e)
+                delay = self.backoff(attempt)
+                attempt += 1
+                with self._lock:
+                    self.retries += 1
+                logger.warning(
+                    "Sheets API の呼び出しに失敗しました（%s）。%.1f 秒後に再試行します"
+                    "（%d/%d）",
+                    e, delay, attempt, self.max_retries,
+                )
+                self._sleep(delay)
+                continue
+            with self._lock:
+                self._last_good[key] = result
+            return result
+
+    def _fallback(self, key: Hashable, error: Exception) -> Any:
+        """最後の成功結果があれば返し、なければ error を送出する"""
+        with self._lock:
+            if key not in self._last_good:
+                raise error
+            self.fallbacks += 1
+            result = self._last_good[key]
+        logger.warning("Sheets API を呼び出せないため前回の結果を返します: %s", error)
+        return result
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "coalesced": self.coalesced,
+                "retries": self.retries,
+                "fallbacks": self.fallbacks,
+                "rejected": self.rejected,
+            }
+
+
+def _create_guard() -> QuotaGuard:
+    settings = get_settings()
+    return QuotaGuard(
+        settings.sheets_quota_per_minute,
+        max_retries=settings.sheets_max_retries,
+        wait=settings.sheets_quota_wait,
+    )
+
+
+sheets_quota = _create_guard()
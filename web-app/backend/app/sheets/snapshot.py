@@ -0,0 +1,175 @@
+"""全シートの一括読み込みとキャッシュへの格納
+
+各フェッチャーはパーサーを登録しておき、どのシートのキャッシュが
+切れても登録済みシートを取得元（既定は values_batch_get 1 回）からまとめて読み直す。
+
+キャッシュバックエンドが共有（SQLite）の場合は、読み込んだパース済み
+データをバックエンドにも置く。Sheets を読むのはリースを取れた 1 ワーカーだけで、
+他のワーカーはその結果をバックエンドから取り込む。
+"""
+
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+from app.cache_backend import get_cache_backend
+from app.data_source import get_data_source
+from app.sheets.cache import sheet_cache, snapshot_version
+
+_PARSERS: dict[str, Callable[[list[dict]], list[dict]]] = {}
+_load_lock = threading.Lock()
+
+# Sheets の一括読み込みを 1 ワーカーに限るリースと、その保持上限（秒）
+REFRESH_LEASE = "sheets-refresh"
+LEASE_TTL = 60.0
+# 他のワーカーの読み込み完了を待つ最長時間と確認間隔（秒）
+LEASE_WAIT = 10.0
+LEASE_POLL = 0.2
+# 最後に取り込んだ Drive の modifiedTime を置くバックエンドのキー
+MODIFIED_KEY = "__modified__"
+
+
+def register_parser(
+    sheet_key: str, parser: Callable[[list[dict]], list[dict]]
+) -> None:
+    """シートの行をパース済みデータに変換する関数を登録する"""
+    _PARSERS[sheet_key] = parser
+
+
+def _apply_snapshot(
+    snapshot: dict[str, list[dict]],
+) -> tuple[dict[str, list[dict]], list[str]]:
+    """一括取得した行をキャッシュに取り込む。内容が変わったシートだけパースし直す
+
+    (キーごとのパース済みデータ, 内容が変わったキーのリスト) を返す。
+    """
+    values: dict[str, list[dict]] = {}
+    changed: list[str] = []
+    for key, records in snapshot.items():
+        # バージョンは生の行から計算する（シートが変わらなければ同じ値）
+        version = snapshot_version(records)
+        current = sheet_cache.current(key)
+        if current is not None and current[1] == version:
+            sheet_cache.touch(key)
+            values[key] = current[0]
+        else:
+            values[key] = _PARSERS[key](records)
+            sheet_cache.set(key, values[key], version=version)
+            changed.append(key)
+        backend = get_cache_backend()
+        if backend.shared:
+            # 変わっていなくても格納時刻を進め、他のワーカーに最新だと伝える
+            backend.save(key, values[key], version)
+    return values, changed
+
+
+def sync_from_backend() -> list[str]:
+    """共有バックエンド上の版をキャッシュに取り込み、内容が変わったキーを返す"""
+    backend = get_cache_backend()
+    if not backend.shared:
+        return []
+    changed: list[str] = []
+    for key in _PARSERS:
+        stored = backend.load(key)
+        if stored is None:
+            continue
+        current = sheet_cache.current(key)
+        if current is not None and current[1] == stored.version:
+            sheet_cache.touch(key, age=stored.age)
+            continue
+        sheet_cache.set(key, stored.value, version=stored.version, age=stored.age)
+        changed.append(key)
+    return changed
+
+
+def _read_all() -> list[str]:
+    """取得元から登録済みの全シートを読んで取り込み、内容が変わったキーを返す"""
+    return _apply_snapshot(get_data_source().load_snapshot(list(_PARSERS)))[1]
+
+
+def _load_all(satisfied: Callable[[], bool], marker: str | None = None) -> list[str]:
+    """登録済みの全シートを一括取得して取り込み、内容が変わったキーを返す
+
+    共有バックエンドではリースを取れたときだけ Sheets を読む。取れない間は
+    他のワーカーの結果をバックエンドから取り込み、satisfied() が真になれば
+    自分では読まない。marker はリース保持中に MODIFIED_KEY として保存する。
+    """
+    backend = get_cache_backend()
+    if not backend.shared:
+        return _read_all()
+
+    changed: list[str] = []
+    deadline = time.monotonic() + LEASE_WAIT
+    while True:
+        if backend.acquire(REFRESH_LEASE, LEASE_TTL):
+            try:
+                # 直前までリースを持っていたワーカーの結果で足りるか確認する
+                changed += sync_from_backend()
+                if not satisfied():
+                    changed += _read_all()
+                    if marker is not None:
+                        backend.save(MODIFIED_KEY, marker, marker)
+            finally:
+                backend.release(REFRESH_LEASE)
+            break
+        if time.monotonic() >= deadline:
+            # リースの保持者が応答しない場合は自分で読む
+            changed += _read_all()
+            break
+        time.sleep(LEASE_POLL)
+        changed += sync_from_backend()
+        if satisfied():
+            break
+    return list(dict.fromkeys(changed))
+
+
+def load_sheet(sheet_key: str) -> list[dict]:
+    """登録済みの全シートを一括取得してキャッシュに格納し、sheet_key の値を返す"""
+    with _load_lock:
+        # 待っている間に他のスレッドが一括取得を済ませていればそれを使う
+        cached = sheet_cache.peek(sheet_key)
+        if cached is not None:
+            return cached
+        _load_all(lambda: sheet_cache.peek(sheet_key) is not None)
+        current = sheet_cache.current(sheet_key)
+        if current is None:
+            # パーサー未登録のキーは一括取得の対象にならない
+            raise ValueError(f"パーサーが登録されていないシートです: {sheet_key}")
+        return current[0]
+
+
+def refresh_changed(modified: str | None = None) -> list[str]:
+    """登録済みの全シートを一括取得し、内容が変わったシートのキーを返す
+
+    modified（Drive の modifiedTime）を渡すと、共有バックエンド上で他の
+    ワーカーがその版を取り込み済みなら Sheets を読まずにそれを使う。
+    """
+    backend = get_cache_backend()
+
+    def satisfied() -> bool:
+        stored = backend.load(MODIFIED_KEY)
+        return modified is not None and stored is not None and stored.value == modified
+
+    with _load_lock:
+        return _load_all(satisfied, marker=modified)
+
+
+def touch_sheets() -> None:
+    """登録済みシートのキャッシュを最新として扱う（TTL を延長する）"""
+    for key in _PARSERS:
+        sheet_cache.touch(key)
+
+
+def fetch_sheet(sheet_key: str) -> list[dict]:
+    """sheet_key のパース済みデータをキャッシュ経由で返す"""
+    return sheet_cache.get(sheet_key, lambda: load_sheet(sheet_key))
+
+
+def derive_sheet(
+    sheet_key: str, name: str, builder: Callable[[list[dict]], Any]
+) -> Any:
+    """sheet_key のデータから作る派生値をスナップショットごとに1回だけ計算する"""
+    return sheet_cache.derive(
+        sheet_key, name, builder, lambda: load_sheet(sheet_key)
+    )
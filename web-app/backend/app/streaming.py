@@ -0,0 +1,57 @@
+"""大きな行データを NDJSON でストリーミング返却するためのヘルパー
+
+?format=ndjson または Accept: application/x-ndjson のとき、
+pydantic モデルのリストを組み立てずに 1 行 1 JSON で逐次送る。
+サマリー項目（symbols・latestRate など）は含まず、行データだけを返す。
+"""
+
+from collections.abc import Iterable, Iterator
+
+import orjson
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# 1 チャンクにまとめる行数（行ごとに送るとオーバーヘッドが大きい）
+CHUNK_ROWS = 256
+
+# 依存関数（ETag など）が設定したヘッダーのうち引き継ぐもの
+_FORWARDED_HEADERS = ("etag", "cache-control", "vary")
+
+
+def wants_ndjson(request: Request, fmt: str | None) -> bool:
+    """クエリ format または Accept ヘッダーで NDJSON が要求されているか"""
+    if fmt is not None:
+        return fmt == "ndjson"
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def _encode(rows: Iterable[dict]) -> Iterator[bytes]:
+    chunk: list[bytes] = []
+    for row in rows:
+        chunk.append(orjson.dumps(row))
+        if len(chunk) >= CHUNK_ROWS:
+            yield b"\n".join(chunk) + b"\n"
+            chunk = []
+    if chunk:
+        yield b"\n".join(chunk) + b"\n"
+
+
+def ndjson_response(
+    rows: Iterable[dict],
+    response: Response,
+    headers: dict[str, str] | None = None,
+) -> StreamingResponse:
+    """rows を NDJSON でストリーミングするレスポンスを作る"""
+    headers = {
+        **{
+            name: response.headers[name]
+            for name in _FORWARDED_HEADERS
+            if name in response.headers
+        },
+        **(headers or {}),
+    }
+    return StreamingResponse(
+        _encode(rows), media_type=NDJSON_MEDIA_TYPE, headers=headers
+    )
@@ -1,6 +1,17 @@
+import asyncio
+import contextlib
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 
+from app.cache_backend import create_cache_backend, set_cache_backend
+from app.compression import CompressionMiddleware
+from app.config import get_settings
+from app.data_source import create_data_source, set_data_source
+from app.metrics import MetricsMiddleware, metrics
 from app.routers import (
     benchmark,
     currency,
@@ -10,16 +21,52 @@ from app.routers import (
     history,
     portfolio,
     reports,
+    stream,
 )
+from app.sheets.cache import sheet_cache
+from app.sheets.poller import SheetPoller
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncGenerator[None]:
+    """キャッシュバックエンド・取得元を設定し、変更のポーリングをバックグラウンドで動かす"""
+    settings = get_settings()
+    set_cache_backend(
+        create_cache_backend(settings.cache_backend, settings.cache_path)
+    )
+    set_data_source(
+        create_data_source(
+            settings.data_source, settings.sqlite_db_path, settings.sqlite_pool_size
+        )
+    )
+    interval = settings.sheets_poll_interval
+    task = asyncio.create_task(SheetPoller(interval).run()) if interval > 0 else None
+    yield
+    if task is not None:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
 
-app = FastAPI(title="ポートフォリオ管理 API", version="1.0.0")
+
+app = FastAPI(
+    title="ポートフォリオ管理 API",
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
+)
 
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000"],
     allow_methods=["GET"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
+app.add_middleware(
+    CompressionMiddleware, minimum_size=get_settings().compression_min_size
+)
+# 最外側に置き、CORS を含めたレスポンス時間を計測する
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(dashboard.router, prefix="/api")
 app.include_router(portfolio.router, prefix="/api")
@@ -29,8 +76,21 @@ app.include_router(dividend.router, prefix="/api")
 app.include_router(reports.router, prefix="/api")
 app.include_router(benchmark.router, prefix="/api")
 app.include_router(exposure.router, prefix="/api")
+app.include_router(stream.router, prefix="/api")
 
 
 @app.get("/health")
 async def health() -> dict[str, str]:
     return {"status": "ok"}
+
+
+@app.get("/health/cache")
+async def cache_stats() -> dict[str, int]:
+    """シートキャッシュのヒット/ミス統計を返す"""
+    return sheet_cache.stats()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics() -> str:
+    """レイテンシ・外部 API 呼び出し・キャッシュの統計を Prometheus 形式で返す"""
+    return metrics.render()
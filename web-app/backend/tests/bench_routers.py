@@ -0,0 +1,339 @@
+"""全ルーターのベンチマークハーネス
+
+Sheets をローカルのフェイクスプレッドシート（保有銘柄数 × 月数を指定）に
+差し替え、全 GET エンドポイントを並行クライアントで叩いて
+スループットとレイテンシ（p50 / p95 / p99）を計測し、JSON に保存する。
+ネットワーク（Sheets・yfinance）には一切出ない。
+
+使い方（web-app/backend で実行）:
+    uv run python -m tests.bench_routers --holdings 50 --months 120 \\
+        --concurrency 16 --requests 200 --output data/bench.json
+
+--cold を付けると各リクエストの前にシートキャッシュを捨て、
+一括取得・パースを含む経路を計測する。
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import httpx
+
+from app.data_source import SheetsDataSource, get_data_source, set_data_source
+from app.sheets import client
+from app.sheets.cache import sheet_cache
+from app.sheets.quota import QuotaGuard
+from main import app
+
+# 計測対象（/api/stream は接続し続けるため除く）
+ENDPOINTS = (
+    "/api/dashboard",
+    "/api/portfolio",
+    "/api/history",
+    "/api/history?stock=B0000&limit=50",
+    "/api/history?format=ndjson",
+    "/api/currency",
+    "/api/dividend",
+    "/api/reports",
+    "/api/reports/{year}/{month}",
+    "/api/benchmark",
+    "/api/exposure",
+)
+
+
+def _month_ends(months: int, start_year: int = 2020) -> list[tuple[int, int]]:
+    return [(start_year + i // 12, i % 12 + 1) for i in range(months)]
+
+
+class FakeSpreadsheet:
+    """holdings 銘柄 × months か月分の行を持つスプレッドシートの代替"""
+
+    def __init__(self, holdings: int, months: int) -> None:
+        self.holdings = holdings
+        self.months = _month_ends(months)
+        self.values = self._build()
+        self.batch_calls = 0
+
+    def _build(self) -> dict[str, list[list]]:
+        codes = [f"B{i:04d}" for i in range(self.holdings)]
+        currencies = ["JPY" if i % 2 == 0 else "USD" for i in range(self.holdings)]
+
+        portfolio = [[
+            "銘柄コード", "銘柄名", "取得日", "取得単価（円）", "取得単価（外貨）",
+            "取得時為替レート", "保有株数", "取得額合計", "通貨", "外国株フラグ",
+        ]]
+        for i, (code, currency) in enumerate(zip(codes, currencies, strict=True)):
+            foreign = currency != "JPY"
+            portfolio.append([
+                code, f"銘柄{i}", "2020-01-06", "15,000",
+                "100" if foreign else "", "150" if foreign else "",
+                "10", "150,000", currency, "○" if foreign else "",
+            ])
+
+        performance = [[
+            "日付", "銘柄コード", "銘柄名", "取得単価", "月末価格", "保有株数",
+            "取得額", "評価額", "損益", "損益率(%)", "更新日時", "通貨",
+            "取得単価（外貨）", "月末価格（外貨）",
+            "取得時為替レート", "現在為替レート",
+        ]]
+        currency_rows = [["取得日", "通貨ペア", "レート", "前回レート", "変動率(%)"]]
+        dividend = [[
+            "受取日", "銘柄コード", "銘柄名", "1株配当（外貨）", "保有株数",
+            "配当合計（外貨）", "通貨", "為替レート", "配当合計（円）",
+        ]]
+        for m, (year, month) in enumerate(self.months):
+            date = f"{year}-{month:02d}-末"
+            rate = 110 + (m % 40)
+            currency_rows.append(
+                [f"{year}-{month:02d}-28", "USD/JPY", str(rate), "", ""]
+            )
+            for i, (code, currency) in enumerate(zip(codes, currencies, strict=True)):
+                value = 150_000 * (1 + ((m + i) % 30 - 10) / 100)
+                profit = value - 150_000
+                foreign = currency != "JPY"
+                foreign_columns = (
+                    ["100", f"{value / 10 / rate:.2f}", "150", str(rate)]
+                    if foreign
+                    else ["", "", "", ""]
+                )
+                performance.append([
+                    date, code, f"銘柄{i}", "15,000", str(value / 10), "10",
+                    "150,000", f"{value:.0f}", f"{profit:.0f}",
+                    f"{profit / 1500:.2f}", "", currency, *foreign_columns,
+                ])
+                if month in (3, 9) and i % 3 == 0:
+                    dividend.append([
+                        f"{year}-{month:02d}-15", code, f"銘柄{i}", "1", "10", "10",
+                        currency, str(rate), str(10 * rate),
+                    ])
+        return {
+            "ポートフォリオ": portfolio,
+            "損益レポート": performance,
+            "為替レート": currency_rows,
+            "配当・分配金": dividend,
+        }
+
+    def worksheets(self):
+        return [SimpleNamespace(title=title) for title in self.values]
+
+    def worksheet(self, title: str):
+        rows = self.values[title]
+        return SimpleNamespace(title=title, get_all_values=lambda: rows)
+
+    def get_lastUpdateTime(self) -> str:
+        return "2024-01-01T00:00:00Z"
+
+    def values_batch_get(self, ranges, params=None):
+        self.batch_calls += 1
+        return {
+            "valueRanges": [
+                {"range": a1, "values": self.values[a1.split("!")[0].strip("'")]}
+                for a1 in ranges
+            ]
+        }
+
+
+class BenchDataSource(SheetsDataSource):
+    """Sheets はフェイクを読み、ベンチマーク指数は合成値を返す取得元"""
+
+    def monthly_closes(
+        self, start_year: int, start_month: int
+    ) -> dict[tuple[int, int], dict]:
+        closes = {}
+        for i, ym in enumerate(_month_ends(240)):
+            if ym >= (start_year, start_month):
+                closes[ym] = {"nikkei225": 20000 + 50 * i, "sp500": 2000 + 10 * i}
+        return closes
+
+
+def _write_reports(directory: Path, months: list[tuple[int, int]]) -> None:
+    body = "# 月次レポート\n\n" + "本文です。\n" * 200
+    for year, month in months:
+        (directory / f"blog_draft_{year}_{month:02d}.md").write_text(
+            body, encoding="utf-8"
+        )
+
+
+@dataclass
+class EndpointResult:
+    path: str
+    requests: int = 0
+    errors: int = 0
+    seconds: float = 0.0
+    latencies_ms: list[float] = field(default_factory=list, repr=False)
+
+    def summary(self) -> dict:
+        latencies = sorted(self.latencies_ms)
+
+        def percentile(p: float) -> float | None:
+            if not latencies:
+                return None
+            index = min(len(latencies) - 1, round(p / 100 * (len(latencies) - 1)))
+            return round(latencies[index], 3)
+
+        return {
+            "path": self.path,
+            "requests": self.requests,
+            "errors": self.errors,
+            "throughputRps": round(self.requests / self.seconds, 1)
+            if self.seconds
+            else None,
+            "meanMs": round(statistics.fmean(latencies), 3) if latencies else None,
+            "p50Ms": percentile(50),
+            "p95Ms": percentile(95),
+            "p99Ms": percentile(99),
+        }
+
+
+async def _drive(
+    http: httpx.AsyncClient,
+    path: str,
+    concurrency: int,
+    total: int,
+    cold: bool,
+) -> EndpointResult:
+    """concurrency 本のクライアントで path を合計 total 回叩く"""
+    result = EndpointResult(path)
+    remaining = total
+
+    async def worker() -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            if cold:
+                sheet_cache.invalidate()
+            start = time.perf_counter()
+            try:
+                response = await http.get(path)
+                ok = response.status_code == 200
+            except httpx.HTTPError:
+                ok = False
+            result.latencies_ms.append((time.perf_counter() - start) * 1000)
+            result.requests += 1
+            result.errors += not ok
+
+    # 1 回目でキャッシュを温めてから計測する（--cold 以外）
+    await http.get(path)
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+async def run_benchmark(
+    holdings: int = 20,
+    months: int = 60,
+    concurrency: int = 8,
+    requests: int = 100,
+    cold: bool = False,
+    endpoints: tuple[str, ...] = ENDPOINTS,
+) -> dict:
+    """フェイクデータで全エンドポイントを計測し、結果の dict を返す"""
+    spreadsheet = FakeSpreadsheet(holdings, months)
+    last_year, last_month = spreadsheet.months[-1]
+    previous_source = get_data_source()
+    with (
+        tempfile.TemporaryDirectory() as reports_dir,
+        patch("app.sheets.client.get_spreadsheet", return_value=spreadsheet),
+        patch("app.reports._OUTPUT_DIR", Path(reports_dir)),
+        # フェイクにはクォータがないので、--cold でも予算待ちを入れない
+        patch("app.sheets.client.sheets_quota", QuotaGuard(0)),
+    ):
+        _write_reports(Path(reports_dir), spreadsheet.months[-24:])
+        set_data_source(BenchDataSource())
+        sheet_cache.invalidate()
+        client._worksheet_titles.cache_clear()
+        try:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://bench"
+            ) as http:
+                results = []
+                for path in endpoints:
+                    path = path.format(year=last_year, month=last_month)
+                    results.append(
+                        await _drive(http, path, concurrency, requests, cold)
+                    )
+        finally:
+            set_data_source(previous_source)
+            sheet_cache.invalidate()
+            client._worksheet_titles.cache_clear()
+
+    return {
+        "startedAt": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "config": {
+            "holdings": holdings,
+            "months": months,
+            "performanceRows": holdings * months,
+            "concurrency": concurrency,
+            "requestsPerEndpoint": requests,
+            "cold": cold,
+        },
+        "sheetsBatchCalls": spreadsheet.batch_calls,
+        "endpoints": [r.summary() for r in results],
+    }
+
+
+def _print_table(report: dict) -> None:
+    print(
+        f"{'endpoint':<40} {'req':>6} {'err':>4} {'rps':>9} "
+        f"{'p50ms':>8} {'p95ms':>8} {'p99ms':>8}"
+    )
+    for row in report["endpoints"]:
+        print(
+            f"{row['path']:<40} {row['requests']:>6} {row['errors']:>4} "
+            f"{row['throughputRps'] or 0:>9.1f} {row['p50Ms'] or 0:>8.2f} "
+            f"{row['p95Ms'] or 0:>8.2f} {row['p99Ms'] or 0:>8.2f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--holdings", type=int, default=20, help="保有銘柄数")
+    parser.add_argument("--months", type=int, default=60, help="月数")
+    parser.add_argument(
+        "--concurrency", type=int, default=8, help="並行クライアント数"
+    )
+    parser.add_argument(
+        "--requests", type=int, default=100, help="エンドポイントごとのリクエスト数"
+    )
+    parser.add_argument(
+        "--cold", action="store_true", help="リクエストごとにキャッシュを捨てる"
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=Path("data") / "bench-results.json",
+        help="結果の JSON（既定は git 管理外の data/）",
+    )
+    args = parser.parse_args()
+
+    report = asyncio.run(
+        run_benchmark(
+            holdings=args.holdings,
+            months=args.months,
+            concurrency=args.concurrency,
+            requests=args.requests,
+            cold=args.cold,
+        )
+    )
+    _print_table(report)
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(
+        json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8"
+    )
+    print(f"\n結果を保存しました: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""app/sheets/aggregates.py のテスト"""
+
+from unittest.mock import patch
+
+import pytest
+
+from app.sheets import aggregates
+from app.sheets.aggregates import (
+    build_performance_aggregates,
+    get_performance_aggregates,
+)
+from app.sheets.cache import sheet_cache
+from app.sheets.performance import PerformanceFrame
+
+
+def _record(date, code, value, cost, currency="JPY", name=None):
+    return {
+        "date": date,
+        "code": code,
+        "name": name or code,
+        "value": value,
+        "cost": cost,
+        "profit": value - cost,
+        "profitRate": (value - cost) / cost * 100,
+        "currency": currency,
+    }
+
+
+RECORDS = [
+    _record("2024-01-31", "7974", 110000.0, 100000.0),
+    _record("2024-01-31", "NVDA", 200000.0, 150000.0, currency="USD"),
+    _record("2024-02-29", "7974", 120000.0, 100000.0),
+    _record("2024-02-29", "NVDA", 180000.0, 150000.0, currency="USD"),
+    _record("2024-02-29", "0700.HK", 50000.0, 60000.0, currency="HKD"),
+]
+
+
+class TestBuildPerformanceAggregates:
+    def test_空データ(self):
+        agg = build_performance_aggregates(PerformanceFrame.from_records([]))
+        assert agg.latest_date == ""
+        assert agg.monthly_totals == {}
+
+    def test_月別合計は日付昇順(self):
+        agg = build_performance_aggregates(
+            PerformanceFrame.from_records(list(reversed(RECORDS)))
+        )
+        assert list(agg.monthly_totals) == ["2024-01-31", "2024-02-29"]
+        assert agg.monthly_totals["2024-01-31"]["value"] == pytest.approx(310000.0)
+        assert agg.monthly_totals["2024-02-29"]["cost"] == pytest.approx(310000.0)
+
+    def test_最新月のKPI(self):
+        agg = build_performance_aggregates(PerformanceFrame.from_records(RECORDS))
+        assert agg.latest_date == "2024-02-29"
+        assert agg.total_value == pytest.approx(350000.0)
+        assert agg.total_profit == pytest.approx(40000.0)
+
+    def test_最新月の通貨別合計(self):
+        agg = build_performance_aggregates(PerformanceFrame.from_records(RECORDS))
+        assert agg.currency_totals == {
+            "JPY": {"value": 120000.0, "cost": 100000.0},
+            "USD": {"value": 180000.0, "cost": 150000.0},
+            "HKD": {"value": 50000.0, "cost": 60000.0},
+        }
+
+    def test_構成比と損益は降順(self):
+        agg = build_performance_aggregates(PerformanceFrame.from_records(RECORDS))
+        assert [a["name"] for a in agg.allocation] == ["NVDA", "7974", "0700.HK"]
+        total = sum(a["percentage"] for a in agg.allocation)
+        assert total == pytest.approx(100, abs=0.05)
+        assert [p["name"] for p in agg.latest_profits] == ["NVDA", "7974", "0700.HK"]
+
+
+class TestGetPerformanceAggregates:
+    @pytest.fixture(autouse=True)
+    def clean_cache(self):
+        sheet_cache.invalidate()
+        yield
+        sheet_cache.invalidate()
+
+    def test_同じバージョンの間は再計算しない(self):
+        sheet_cache.set("PERFORMANCE", RECORDS, version="v1")
+        with patch.object(
+            aggregates,
+            "build_performance_aggregates",
+            wraps=build_performance_aggregates,
+        ) as build:
+            first = get_performance_aggregates()
+            second = get_performance_aggregates()
+        assert first is second
+        assert build.call_count == 1
+
+    def test_バージョンが変わると再計算する(self):
+        sheet_cache.set("PERFORMANCE", RECORDS, version="v1")
+        first = get_performance_aggregates()
+        sheet_cache.set("PERFORMANCE", RECORDS[:2], version="v2")
+        second = get_performance_aggregates()
+        assert first.latest_date == "2024-02-29"
+        assert second.latest_date == "2024-01-31"
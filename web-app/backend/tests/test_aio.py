@@ -0,0 +1,63 @@
+"""app/sheets/aio.py のユニットテスト"""
+
+import asyncio
+import threading
+import time
+
+from app.sheets.aio import run_coalesced
+
+
+class TestRunCoalesced:
+    def test_同時呼び出しは1回の実行を共有する(self):
+        calls = []
+
+        def slow_fetch():
+            calls.append(threading.get_ident())
+            time.sleep(0.05)
+            return [{"code": "7974"}]
+
+        async def main():
+            return await asyncio.gather(*(run_coalesced(slow_fetch) for _ in range(10)))
+
+        results = asyncio.run(main())
+        assert len(calls) == 1
+        assert all(r == [{"code": "7974"}] for r in results)
+
+    def test_引数が異なる呼び出しは別々に実行する(self):
+        calls = []
+
+        def fetch(start):
+            calls.append(start)
+            time.sleep(0.01)
+            return start
+
+        async def main():
+            return await asyncio.gather(
+                run_coalesced(fetch, "2024-01"),
+                run_coalesced(fetch, "2024-02"),
+            )
+
+        assert asyncio.run(main()) == ["2024-01", "2024-02"]
+        assert sorted(calls) == ["2024-01", "2024-02"]
+
+    def test_イベントループ外のスレッドで実行される(self):
+        loop_thread = threading.get_ident()
+
+        def fetch():
+            return threading.get_ident()
+
+        assert asyncio.run(run_coalesced(fetch)) != loop_thread
+
+    def test_完了後の呼び出しは再実行される(self):
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            return len(calls)
+
+        async def main():
+            first = await run_coalesced(fetch)
+            second = await run_coalesced(fetch)
+            return first, second
+
+        assert asyncio.run(main()) == (1, 2)
@@ -0,0 +1,29 @@
+"""ベンチマークハーネス（tests/bench_routers.py）が動くことの確認"""
+
+import asyncio
+
+from tests.bench_routers import ENDPOINTS, FakeSpreadsheet, run_benchmark
+
+
+class TestFakeSpreadsheet:
+    def test_銘柄数と月数に応じた行を持つ(self):
+        spreadsheet = FakeSpreadsheet(holdings=3, months=4)
+        # ヘッダー行 + 3 銘柄 × 4 か月
+        assert len(spreadsheet.values["損益レポート"]) == 1 + 12
+        assert len(spreadsheet.values["ポートフォリオ"]) == 1 + 3
+        assert len(spreadsheet.values["為替レート"]) == 1 + 4
+
+
+class TestRunBenchmark:
+    def test_全エンドポイントをエラーなしで計測する(self):
+        report = asyncio.run(
+            run_benchmark(holdings=3, months=4, concurrency=2, requests=4)
+        )
+        assert report["config"]["performanceRows"] == 12
+        assert len(report["endpoints"]) == len(ENDPOINTS)
+        for row in report["endpoints"]:
+            assert row["requests"] == 4
+            assert row["errors"] == 0, row["path"]
+            assert row["p50Ms"] <= row["p95Ms"] <= row["p99Ms"]
+        # 温まったキャッシュでは Sheets の一括取得は 1 回だけ
+        assert report["sheetsBatchCalls"] == 1
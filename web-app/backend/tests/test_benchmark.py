@@ -1,7 +1,7 @@
 """
 ベンチマーク比較エンドポイントのロジックテスト。
 
-fetch_performance を monkeypatch でモックして、
+損益レポートの集計値を monkeypatch でモックして、
 ネットワーク・Sheets アクセスなしで集計ロジックを検証する。
 """
 
@@ -11,6 +11,9 @@ from unittest.mock import patch
 import pandas as pd
 import pytest
 
+from app.sheets.aggregates import build_performance_aggregates
+from app.sheets.performance import PerformanceFrame
+
 
 # ベンチマーク集計ロジックを直接テストするためのヘルパー
 def _aggregate(records: list[dict]) -> dict[str, dict]:
@@ -85,37 +88,49 @@ class TestBenchmarkEndpoint:
     """FastAPI エンドポイントの統合テスト（Sheets・yfinance をモック）"""
 
     def test_パフォーマンスデータが空の場合は空リストを返す(self):
-        """fetch_performance が空リストを返すとき data: [] になること"""
+        """損益データが空のとき data: [] になること"""
         from fastapi.testclient import TestClient
 
         from main import app
 
-        with patch("app.routers.benchmark.fetch_performance", return_value=[]):
+        with patch(
+            "app.routers.benchmark.get_performance_aggregates",
+            return_value=build_performance_aggregates(
+                PerformanceFrame.from_records([])
+            ),
+        ):
             client = TestClient(app)
             response = client.get("/api/benchmark")
         assert response.status_code == 200
         body = response.json()
         assert body["data"] == []
 
-    def test_正常データで集計が正しい(self):
+    def test_正常データで集計が正しい(self, tmp_path):
         """2ヶ月分データ: 1月目は0%、2月目は10%になること"""
         from fastapi.testclient import TestClient
 
         from main import app
 
         records = [
-            {"date": "2024-01-末", "value": 100000.0, "cost": 100000.0},
-            {"date": "2024-02-末", "value": 110000.0, "cost": 100000.0},
+            {"date": "2024-01-末", "code": "A", "name": "A", "currency": "JPY",
+             "value": 100000.0, "cost": 100000.0, "profit": 0.0, "profitRate": 0.0},
+            {"date": "2024-02-末", "code": "A", "name": "A", "currency": "JPY",
+             "value": 110000.0, "cost": 100000.0, "profit": 10000.0,
+             "profitRate": 10.0},
         ]
 
         with (
             patch(
-                "app.routers.benchmark.fetch_performance",
-                return_value=records,
+                "app.routers.benchmark.get_performance_aggregates",
+                return_value=build_performance_aggregates(
+                    PerformanceFrame.from_records(records)
+                ),
             ),
-            patch("app.routers.benchmark.yf.download") as mock_dl,
+            patch("app.benchmark_store._DB_PATH", tmp_path / "benchmark.db"),
+            patch("app.benchmark_store._failed_at", None),
+            patch("yfinance.download") as mock_dl,
         ):
-            # 空 DataFrame を返すと except ブロックに落ちてベンチマーク値は None になる
+            # 空 DataFrame を返すと取得失敗扱いになりベンチマーク値は None になる
             mock_dl.return_value = pd.DataFrame()
 
             client = TestClient(app)
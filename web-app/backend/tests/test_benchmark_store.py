@@ -0,0 +1,188 @@
+"""app/benchmark_store.py のテスト（yfinance はモック）"""
+
+from datetime import UTC, date, datetime
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from app import benchmark_store
+
+
+def _monthly_frame(months: list[str], n225: list[float], sp500: list[float]):
+    """yf.download(interval="1mo") の戻り値を模した DataFrame"""
+    index = pd.to_datetime([f"{m}-01" for m in months])
+    columns = pd.MultiIndex.from_product([["Close"], ["^GSPC", "^N225"]])
+    return pd.DataFrame(
+        list(zip(sp500, n225, strict=True)), index=index, columns=columns
+    )
+
+
+@pytest.fixture(autouse=True)
+def db_path(tmp_path):
+    with (
+        patch.object(benchmark_store, "_DB_PATH", tmp_path / "benchmark.db"),
+        patch.object(benchmark_store, "_failed_at", None),
+    ):
+        yield
+
+
+class TestGetMonthlyCloses:
+    def test_初回は取得して保存する(self):
+        frame = _monthly_frame(["2024-01", "2024-02"], [36000, 39000], [4800, 5000])
+        with patch("yfinance.download", return_value=frame) as dl:
+            closes = benchmark_store.get_monthly_closes(
+                2024, 1, today=date(2024, 2, 15)
+            )
+        assert dl.call_count == 1
+        assert closes[(2024, 1)] == {"nikkei225": 36000, "sp500": 4800}
+        assert closes[(2024, 2)] == {"nikkei225": 39000, "sp500": 5000}
+
+    def test_確定済みの月は再取得しない(self):
+        frame = _monthly_frame(["2024-01", "2024-02"], [36000, 39000], [4800, 5000])
+        with patch("yfinance.download", return_value=frame):
+            benchmark_store.get_monthly_closes(2024, 1, today=date(2024, 3, 5))
+
+        # 翌月以降: 未確定の 3 月分だけを取りに行く
+        with (
+            patch.object(benchmark_store, "REFRESH_INTERVAL", 0),
+            patch(
+                "yfinance.download",
+                return_value=_monthly_frame(["2024-03"], [40000], [5200]),
+            ) as dl,
+        ):
+            closes = benchmark_store.get_monthly_closes(
+                2024, 1, today=date(2024, 3, 20)
+            )
+        assert dl.call_args.kwargs["start"] == "2024-03-01"
+        assert closes[(2024, 1)]["nikkei225"] == 36000
+        assert closes[(2024, 3)]["nikkei225"] == 40000
+
+    def test_全月確定済みならネットワークに出ない(self):
+        frame = _monthly_frame(["2024-01", "2024-02"], [36000, 39000], [4800, 5000])
+        with patch("yfinance.download", return_value=frame):
+            benchmark_store.get_monthly_closes(2024, 1, today=date(2024, 3, 1))
+        with patch("yfinance.download") as dl:
+            closes = benchmark_store.get_monthly_closes(
+                2024, 1, today=date(2024, 3, 1)
+            )
+        dl.assert_not_called()
+        assert set(closes) == {(2024, 1), (2024, 2)}
+
+    def test_当月はREFRESH_INTERVAL内なら取り直さない(self):
+        frame = _monthly_frame(["2024-01"], [36000], [4800])
+        today = date(2024, 1, 20)
+        with patch("yfinance.download", return_value=frame):
+            benchmark_store.get_monthly_closes(2024, 1, today=today)
+        with patch("yfinance.download") as dl:
+            benchmark_store.get_monthly_closes(2024, 1, today=today)
+        dl.assert_not_called()
+
+    def test_取得失敗時は保存済みの値を返す(self):
+        frame = _monthly_frame(["2024-01"], [36000], [4800])
+        with patch("yfinance.download", return_value=frame):
+            benchmark_store.get_monthly_closes(2024, 1, today=date(2024, 1, 31))
+        with (
+            patch.object(benchmark_store, "REFRESH_INTERVAL", 0),
+            patch("yfinance.download", side_effect=OSError("offline")),
+        ):
+            closes = benchmark_store.get_monthly_closes(
+                2024, 1, today=date(2024, 2, 10)
+            )
+        assert closes == {(2024, 1): {"nikkei225": 36000, "sp500": 4800}}
+
+    def test_欠損値の月は確定扱いにしない(self):
+        frame = _monthly_frame(["2024-01"], [float("nan")], [4800])
+        with patch("yfinance.download", return_value=frame):
+            closes = benchmark_store.get_monthly_closes(
+                2024, 1, today=date(2024, 3, 1)
+            )
+        assert closes[(2024, 1)] == {"nikkei225": None, "sp500": 4800}
+        with (
+            patch.object(benchmark_store, "REFRESH_INTERVAL", 0),
+            patch(
+                "yfinance.download",
+                return_value=_monthly_frame(["2024-01"], [36000], [4800]),
+            ) as dl,
+        ):
+            closes = benchmark_store.get_monthly_closes(
+                2024, 1, today=date(2024, 3, 1)
+            )
+        assert dl.call_args.kwargs["start"] == "2024-01-01"
+        assert closes[(2024, 1)]["nikkei225"] == 36000
+
+
+    def test_取引所の現地時間で月が明けるまで確定扱いにしない(self):
+        # JST では 3/1 00:30 だが、ニューヨークはまだ 2/29 10:30
+        jst_month_start = datetime(2024, 2, 29, 15, 30, tzinfo=UTC)
+        frame = _monthly_frame(["2024-02"], [39000], [5000])
+        with (
+            patch.object(benchmark_store, "_now", return_value=jst_month_start),
+            patch("yfinance.download", return_value=frame),
+        ):
+            benchmark_store.get_monthly_closes(2024, 2)
+
+        with (
+            patch.object(benchmark_store, "REFRESH_INTERVAL", 0),
+            patch("yfinance.download", return_value=frame) as dl,
+        ):
+            benchmark_store.get_monthly_closes(2024, 2, today=date(2024, 3, 5))
+        assert dl.call_args.kwargs["start"] == "2024-02-01"
+
+
+class TestDownloadLease:
+    def test_他のワーカーが取得中なら保存済みの値で応答する(self):
+        backend = benchmark_store.get_cache_backend()
+        assert backend.acquire(benchmark_store.DOWNLOAD_LEASE, ttl=60)
+        try:
+            with patch("yfinance.download") as dl:
+                closes = benchmark_store.get_monthly_closes(
+                    2024, 1, today=date(2024, 2, 15)
+                )
+        finally:
+            backend.release(benchmark_store.DOWNLOAD_LEASE)
+        assert dl.call_count == 0
+        assert closes == {}
+
+
+class TestDataVersion:
+    def test_取得して書き込むとバージョンが変わる(self):
+        assert benchmark_store.data_version() == ""
+        frame = _monthly_frame(["2024-01"], [36000], [4800])
+        with patch("yfinance.download", return_value=frame):
+            benchmark_store.get_monthly_closes(2024, 1, today=date(2024, 2, 15))
+        first = benchmark_store.data_version()
+        # 取得間隔内は取り直さないのでバージョンも変わらない
+        benchmark_store.get_monthly_closes(2024, 1, today=date(2024, 2, 15))
+        assert first != ""
+        assert benchmark_store.data_version() == first
+
+    def test_取得に失敗してもバージョンは変わらず間隔をおいて再試行する(self):
+        frame = _monthly_frame(["2024-01"], [36000], [4800])
+        with patch("yfinance.download", return_value=frame):
+            benchmark_store.get_monthly_closes(2024, 1, today=date(2024, 1, 31))
+        first = benchmark_store.data_version()
+
+        with (
+            patch.object(benchmark_store, "REFRESH_INTERVAL", 0),
+            patch("yfinance.download", side_effect=OSError("offline")) as dl,
+        ):
+            benchmark_store.get_monthly_closes(2024, 1, today=date(2024, 2, 10))
+            benchmark_store.get_monthly_closes(2024, 1, today=date(2024, 2, 10))
+        assert dl.call_count == 1
+        assert benchmark_store.data_version() == first
+
+        with (
+            patch.object(benchmark_store, "REFRESH_INTERVAL", 0),
+            patch.object(benchmark_store, "RETRY_INTERVAL", 0),
+            patch(
+                "yfinance.download",
+                return_value=_monthly_frame(["2024-02"], [39000], [5000]),
+            ) as dl,
+        ):
+            closes = benchmark_store.get_monthly_closes(
+                2024, 1, today=date(2024, 2, 10)
+            )
+        assert dl.call_count == 1
+        assert closes[(2024, 2)]["nikkei225"] == 39000
+        assert benchmark_store.data_version() != first
@@ -0,0 +1,120 @@
+"""app/sheets/cache.py のユニットテスト"""
+
+import threading
+
+import pytest
+
+from app.sheets.cache import SheetCache
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+class TestSheetCache:
+    def test_TTL内は2回目以降ローダーを呼ばない(self, clock):
+        cache = SheetCache(ttls={"PERFORMANCE": 60}, clock=clock)
+        calls = []
+
+        def loader():
+            calls.append(1)
+            return [{"code": "7974"}]
+
+        assert cache.get("PERFORMANCE", loader) == [{"code": "7974"}]
+        clock.now = 59
+        assert cache.get("PERFORMANCE", loader) == [{"code": "7974"}]
+        assert len(calls) == 1
+        stats = cache.stats()
+        assert stats["misses"] == 1
+        assert stats["hits"] == 1
+
+    def test_TTL切れは古い値を返しつつバックグラウンド更新する(self, clock):
+        cache = SheetCache(ttls={"PERFORMANCE": 60}, clock=clock)
+        cache.get("PERFORMANCE", lambda: "old")
+        clock.now = 61
+
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def slow_loader():
+            calls.append(1)
+            started.set()
+            release.wait(timeout=5)
+            return "new"
+
+        assert cache.get("PERFORMANCE", slow_loader) == "old"
+        assert started.wait(timeout=5)
+        # 更新中の再呼び出しは古い値を返し、更新を二重に起動しない
+        assert cache.get("PERFORMANCE", slow_loader) == "old"
+        release.set()
+        for t in threading.enumerate():
+            if t.name.startswith("sheet-cache-refresh-"):
+                t.join(timeout=5)
+
+        assert len(calls) == 1
+        assert cache.get("PERFORMANCE", slow_loader) == "new"
+        assert cache.stats()["staleHits"] == 2
+        assert cache.stats()["refreshes"] == 1
+
+    def test_バックグラウンド更新の失敗時は古い値を保持する(self, clock):
+        cache = SheetCache(ttls={"PERFORMANCE": 60}, clock=clock)
+        cache.get("PERFORMANCE", lambda: "old")
+        clock.now = 61
+
+        def failing_loader():
+            raise RuntimeError("quota exceeded")
+
+        assert cache.get("PERFORMANCE", failing_loader) == "old"
+        for t in threading.enumerate():
+            if t.name.startswith("sheet-cache-refresh-"):
+                t.join(timeout=5)
+        assert cache.stats()["errors"] == 1
+        assert cache.get("PERFORMANCE", lambda: "new") == "old"
+
+    def test_内容が変わらない更新のあとも次のTTL切れで再取得する(self, clock):
+        cache = SheetCache(ttls={"PERFORMANCE": 60}, clock=clock)
+        cache.get("PERFORMANCE", lambda: ["old"])
+        calls = []
+
+        def unchanged_loader():
+            # 一括読み込みで内容が同じだった場合と同じく、格納済みの値をそのまま返す
+            calls.append(1)
+            cache.touch("PERFORMANCE")
+            current = cache.current("PERFORMANCE")
+            assert current is not None
+            return current[0]
+
+        for now in (61, 122):
+            clock.now = now
+            cache.get("PERFORMANCE", unchanged_loader)
+            for t in threading.enumerate():
+                if t.name.startswith("sheet-cache-refresh-"):
+                    t.join(timeout=5)
+
+        assert len(calls) == 2
+        assert cache.stats()["refreshes"] == 2
+
+    def test_maxsizeを超えたら最も古いキーを捨てる(self, clock):
+        cache = SheetCache(maxsize=2, clock=clock)
+        cache.get("A", lambda: 1)
+        cache.get("B", lambda: 2)
+        cache.get("A", lambda: 1)
+        cache.get("C", lambda: 3)
+        assert cache.stats()["size"] == 2
+        assert cache.get("B", lambda: "reloaded") == "reloaded"
+
+    def test_invalidateで再読み込みされる(self, clock):
+        cache = SheetCache(clock=clock)
+        cache.get("CURRENCY", lambda: 1)
+        cache.invalidate("CURRENCY")
+        assert cache.get("CURRENCY", lambda: 2) == 2
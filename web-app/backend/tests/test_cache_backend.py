@@ -0,0 +1,126 @@
+"""キャッシュバックエンド（プロセス内 / SQLite 共有）のテスト"""
+
+import pytest
+
+import app.sheets.currency  # noqa: F401  パーサー登録のため
+import app.sheets.dividend  # noqa: F401
+import app.sheets.portfolio  # noqa: F401
+from app import cache_backend
+from app.cache_backend import (
+    MemoryBackend,
+    SqliteBackend,
+    create_cache_backend,
+    set_cache_backend,
+)
+from app.sheets import client, snapshot
+from app.sheets.cache import sheet_cache
+from app.sheets.performance import fetch_performance
+from tests.test_poller import FakeSpreadsheet
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    return create_cache_backend(request.param, str(tmp_path / "cache.db"))
+
+
+class TestBackendContract:
+    def test_格納した値とバージョンを返す(self, backend):
+        assert backend.load("PERFORMANCE") is None
+        backend.save("PERFORMANCE", [{"date": "2024-01-31", "value": 1.5}], "v1")
+        stored = backend.load("PERFORMANCE")
+        assert stored.value == [{"date": "2024-01-31", "value": 1.5}]
+        assert stored.version == "v1"
+        assert stored.age < 5
+
+    def test_リースは保持中は取れず解放後に取れる(self, backend):
+        assert backend.acquire("lease", ttl=60)
+        assert not backend.acquire("lease", ttl=60)
+        backend.release("lease")
+        assert backend.acquire("lease", ttl=60)
+
+    def test_期限切れのリースは取り直せる(self, backend):
+        assert backend.acquire("lease", ttl=-1)
+        assert backend.acquire("lease", ttl=60)
+
+    def test_未知の種類はエラー(self):
+        with pytest.raises(ValueError):
+            create_cache_backend("redis")
+
+
+class TestSqliteSharing:
+    def test_同じファイルの別インスタンスと値とリースを共有する(self, tmp_path):
+        worker_a = SqliteBackend(tmp_path / "cache.db")
+        worker_b = SqliteBackend(tmp_path / "cache.db")
+        worker_a.save("CURRENCY", [{"rate": 147.0}], "v1")
+        stored = worker_b.load("CURRENCY")
+        assert stored is not None
+        assert stored.value == [{"rate": 147.0}]
+
+        assert worker_a.acquire("lease", ttl=60)
+        assert not worker_b.acquire("lease", ttl=60)
+        # 他者のリースは解放できない
+        worker_b.release("lease")
+        assert not worker_b.acquire("lease", ttl=60)
+        worker_a.release("lease")
+        assert worker_b.acquire("lease", ttl=60)
+
+
+@pytest.fixture
+def spreadsheet(monkeypatch):
+    fake = FakeSpreadsheet()
+    sheet_cache.invalidate()
+    client._worksheet_titles.cache_clear()
+    monkeypatch.setattr(client, "get_spreadsheet", lambda: fake)
+    yield fake
+    sheet_cache.invalidate()
+    client._worksheet_titles.cache_clear()
+    set_cache_backend(MemoryBackend())
+
+
+class TestSharedSnapshot:
+    def test_他のワーカーが取得済みならSheetsを読まない(self, spreadsheet, tmp_path):
+        set_cache_backend(SqliteBackend(tmp_path / "cache.db"))
+        first = fetch_performance()
+        assert spreadsheet.batch_calls == 1
+
+        # 別ワーカー: キャッシュは空、同じファイルを指す別インスタンス
+        sheet_cache.invalidate()
+        set_cache_backend(SqliteBackend(tmp_path / "cache.db"))
+        assert fetch_performance() == first
+        assert spreadsheet.batch_calls == 1
+
+    def test_リース保持中は保持者の結果を待って取り込む(
+        self, spreadsheet, tmp_path, monkeypatch
+    ):
+        other = SqliteBackend(tmp_path / "cache.db")
+        set_cache_backend(SqliteBackend(tmp_path / "cache.db"))
+        assert other.acquire(snapshot.REFRESH_LEASE, ttl=60)
+
+        def other_worker_finishes(_seconds):
+            other.save("PERFORMANCE", [{"code": "7974"}], "other")
+            other.release(snapshot.REFRESH_LEASE)
+
+        monkeypatch.setattr(snapshot.time, "sleep", other_worker_finishes)
+        assert fetch_performance() == [{"code": "7974"}]
+        assert spreadsheet.batch_calls == 0
+
+    def test_同じmodifiedTimeを取り込み済みなら読み直さない(
+        self, spreadsheet, tmp_path
+    ):
+        set_cache_backend(SqliteBackend(tmp_path / "cache.db"))
+        changed = snapshot.refresh_changed(spreadsheet.modified)
+        assert "PERFORMANCE" in changed
+        assert spreadsheet.batch_calls == 1
+
+        sheet_cache.invalidate()
+        set_cache_backend(SqliteBackend(tmp_path / "cache.db"))
+        changed = snapshot.refresh_changed(spreadsheet.modified)
+        assert "PERFORMANCE" in changed
+        assert spreadsheet.batch_calls == 1
+
+    def test_プロセス内バックエンドでは従来どおり読み込む(self, spreadsheet):
+        assert not cache_backend.get_cache_backend().shared
+        fetch_performance()
+        sheet_cache.invalidate()
+        fetch_performance()
+        assert spreadsheet.batch_calls == 2
@@ -0,0 +1,142 @@
+"""gzip / Brotli 圧縮ミドルウェアのテスト"""
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from app.compression import CompressionMiddleware, choose_encoding
+from app.sheets.cache import sheet_cache
+from main import app
+
+CURRENCY = [
+    {"date": f"{2000 + m // 12}-{m % 12 + 1:02d}-末", "pair": "USD/JPY",
+     "rate": 100.0 + m, "changeRate": None, "high": None, "low": None}
+    for m in range(120)
+]
+
+LARGE = "x" * 4096
+
+
+def _large(request):
+    return PlainTextResponse(LARGE, headers={"ETag": 'W/"v1"'})
+
+
+def _small(request):
+    return PlainTextResponse("ok")
+
+
+def _binary(request):
+    return Response(b"\x00" * 4096, media_type="image/png")
+
+
+def _stream(request):
+    async def chunks():
+        for _ in range(3):
+            yield LARGE
+
+    return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+
+@pytest.fixture
+def middleware_client():
+    toy = Starlette(routes=[
+        Route("/large", _large),
+        Route("/small", _small),
+        Route("/binary", _binary),
+        Route("/stream", _stream),
+    ])
+    middleware = CompressionMiddleware(toy, minimum_size=1024)
+    return middleware, TestClient(middleware)
+
+
+@pytest.fixture
+def client():
+    sheet_cache.invalidate()
+    sheet_cache.set("CURRENCY", CURRENCY, version="c1")
+    yield TestClient(app)
+    sheet_cache.invalidate()
+
+
+class TestChooseEncoding:
+    def test_gzipのみ(self):
+        assert choose_encoding("gzip, deflate") == "gzip"
+
+    def test_q0は受け付けない(self):
+        assert choose_encoding("gzip;q=0, identity") is None
+        assert choose_encoding("") is None
+
+    def test_brotliがあればbrを優先する(self):
+        pytest.importorskip("brotli")
+        assert choose_encoding("gzip, br") == "br"
+
+
+class TestMiddleware:
+    def test_閾値以上をgzipで返す(self, middleware_client):
+        _, http = middleware_client
+        response = http.get("/large", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert int(response.headers["content-length"]) < len(LARGE)
+        assert response.text == LARGE
+
+    def test_閾値未満と非対応の型は圧縮しない(self, middleware_client):
+        _, http = middleware_client
+        for path in ("/small", "/binary"):
+            response = http.get(path, headers={"Accept-Encoding": "gzip"})
+            assert "content-encoding" not in response.headers
+
+    def test_圧縮しないレスポンスにもVaryを付ける(self, middleware_client):
+        _, http = middleware_client
+        for path, accept in (
+            ("/small", "gzip"),
+            ("/binary", "gzip"),
+            ("/stream", "gzip"),
+            ("/large", "identity"),
+        ):
+            response = http.get(path, headers={"Accept-Encoding": accept})
+            assert "content-encoding" not in response.headers
+            assert response.headers["vary"] == "Accept-Encoding"
+
+    def test_ETagが同じなら圧縮結果を再利用する(self, middleware_client):
+        middleware, http = middleware_client
+        first = http.get("/large", headers={"Accept-Encoding": "gzip"})
+        second = http.get("/large", headers={"Accept-Encoding": "gzip"})
+        assert middleware.cache_hits == 1
+        assert first.content == second.content
+
+    def test_ストリーミングはそのまま流す(self, middleware_client):
+        _, http = middleware_client
+        response = http.get("/stream", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+        assert response.text == LARGE * 3
+
+    def test_brotliで返す(self, middleware_client):
+        brotli = pytest.importorskip("brotli")
+        middleware, _ = middleware_client
+        assert brotli.decompress(middleware.compress(b"abc" * 100, "br")) == (
+            b"abc" * 100
+        )
+
+
+class TestApp:
+    def test_大きなJSONは圧縮して返す(self, client):
+        response = client.get("/api/currency", headers={"Accept-Encoding": "gzip"})
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert len(response.json()["data"]) == len(CURRENCY)
+
+    def test_小さなレスポンスは圧縮しない(self, client):
+        response = client.get("/health", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+
+    def test_304は圧縮しない(self, client):
+        etag = client.get("/api/currency").headers["etag"]
+        response = client.get(
+            "/api/currency",
+            headers={"Accept-Encoding": "gzip", "If-None-Match": etag},
+        )
+        assert response.status_code == 304
+        assert "content-encoding" not in response.headers
+
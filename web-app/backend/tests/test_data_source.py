@@ -0,0 +1,120 @@
+"""collector の SQLite DB を取得元にしたときのテスト"""
+
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from app.data_source import (
+    SheetsDataSource,
+    SqliteDataSource,
+    create_data_source,
+    set_data_source,
+)
+from app.sheets.cache import sheet_cache
+from app.sheets.currency import fetch_currency
+from app.sheets.dividend import fetch_dividend
+from app.sheets.performance import fetch_performance
+from app.sheets.portfolio import fetch_portfolio
+
+MIGRATIONS = (
+    Path(__file__).resolve().parents[3]
+    / "portfolio-dashboard" / "server" / "drizzle" / "migrations"
+)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "portfolio.db"
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    for migration in sorted(MIGRATIONS.glob("*.sql")):
+        conn.executescript(migration.read_text(encoding="utf-8"))
+    conn.executescript("""
+        INSERT INTO monthly_pnl (date, code, name, acquired_price, current_price,
+            shares, cost, value, profit, profit_rate, currency,
+            acquired_price_foreign, current_price_foreign,
+            acquired_exchange_rate, current_exchange_rate)
+        VALUES
+            ('2024-01-末', '7974', '任天堂', 8000, 8800, 100,
+             800000, 880000, 80000, 10, 'JPY', NULL, NULL, NULL, NULL),
+            ('2024-01-末', 'NVDA', 'NVIDIA', 15000, 18000, 10,
+             150000, 180000, 30000, 20, 'USD', 100, 110, 150, 160);
+        INSERT INTO holdings (code, name, acquired_date, acquired_price_jpy,
+            acquired_price_foreign, acquired_exchange_rate, shares, currency,
+            is_foreign)
+        VALUES ('NVDA', 'NVIDIA', '2023-12-01', 15000, 100, 150, 10, 'USD', 1);
+        INSERT INTO exchange_rates (date, pair, rate, change_rate, high, low)
+        VALUES ('2024-01-31', 'USD/JPY', 147.5, 0.5, 148, 146);
+        INSERT INTO dividends (date, code, name, dividend_foreign, shares,
+            total_foreign, currency, exchange_rate, total_jpy)
+        VALUES ('2024-03-15', 'NVDA', 'NVIDIA', 0.04, 10, 0.4, 'USD', 150, 60);
+        INSERT INTO benchmark_data (date, portfolio, nikkei225, sp500)
+        VALUES ('2024-01-末', 0, 0, 0), ('2024-02-末', 5, 10, NULL);
+    """)
+    conn.commit()
+    conn.close()
+    return path
+
+
+@pytest.fixture
+def source(db_path):
+    source = SqliteDataSource(db_path, pool_size=2)
+    set_data_source(source)
+    sheet_cache.invalidate()
+    yield source
+    sheet_cache.invalidate()
+    set_data_source(SheetsDataSource())
+    source.close()
+
+
+class TestSqliteDataSource:
+    def test_シートと同じ列名のレコードを返す(self, source):
+        snapshot = source.load_snapshot(["CURRENCY", "DATA_RECORD"])
+        assert snapshot["CURRENCY"] == [{
+            "取得日": "2024-01-31", "通貨ペア": "USD/JPY", "レート": 147.5,
+            "前回レート": None, "変動率(%)": 0.5, "最高値": 148.0,
+            "最安値": 146.0, "更新日時": None,
+        }]
+        assert snapshot["DATA_RECORD"] == []
+
+    def test_各フェッチャーが同じスキーマで返す(self, source):
+        performance = fetch_performance()
+        assert [r["code"] for r in performance] == ["7974", "NVDA"]
+        nvda = performance[1]
+        assert nvda["value"] == 180000.0
+        # (110 - 100) * 150 * 10, (160 - 150) * 110 * 10
+        assert (nvda["stockProfit"], nvda["fxProfit"]) == (15000.0, 11000.0)
+        assert performance[0]["fxProfit"] == 0.0
+
+        portfolio = fetch_portfolio()
+        assert portfolio[0]["totalCost"] == 150000.0
+        assert portfolio[0]["isForeign"] is True
+        assert fetch_currency()[0]["rate"] == 147.5
+        assert fetch_dividend()[0]["totalJpy"] == 60.0
+
+    def test_読み取り専用で開く(self, source):
+        with source._connection() as conn, pytest.raises(sqlite3.OperationalError):
+            conn.execute("DELETE FROM monthly_pnl")
+
+    def test_接続をプールして使い回す(self, source):
+        with source._connection() as first:
+            pass
+        with source._connection() as second:
+            assert second is first
+
+    def test_書き込みで更新日時が変わる(self, source, db_path):
+        before = source.last_update_time()
+        conn = sqlite3.connect(db_path)
+        conn.execute("UPDATE exchange_rates SET rate = 150")
+        conn.commit()
+        conn.close()
+        assert source.last_update_time() != before
+
+    def test_ベンチマークは累積リターンを指数値に換算する(self, source):
+        closes = source.monthly_closes(2024, 2)
+        assert closes == {(2024, 2): {"nikkei225": 110.0, "sp500": None}}
+
+    def test_未知の種類はエラー(self):
+        with pytest.raises(ValueError):
+            create_data_source("postgres")
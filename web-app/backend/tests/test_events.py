@@ -0,0 +1,165 @@
+"""損益スナップショット変更の SSE 配信のテスト"""
+
+import asyncio
+import json
+import threading
+from typing import cast
+
+import pytest
+from fastapi import Request
+
+from app.events import Broadcaster, broadcaster, format_sse, performance_diff
+from app.routers import stream
+from app.sheets.cache import sheet_cache
+
+
+def _record(date, code, value, profit=0.0):
+    return {
+        "date": date, "code": code, "name": code, "cost": 100.0,
+        "value": value, "profit": profit, "profitRate": profit,
+        "currency": "JPY", "stockProfit": profit, "fxProfit": 0.0,
+    }
+
+
+OLD = [
+    _record("2024-01-末", "A", 100.0),
+    _record("2024-01-末", "B", 100.0),
+]
+NEW = OLD + [
+    _record("2024-02-末", "A", 150.0, 50.0),
+    _record("2024-02-末", "C", 50.0),
+]
+
+
+def _parse(message: bytes) -> dict:
+    fields = dict(
+        line.split(": ", 1) for line in message.decode().strip().split("\n")
+    )
+    return {**fields, "data": json.loads(fields["data"])}
+
+
+@pytest.fixture(autouse=True)
+def _reset_cache():
+    sheet_cache.invalidate()
+    yield
+    sheet_cache.invalidate()
+
+
+class TestPerformanceDiff:
+    def test_KPI_構成比_新しい履歴点を返す(self):
+        diff = performance_diff(OLD, NEW)
+        assert diff["kpi"] == {
+            "totalValue": 200.0, "totalProfit": 50.0,
+            "profitRate": 25.0, "baseDate": "2024-02-末",
+        }
+        assert [a["name"] for a in diff["allocation"]] == ["A", "C"]
+        assert diff["removedAllocation"] == ["B"]
+        assert [(p["date"], p["code"]) for p in diff["history"]] == [
+            ("2024-02-末", "A"), ("2024-02-末", "C"),
+        ]
+        assert "cost" not in diff["history"][0]
+
+    def test_変化のない構成比の行は含めない(self):
+        changed = [OLD[0], {**OLD[1], "profit": 5.0}]
+        diff = performance_diff(OLD, changed)
+        assert diff["allocation"] == []
+        assert [p["code"] for p in diff["history"]] == ["B"]
+
+
+class TestBroadcaster:
+    def test_別スレッドからの発行を受け取る(self):
+        hub = Broadcaster()
+
+        async def scenario():
+            async with hub.subscribe() as queue:
+                assert len(hub) == 1
+                threading.Thread(target=hub.publish, args=(b"x",)).start()
+                return await asyncio.wait_for(queue.get(), 1)
+
+        assert asyncio.run(scenario()) == b"x"
+        assert len(hub) == 0
+
+    def test_キューが一杯なら古いものを捨てる(self):
+        hub = Broadcaster(queue_size=2)
+
+        async def scenario():
+            async with hub.subscribe() as queue:
+                for message in (b"1", b"2", b"3"):
+                    hub.publish(message)
+                await asyncio.sleep(0)
+                return [queue.get_nowait() for _ in range(queue.qsize())]
+
+        assert asyncio.run(scenario()) == [b"2", b"3"]
+
+
+class TestCacheWiring:
+    def test_PERFORMANCEの版が変わると差分を配信する(self):
+        async def scenario():
+            sheet_cache.set("PERFORMANCE", OLD, version="v1")
+            async with broadcaster.subscribe() as queue:
+                # 同じ版では通知しない
+                sheet_cache.set("PERFORMANCE", OLD, version="v1")
+                sheet_cache.set("PERFORMANCE", NEW, version="v2")
+                return await asyncio.wait_for(queue.get(), 1), queue.qsize()
+
+        message, remaining = asyncio.run(scenario())
+        event = _parse(message)
+        assert event["event"] == "performance"
+        assert event["id"] == "v2"
+        assert event["data"]["kpi"]["baseDate"] == "2024-02-末"
+        assert remaining == 0
+
+    def test_初回の格納では配信しない(self):
+        async def scenario():
+            async with broadcaster.subscribe() as queue:
+                sheet_cache.set("PERFORMANCE", NEW, version="v1")
+                await asyncio.sleep(0)
+                return queue.qsize()
+
+        assert asyncio.run(scenario()) == 0
+
+
+class _FakeRequest:
+    def __init__(self, polls: int) -> None:
+        self.polls = polls
+
+    async def is_disconnected(self) -> bool:
+        self.polls -= 1
+        return self.polls < 0
+
+
+def _request(polls: int) -> Request:
+    """polls 回の確認のあとに切断したとみなすリクエスト"""
+    return cast(Request, _FakeRequest(polls))
+
+
+class TestStreamEndpoint:
+    def test_retryのあとにイベントを送り切断で終わる(self):
+        async def scenario():
+            chunks = []
+            events = stream._events(_request(polls=1))
+            chunks.append(await anext(events))
+            pending = asyncio.ensure_future(anext(events))
+            await asyncio.sleep(0)
+            broadcaster.publish(format_sse("performance", {"kpi": {}}))
+            chunks.append(await asyncio.wait_for(pending, 1))
+            chunks.extend([chunk async for chunk in events])
+            return chunks
+
+        chunks = asyncio.run(scenario())
+        assert chunks[0] == b"retry: 5000\n\n"
+        assert _parse(chunks[1])["data"] == {"kpi": {}}
+        assert len(chunks) == 2
+        assert len(broadcaster) == 0
+
+    def test_無通信の間はkeepaliveを送る(self, monkeypatch):
+        monkeypatch.setattr(stream, "KEEPALIVE_INTERVAL", 0.01)
+
+        async def scenario():
+            events = stream._events(_request(polls=1))
+            await anext(events)
+            chunk = await anext(events)
+            await events.aclose()
+            return chunk
+
+        assert asyncio.run(scenario()) == b": keepalive\n\n"
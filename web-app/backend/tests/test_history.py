@@ -0,0 +1,92 @@
+"""/api/history の期間・ページング・項目指定のテスト"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.sheets.cache import sheet_cache
+from main import app
+
+
+def _record(date, code):
+    return {
+        "date": date,
+        "code": code,
+        "name": f"{code}社",
+        "cost": 100.0,
+        "value": 110.0,
+        "profit": 10.0,
+        "profitRate": 10.0,
+        "currency": "JPY",
+        "stockProfit": 10.0,
+        "fxProfit": 0.0,
+    }
+
+
+# シート上は日付順に並んでいないことがある
+RECORDS = [
+    _record("2024-03-末", "7974"),
+    _record("2024-01-末", "7974"),
+    _record("2024-01-末", "NVDA"),
+    _record("2024-02-末", "7974"),
+    _record("2024-02-末", "NVDA"),
+    _record("2024-03-末", "NVDA"),
+]
+
+
+@pytest.fixture
+def client():
+    sheet_cache.invalidate()
+    sheet_cache.set("PERFORMANCE", RECORDS, version="v1")
+    yield TestClient(app)
+    sheet_cache.invalidate()
+
+
+def _keys(body):
+    return [(p["date"], p["code"]) for p in body["data"]]
+
+
+class TestHistoryQuery:
+    def test_パラメータなしは全件を日付昇順で返す(self, client):
+        body = client.get("/api/history").json()
+        assert _keys(body) == [
+            ("2024-01-末", "7974"),
+            ("2024-01-末", "NVDA"),
+            ("2024-02-末", "7974"),
+            ("2024-02-末", "NVDA"),
+            ("2024-03-末", "7974"),
+            ("2024-03-末", "NVDA"),
+        ]
+        assert body["symbols"] == ["7974", "NVDA"]
+        assert body["nextCursor"] is None
+
+    def test_期間指定は両端の月を含む(self, client):
+        body = client.get("/api/history?start=2024-02&end=2024-02").json()
+        assert _keys(body) == [("2024-02-末", "7974"), ("2024-02-末", "NVDA")]
+
+    def test_銘柄と期間の組み合わせ(self, client):
+        body = client.get("/api/history?stock=NVDA&start=2024-02").json()
+        assert _keys(body) == [("2024-02-末", "NVDA"), ("2024-03-末", "NVDA")]
+        # 銘柄一覧は絞り込みに関係なく全銘柄
+        assert body["symbols"] == ["7974", "NVDA"]
+
+    def test_limitとcursorでページングする(self, client):
+        first = client.get("/api/history?limit=4").json()
+        assert len(first["data"]) == 4
+        assert first["nextCursor"] == "4"
+        second = client.get(f"/api/history?limit=4&cursor={first['nextCursor']}")
+        assert _keys(second.json()) == [
+            ("2024-03-末", "7974"),
+            ("2024-03-末", "NVDA"),
+        ]
+        assert second.json()["nextCursor"] is None
+
+    def test_fieldsで指定した項目だけを返す(self, client):
+        body = client.get("/api/history?fields=date,code,profit&limit=1").json()
+        assert body["data"] == [{"date": "2024-01-末", "code": "7974", "profit": 10.0}]
+
+    def test_未知のfieldsは400(self, client):
+        response = client.get("/api/history?fields=date,secret")
+        assert response.status_code == 400
+
+    def test_不正なcursorは400(self, client):
+        assert client.get("/api/history?cursor=abc").status_code == 400
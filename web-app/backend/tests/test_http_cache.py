@@ -0,0 +1,126 @@
+"""ETag / 304 条件付きリクエストのテスト（Sheets はキャッシュに直接投入）"""
+
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.sheets.cache import sheet_cache
+from main import app
+from tests.test_benchmark_store import _monthly_frame
+
+RECORDS = [
+    {
+        "date": "2024-01-31",
+        "code": "7974",
+        "name": "任天堂",
+        "cost": 100000.0,
+        "value": 110000.0,
+        "profit": 10000.0,
+        "profitRate": 10.0,
+        "currency": "JPY",
+        "stockProfit": 10000.0,
+        "fxProfit": 0.0,
+    },
+]
+
+
+@pytest.fixture
+def client():
+    sheet_cache.invalidate()
+    sheet_cache.set("PERFORMANCE", RECORDS, version="v1")
+    yield TestClient(app)
+    sheet_cache.invalidate()
+
+
+class TestSheetsETag:
+    def test_レスポンスにETagが付く(self, client):
+        response = client.get("/api/dashboard")
+        assert response.status_code == 200
+        assert response.headers["etag"].startswith('W/"')
+        assert response.headers["cache-control"] == "no-cache"
+
+    def test_ETagが一致すれば本体を作らず304を返す(self, client):
+        etag = client.get("/api/dashboard").headers["etag"]
+        with patch(
+            "app.routers.dashboard.get_performance_aggregates"
+        ) as get_aggregates:
+            response = client.get("/api/dashboard", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+        get_aggregates.assert_not_called()
+
+    def test_シートのバージョンが変わるとETagも変わる(self, client):
+        etag = client.get("/api/history").headers["etag"]
+        sheet_cache.set("PERFORMANCE", RECORDS * 2, version="v2")
+        response = client.get("/api/history", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+
+    def test_クエリが違えばETagも違う(self, client):
+        all_etag = client.get("/api/history").headers["etag"]
+        filtered_etag = client.get("/api/history?stock=7974").headers["etag"]
+        assert all_etag != filtered_etag
+
+
+class TestReportsETag:
+    def test_ファイル更新でETagが変わる(self, tmp_path):
+        report = tmp_path / "blog_draft_2024_01.md"
+        report.write_text("# 1月", encoding="utf-8")
+        with patch("app.reports._OUTPUT_DIR", tmp_path):
+            client = TestClient(app)
+            first = client.get("/api/reports/2024/1")
+            cached = client.get(
+                "/api/reports/2024/1",
+                headers={"If-None-Match": first.headers["etag"]},
+            )
+            report.write_text("# 1月（修正版）", encoding="utf-8")
+            updated = client.get(
+                "/api/reports/2024/1",
+                headers={"If-None-Match": first.headers["etag"]},
+            )
+        assert first.status_code == 200
+        assert cached.status_code == 304
+        assert updated.status_code == 200
+        assert updated.json()["content"] == "# 1月（修正版）"
+
+
+class TestBenchmarkETag:
+    def test_取得間隔内のETag計算では終値を取得しない(self, client, tmp_path):
+        frame = _monthly_frame(["2024-01"], [36000], [4800])
+        with (
+            patch("app.benchmark_store._DB_PATH", tmp_path / "benchmark.db"),
+            patch("app.benchmark_store._failed_at", None),
+            patch("yfinance.download", return_value=frame) as dl,
+        ):
+            etag = client.get("/api/benchmark").headers["etag"]
+            assert dl.call_count == 1
+            response = client.get("/api/benchmark", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert dl.call_count == 1
+
+    def test_304が続いても取得間隔を過ぎれば当月を取り足す(self, client, tmp_path):
+        with (
+            patch("app.benchmark_store._DB_PATH", tmp_path / "benchmark.db"),
+            patch("app.benchmark_store._failed_at", None),
+            patch(
+                "yfinance.download",
+                return_value=_monthly_frame(["2024-01"], [36000], [4800]),
+            ),
+        ):
+            etag = client.get("/api/benchmark").headers["etag"]
+
+        with (
+            patch("app.benchmark_store._DB_PATH", tmp_path / "benchmark.db"),
+            patch("app.benchmark_store._failed_at", None),
+            patch("app.benchmark_store.REFRESH_INTERVAL", 0),
+            patch(
+                "yfinance.download",
+                return_value=_monthly_frame(["2024-02"], [39000], [5000]),
+            ) as dl,
+        ):
+            response = client.get("/api/benchmark", headers={"If-None-Match": etag})
+        assert dl.call_count >= 1
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
@@ -0,0 +1,38 @@
+"""起動時のインポート時間のテスト（python -X importtime で計測）
+
+yfinance・pandas はベンチマーク取得時にだけ読み込む。
+起動（main のインポート）で読み込まれていないこと、起動時間が予算内に
+収まっていることを別プロセスで確認する。
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# shared/import_time.py をインポートするためのパス設定
+sys.path.insert(0, str(BACKEND_DIR.parent.parent / "shared"))
+from import_time import measure_import_time  # noqa: E402
+
+# main のインポートにかけてよい時間（マイクロ秒）。遅い CI では環境変数で広げる
+BUDGET_US = int(os.environ.get("IMPORT_TIME_BUDGET_US", 2_500_000))
+
+# 起動時に読み込んではいけない重いパッケージ
+LAZY_PACKAGES = ("yfinance", "pandas")
+
+
+@pytest.fixture(scope="module")
+def main_timings() -> dict[str, int]:
+    return measure_import_time("main", BACKEND_DIR)
+
+
+class TestImportTime:
+    @pytest.mark.parametrize("package", LAZY_PACKAGES)
+    def test_起動時に重いパッケージを読み込まない(self, main_timings, package):
+        assert package not in main_timings
+
+    def test_起動時間が予算内(self, main_timings):
+        assert main_timings["main"] < BUDGET_US
@@ -0,0 +1,102 @@
+"""計測ミドルウェア・/metrics・Server-Timing のテスト"""
+
+import re
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.metrics import Histogram, metrics, server_timing, timed
+from app.sheets import client as sheets_client
+from app.sheets.cache import sheet_cache
+from main import app
+from tests.test_snapshot import FakeSpreadsheet
+
+
+@pytest.fixture
+def client():
+    metrics.reset()
+    sheet_cache.invalidate()
+    yield TestClient(app)
+    metrics.reset()
+    sheet_cache.invalidate()
+
+
+class TestHistogram:
+    def test_バケットは累積件数で上限を含む(self):
+        histogram = Histogram(buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value)
+        assert histogram.cumulative() == [("0.1", 2), ("1.0", 3), ("+Inf", 4)]
+        assert histogram.count == 4
+        assert histogram.sum == pytest.approx(3.65)
+
+
+class TestTimed:
+    def test_成功と失敗を分けて数える(self, client):
+        with timed("sheets", "values_batch_get"):
+            pass
+        with pytest.raises(OSError), timed("sheets", "values_batch_get"):
+            raise OSError("quota")
+        text = metrics.render()
+        assert (
+            'upstream_calls_total{service="sheets",operation="values_batch_get",'
+            'outcome="ok"} 1'
+        ) in text
+        assert (
+            'upstream_calls_total{service="sheets",operation="values_batch_get",'
+            'outcome="error"} 1'
+        ) in text
+
+    def test_Server_Timingの書式(self):
+        header = server_timing(0.0123, {"sheets": [2, 0.01]})
+        assert header == 'app;dur=12.3, sheets;dur=10.0;desc="2 calls"'
+
+
+class TestMiddleware:
+    def test_ルートのテンプレートごとにレイテンシを記録する(self, client):
+        client.get("/health")
+        client.get("/health")
+        client.get("/no-such-path")
+        text = client.get("/metrics").text
+        assert (
+            'http_request_duration_seconds_count{method="GET",route="/health"} 2'
+            in text
+        )
+        assert (
+            'http_requests_total{method="GET",route="unmatched",status="404"} 1'
+            in text
+        )
+        assert re.search(
+            r'http_request_duration_seconds_bucket\{method="GET",'
+            r'route="/health",le="\+Inf"\} 2',
+            text,
+        )
+
+    def test_全レスポンスにServer_Timingを付ける(self, client):
+        response = client.get("/health")
+        assert re.fullmatch(r"app;dur=\d+\.\d", response.headers["server-timing"])
+
+    def test_Sheets呼び出しの回数と時間を載せる(self, client):
+        spreadsheet = FakeSpreadsheet({
+            "為替レート": [["取得日", "通貨ペア", "レート"],
+                       ["2024-01-31", "USD/JPY", "147.5"]],
+        })
+        sheets_client._worksheet_titles.cache_clear()
+        with patch("app.sheets.client.get_spreadsheet", return_value=spreadsheet):
+            response = client.get("/api/currency")
+        sheets_client._worksheet_titles.cache_clear()
+
+        assert response.status_code == 200
+        # worksheets() と values_batch_get() の 2 回
+        assert "sheets;dur=" in response.headers["server-timing"]
+        assert 'desc="2 calls"' in response.headers["server-timing"]
+        text = client.get("/metrics").text
+        assert 'route="/api/currency"' in text
+        assert 'sheet_cache_events_total{result="miss"}' in text
+
+    def test_metricsはPrometheusのテキスト形式(self, client):
+        response = client.get("/metrics")
+        assert response.headers["content-type"].startswith("text/plain")
+        assert "# TYPE http_request_duration_seconds histogram" in response.text
+        assert "# TYPE sheet_cache_entries gauge" in response.text
@@ -0,0 +1,70 @@
+"""PerformanceFrame（列指向の月次損益データ）のテスト"""
+
+import pytest
+
+from app.sheets.performance import PerformanceFrame
+
+
+def _record(date, code, value, cost, currency="JPY"):
+    return {
+        "date": date,
+        "code": code,
+        "name": f"{code}社",
+        "value": value,
+        "cost": cost,
+        "profit": value - cost,
+        "profitRate": 0.0,
+        "currency": currency,
+    }
+
+
+RECORDS = [
+    _record("2024-02-29", "NVDA", 180000.0, 150000.0, "USD"),
+    _record("2024-01-31", "7974", 110000.0, 100000.0),
+    _record("2024-01-31", "NVDA", 200000.0, 150000.0, "USD"),
+    _record("2024-02-29", "7974", 120000.0, 100000.0),
+]
+
+
+@pytest.fixture
+def frame() -> PerformanceFrame:
+    return PerformanceFrame.from_records(RECORDS)
+
+
+class TestPerformanceFrame:
+    def test_空データ(self):
+        empty = PerformanceFrame.from_records([])
+        assert len(empty) == 0
+        assert empty.latest_date == ""
+        assert empty.symbols == []
+        assert empty.group_by_month() == {}
+        assert empty.group_by_currency() == {}
+
+    def test_月別集計は日付昇順(self, frame):
+        monthly = frame.group_by_month()
+        assert list(monthly) == ["2024-01-31", "2024-02-29"]
+        assert monthly["2024-01-31"] == {
+            "value": 310000.0,
+            "cost": 250000.0,
+            "profit": 60000.0,
+        }
+
+    def test_最新月の行は元の並び順(self, frame):
+        assert frame.latest_date == "2024-02-29"
+        assert frame.latest_rows().tolist() == [0, 3]
+
+    def test_通貨別集計は指定行だけ(self, frame):
+        totals = frame.group_by_currency(frame.latest_rows())
+        assert totals == {
+            "JPY": {"value": 120000.0, "cost": 100000.0},
+            "USD": {"value": 180000.0, "cost": 150000.0},
+        }
+
+    def test_銘柄コードで行を選ぶ(self, frame):
+        assert frame.symbols == ["7974", "NVDA"]
+        rows = frame.rows_for_code("NVDA")
+        assert [r["date"] for r in frame.to_records(rows)] == [
+            "2024-02-29",
+            "2024-01-31",
+        ]
+        assert frame.rows_for_code("AAPL").tolist() == []
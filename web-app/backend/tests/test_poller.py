@@ -0,0 +1,106 @@
+"""シート変更ポーリングのテスト（Sheets はフェイクで代替）"""
+
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+import app.sheets.currency  # noqa: F401  パーサー登録のため
+import app.sheets.dividend  # noqa: F401
+import app.sheets.performance  # noqa: F401
+import app.sheets.portfolio  # noqa: F401
+from app.sheets import client
+from app.sheets.cache import sheet_cache
+from app.sheets.poller import SheetPoller
+
+
+def _cached(key: str) -> list[dict]:
+    value = sheet_cache.peek(key)
+    assert value is not None
+    return value
+
+
+class FakeSpreadsheet:
+    def __init__(self) -> None:
+        self.modified = "2024-01-31T00:00:00Z"
+        self.batch_calls = 0
+        self.values = {
+            "損益レポート": [
+                ["日付", "銘柄コード", "評価額"],
+                ["2024-01-31", "7974", "100"],
+            ],
+            "為替レート": [
+                ["取得日", "通貨ペア", "レート"],
+                ["2024-01-31", "USD/JPY", "147"],
+            ],
+        }
+
+    def worksheets(self):
+        return [SimpleNamespace(title=t) for t in self.values]
+
+    def get_lastUpdateTime(self):
+        return self.modified
+
+    def values_batch_get(self, ranges, params=None):
+        self.batch_calls += 1
+        return {
+            "valueRanges": [
+                {"values": self.values[a1.split("!")[0].strip("'")]} for a1 in ranges
+            ]
+        }
+
+
+@pytest.fixture
+def spreadsheet():
+    fake = FakeSpreadsheet()
+    sheet_cache.invalidate()
+    client._worksheet_titles.cache_clear()
+    with patch("app.sheets.client.get_spreadsheet", return_value=fake):
+        yield fake
+    sheet_cache.invalidate()
+    client._worksheet_titles.cache_clear()
+
+
+class TestSheetPoller:
+    def test_初回は全シートを取り込む(self, spreadsheet):
+        changed = SheetPoller(interval=60).poll_once()
+        assert set(changed) == {"PERFORMANCE", "PORTFOLIO", "CURRENCY", "DIVIDEND"}
+        assert spreadsheet.batch_calls == 1
+        assert _cached("CURRENCY")[0]["rate"] == 147.0
+
+    def test_更新日時が同じならシート本体を読まない(self, spreadsheet):
+        poller = SheetPoller(interval=60)
+        poller.poll_once()
+        assert poller.poll_once() == []
+        assert spreadsheet.batch_calls == 1
+
+    def test_内容が変わったシートだけ差し替える(self, spreadsheet):
+        poller = SheetPoller(interval=60)
+        poller.poll_once()
+        performance_before = sheet_cache.peek("PERFORMANCE")
+        currency_version = sheet_cache.version("CURRENCY")
+
+        spreadsheet.modified = "2024-02-01T00:00:00Z"
+        spreadsheet.values["為替レート"].append(["2024-02-01", "USD/JPY", "149"])
+        changed = poller.poll_once()
+
+        assert changed == ["CURRENCY"]
+        assert spreadsheet.batch_calls == 2
+        assert sheet_cache.peek("PERFORMANCE") is performance_before
+        assert sheet_cache.version("CURRENCY") != currency_version
+        assert len(_cached("CURRENCY")) == 2
+
+    def test_起動後に追加されたシートも更新日時の変化で取り込む(self, spreadsheet):
+        poller = SheetPoller(interval=60)
+        poller.poll_once()
+        assert sheet_cache.peek("DIVIDEND") == []
+
+        spreadsheet.modified = "2024-02-01T00:00:00Z"
+        spreadsheet.values["配当・分配金"] = [
+            ["受取日", "銘柄コード", "銘柄名", "配当合計（円）"],
+            ["2024-01-31", "7974", "任天堂", "5000"],
+        ]
+        changed = poller.poll_once()
+
+        assert changed == ["DIVIDEND"]
+        assert [d["code"] for d in _cached("DIVIDEND")] == ["7974"]
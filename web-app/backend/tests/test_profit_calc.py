@@ -1,12 +1,16 @@
 """
 損益分離計算ロジックのユニットテスト。
 
-performance.py から calc_profit を直接インポートして検証する。
+performance.py から calc_profit / calc_profit_batch を直接インポートして検証する。
 """
 
+import random
+
+import numpy as np
 import pytest
 
 from app.sheets.performance import calc_profit as _calc_profit
+from app.sheets.performance import calc_profit_batch
 
 
 class TestJpyStockProfitCalc:
@@ -134,3 +138,71 @@ class TestForeignDataMissing:
         )
         assert stock == 10000
         assert fx == 0.0
+
+
+def _reference_calc_profit(
+    profit, shares, currency, acq_price, cur_price, acq_rate, cur_rate
+):
+    """ベクトル化前の 1 行ずつの計算式（比較用）"""
+    if currency == "JPY" or None in (acq_price, cur_price, acq_rate, cur_rate):
+        return profit, 0.0
+    stock = (cur_price - acq_price) * acq_rate * shares
+    fx = (cur_rate - acq_rate) * cur_price * shares
+    return stock, fx
+
+
+class TestCalcProfitBatch:
+    """calc_profit_batch がランダムな入力で 1 行ずつの計算と一致すること"""
+
+    @staticmethod
+    def _random_rows(seed: int, n: int) -> list[tuple]:
+        rng = random.Random(seed)
+
+        def maybe_missing(value: float) -> float | None:
+            return None if rng.random() < 0.15 else value
+
+        rows = []
+        for _ in range(n):
+            rows.append((
+                rng.uniform(-1e6, 1e6),
+                float(rng.randint(0, 1000)),
+                rng.choice(["JPY", "USD", "HKD"]),
+                maybe_missing(rng.uniform(1, 1000)),
+                maybe_missing(rng.uniform(1, 1000)),
+                maybe_missing(rng.uniform(5, 200)),
+                maybe_missing(rng.uniform(5, 200)),
+            ))
+        return rows
+
+    @pytest.mark.parametrize("seed", range(20))
+    def test_ランダム入力で1行ずつの計算と一致する(self, seed):
+        rows = self._random_rows(seed, 200)
+        columns = list(zip(*rows, strict=True))
+
+        def floats(values):
+            return np.array(
+                [np.nan if v is None else v for v in values], dtype=np.float64
+            )
+
+        stock, fx = calc_profit_batch(
+            floats(columns[0]),
+            floats(columns[1]),
+            np.array(columns[2]),
+            floats(columns[3]),
+            floats(columns[4]),
+            floats(columns[5]),
+            floats(columns[6]),
+        )
+        for i, row in enumerate(rows):
+            expected_stock, expected_fx = _reference_calc_profit(*row)
+            assert stock[i] == expected_stock
+            assert fx[i] == expected_fx
+            assert _calc_profit(*row) == (expected_stock, expected_fx)
+
+    def test_空配列(self):
+        empty = np.array([], dtype=np.float64)
+        stock, fx = calc_profit_batch(
+            empty, empty, np.array([], dtype=np.str_), empty, empty, empty, empty
+        )
+        assert stock.shape == (0,)
+        assert fx.shape == (0,)
@@ -0,0 +1,183 @@
+"""Sheets 呼び出しのクォータ予算・再試行・集約のテスト"""
+
+import threading
+import time
+from types import SimpleNamespace
+from typing import cast
+from unittest.mock import patch
+
+import pytest
+import requests
+from gspread.exceptions import APIError
+
+from app.sheets import client
+from app.sheets.quota import (
+    QuotaExceededError,
+    QuotaGuard,
+    TokenBucket,
+    is_retryable,
+)
+from tests.test_snapshot import FakeSpreadsheet
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.slept: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+def _api_error(status: int) -> APIError:
+    response = SimpleNamespace(
+        status_code=status,
+        json=lambda: {"error": {"code": status, "message": "err", "status": ""}},
+        text="",
+    )
+    return APIError(cast(requests.Response, response))
+
+
+def _guard(per_minute: float = 60, **kwargs) -> tuple[QuotaGuard, FakeClock]:
+    clock = FakeClock()
+    guard = QuotaGuard(
+        per_minute, clock=clock, sleep=clock.sleep, rand=lambda: 1.0, **kwargs
+    )
+    return guard, clock
+
+
+class TestTokenBucket:
+    def test_容量まで取れて時間で補充される(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=1.0, capacity=2, clock=clock, sleep=clock.sleep)
+        assert bucket.acquire()
+        assert bucket.acquire()
+        assert not bucket.acquire()
+        clock.now += 1.0
+        assert bucket.acquire()
+
+    def test_期限内に補充されるなら待って取る(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=0.5, capacity=1, clock=clock, sleep=clock.sleep)
+        bucket.acquire()
+        assert not bucket.acquire(timeout=1.0)
+        assert bucket.acquire(timeout=2.0)
+        assert clock.slept == [2.0]
+
+
+class TestIsRetryable:
+    def test_429と5xxと接続エラーは再試行する(self):
+        assert is_retryable(_api_error(429))
+        assert is_retryable(_api_error(503))
+        assert is_retryable(requests.ConnectionError())
+        assert not is_retryable(_api_error(403))
+        assert not is_retryable(ValueError())
+
+
+class TestQuotaGuard:
+    def test_429をバックオフして再試行する(self):
+        guard, clock = _guard()
+        outcomes = [_api_error(429), _api_error(500), "ok"]
+
+        def fn():
+            outcome = outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        assert guard.call("k", fn) == "ok"
+        # rand=1.0 なので base * 2^attempt そのまま
+        assert clock.slept == [0.5, 1.0]
+        assert guard.stats()["retries"] == 2
+
+    def test_バックオフは上限で頭打ちになる(self):
+        guard, _ = _guard()
+        assert guard.backoff(10) == 16.0
+
+    def test_再試行しないエラーはそのまま送出する(self):
+        guard, _ = _guard()
+
+        def not_found():
+            raise _api_error(404)
+
+        with pytest.raises(APIError):
+            guard.call("k", not_found)
+        assert guard.stats()["retries"] == 0
+
+    def test_再試行を使い切ったら前回の結果を返す(self):
+        guard, _ = _guard(max_retries=1)
+        guard.call("k", lambda: "previous")
+
+        def failing():
+            raise _api_error(503)
+
+        assert guard.call("k", failing) == "previous"
+        assert guard.stats()["fallbacks"] == 1
+        with pytest.raises(APIError):
+            guard.call("other", failing)
+
+    def test_予算切れなら前回の結果を返す(self):
+        guard, _ = _guard(per_minute=1, wait=0)
+        assert guard.call("k", lambda: 1) == 1
+        assert guard.call("k", lambda: 2) == 1
+        assert guard.stats()["rejected"] == 1
+        with pytest.raises(QuotaExceededError):
+            guard.call("other", lambda: 3)
+
+    def test_同時の同じ呼び出しは1回にまとめる(self):
+        guard = QuotaGuard(0)
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def slow():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return "shared"
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(guard.call("k", slow)))
+        leader.start()
+        started.wait(5)
+        followers = [
+            threading.Thread(target=lambda: results.append(guard.call("k", slow)))
+            for _ in range(3)
+        ]
+        for t in followers:
+            t.start()
+        while guard.stats()["coalesced"] < 3:
+            time.sleep(0.001)
+        release.set()
+        for t in [leader, *followers]:
+            t.join(5)
+        assert results == ["shared"] * 4
+        assert len(calls) == 1
+
+
+class TestClient:
+    def test_一括取得の429を再試行してから読む(self):
+        spreadsheet = FakeSpreadsheet({"為替レート": [["取得日"], ["2024-01-01"]]})
+        original = spreadsheet.values_batch_get
+        errors = [_api_error(429)]
+
+        def flaky(ranges, params=None):
+            if errors:
+                raise errors.pop()
+            return original(ranges, params)
+
+        guard, clock = _guard()
+        client._worksheet_titles.cache_clear()
+        with (
+            patch("app.sheets.client.get_spreadsheet", return_value=spreadsheet),
+            patch("app.sheets.client.sheets_quota", guard),
+            patch.object(spreadsheet, "values_batch_get", flaky),
+        ):
+            snapshot = client.load_snapshot(["CURRENCY"])
+        client._worksheet_titles.cache_clear()
+        assert snapshot["CURRENCY"] == [{"取得日": "2024-01-01"}]
+        assert clock.slept == [0.5]
@@ -0,0 +1,106 @@
+"""レポート一覧の索引と本文キャッシュのテスト"""
+
+import os
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import reports
+from main import app
+
+
+@pytest.fixture
+def output_dir(tmp_path):
+    reports.clear_cache()
+    with patch("app.reports._OUTPUT_DIR", tmp_path):
+        yield tmp_path
+    reports.clear_cache()
+
+
+def _write(directory: Path, name: str, text: str) -> Path:
+    path = directory / name
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def _bump_mtime(path: Path) -> None:
+    """同じ時刻の更新でも変化が検知されるように mtime を進める"""
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+
+class TestIndex:
+    def test_一覧は降順で対象外のファイルを含まない(self, output_dir):
+        _write(output_dir, "blog_draft_2024_01.md", "1")
+        _write(output_dir, "blog_draft_2024_02.md", "2")
+        _write(output_dir, "notes.md", "x")
+        assert [r["filename"] for r in reports.list_reports()] == [
+            "blog_draft_2024_02.md",
+            "blog_draft_2024_01.md",
+        ]
+
+    def test_ディレクトリが変わらなければ走査しない(self, output_dir):
+        _write(output_dir, "blog_draft_2024_01.md", "1")
+        reports.list_reports()
+        with patch("app.reports._scan") as scan:
+            reports.list_reports()
+            reports.reports_version()
+        scan.assert_not_called()
+
+    def test_ファイルの追加で作り直す(self, output_dir):
+        _write(output_dir, "blog_draft_2024_01.md", "1")
+        version = reports.reports_version()
+        _write(output_dir, "blog_draft_2024_02.md", "2")
+        _bump_mtime(output_dir)
+        assert len(reports.list_reports()) == 2
+        assert reports.reports_version() != version
+
+    def test_ディレクトリがなければ空(self, tmp_path):
+        with patch("app.reports._OUTPUT_DIR", tmp_path / "missing"):
+            assert reports.list_reports() == []
+            assert reports.reports_version() == ""
+
+
+class TestContent:
+    def test_変わらないファイルは読み直さない(self, output_dir):
+        _write(output_dir, "blog_draft_2024_01.md", "# 1月")
+        assert reports.read_report(2024, 1) == "# 1月"
+        with patch.object(Path, "read_text") as read_text:
+            assert reports.read_report(2024, 1) == "# 1月"
+        read_text.assert_not_called()
+
+    def test_更新されたファイルは読み直す(self, output_dir):
+        path = _write(output_dir, "blog_draft_2024_01.md", "# 1月")
+        reports.read_report(2024, 1)
+        path.write_text("# 1月（修正版）", encoding="utf-8")
+        _bump_mtime(path)
+        assert reports.read_report(2024, 1) == "# 1月（修正版）"
+
+    def test_存在しなければNone(self, output_dir):
+        assert reports.read_report(2024, 1) is None
+
+    def test_HTMLは1回だけ変換する(self, output_dir):
+        markdown = pytest.importorskip("markdown")
+        _write(output_dir, "blog_draft_2024_01.md", "# 1月\n\n| a |\n|---|\n| 1 |")
+        with patch.object(markdown, "markdown", wraps=markdown.markdown) as convert:
+            first = reports.read_report_html(2024, 1)
+            second = reports.read_report_html(2024, 1)
+        assert convert.call_count == 1
+        assert first == second
+        assert first is not None
+        assert "<h1>1月</h1>" in first
+        assert "<table>" in first
+
+
+class TestRouter:
+    def test_htmlクエリでHTMLも返す(self, output_dir):
+        pytest.importorskip("markdown")
+        _write(output_dir, "blog_draft_2024_01.md", "# 1月")
+        client = TestClient(app)
+        plain = client.get("/api/reports/2024/1").json()
+        rendered = client.get("/api/reports/2024/1?html=true").json()
+        assert plain["html"] is None
+        assert rendered["html"] == "<h1>1月</h1>"
+        assert rendered["content"] == "# 1月"
@@ -0,0 +1,104 @@
+"""values_batch_get による一括読み込みのテスト（Sheets はフェイクで代替）"""
+
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from app.sheets import client, snapshot
+from app.sheets.cache import sheet_cache
+from app.sheets.currency import fetch_currency
+from app.sheets.dividend import fetch_dividend
+from app.sheets.performance import fetch_performance
+from app.sheets.portfolio import fetch_portfolio
+
+
+class FakeSpreadsheet:
+    """worksheets() と values_batch_get() だけを持つスプレッドシートの代替"""
+
+    def __init__(self, values: dict[str, list[list]]) -> None:
+        self.values = values
+        self.batch_calls: list[list[str]] = []
+
+    def worksheets(self):
+        return [SimpleNamespace(title=t) for t in self.values]
+
+    def values_batch_get(self, ranges, params=None):
+        self.batch_calls.append(ranges)
+        value_ranges = []
+        for a1 in ranges:
+            title = a1.split("!")[0].strip("'")
+            value_ranges.append({"range": a1, "values": self.values[title]})
+        return {"valueRanges": value_ranges}
+
+
+@pytest.fixture
+def fake_spreadsheet():
+    spreadsheet = FakeSpreadsheet({
+        "ポートフォリオ": [
+            ["銘柄コード", "銘柄名", "取得日", "取得単価（円）", "取得単価（外貨）",
+             "取得時為替レート", "保有株数", "取得額合計", "通貨", "外国株フラグ"],
+            ["7974", "任天堂", "2024-01-10", "8,000", "", "", "100", "800,000",
+             "JPY", ""],
+        ],
+        "損益レポート": [
+            ["日付", "銘柄コード", "銘柄名", "取得額", "評価額", "損益",
+             "損益率(%)", "保有株数", "通貨"],
+            ["2024-01-31", "7974", "任天堂", "800,000", "880,000", "80,000",
+             "10", "100", "JPY"],
+            # 末尾の空セルは API が返さない
+            ["2024-02-29", "7974", "任天堂", "800,000", "900,000", "100,000"],
+        ],
+        "為替レート": [
+            ["取得日", "通貨ペア", "レート"],
+            ["2024-01-31", "USD/JPY", "147.5"],
+        ],
+    })
+    sheet_cache.invalidate()
+    client._worksheet_titles.cache_clear()
+    with patch("app.sheets.client.get_spreadsheet", return_value=spreadsheet):
+        yield spreadsheet
+    sheet_cache.invalidate()
+    client._worksheet_titles.cache_clear()
+
+
+class TestRowsToRecords:
+    def test_ヘッダーをキーにした辞書に変換する(self):
+        records = client.rows_to_records([["a", "b"], ["1", "2"]])
+        assert records == [{"a": "1", "b": "2"}]
+
+    def test_短い行は空文字で埋める(self):
+        records = client.rows_to_records([["a", "b", "c"], ["1"]])
+        assert records == [{"a": "1", "b": "", "c": ""}]
+
+    def test_空のシートは空リスト(self):
+        assert client.rows_to_records([]) == []
+
+
+class TestLoadSnapshot:
+    def test_存在しないシートは空リストで_batch_getの範囲に含めない(
+        self, fake_spreadsheet
+    ):
+        snapshot = client.load_snapshot(["PORTFOLIO", "DIVIDEND"])
+        assert snapshot["DIVIDEND"] == []
+        assert len(snapshot["PORTFOLIO"]) == 1
+        assert fake_spreadsheet.batch_calls == [["'ポートフォリオ'!A1:L"]]
+
+
+class TestBatchedFetchers:
+    def test_全フェッチャーが1回のbatch_getを共有する(self, fake_spreadsheet):
+        performance = fetch_performance()
+        portfolio = fetch_portfolio()
+        currency = fetch_currency()
+        dividend = fetch_dividend()
+
+        assert len(fake_spreadsheet.batch_calls) == 1
+        assert [r["value"] for r in performance] == [880000.0, 900000.0]
+        assert performance[1]["profitRate"] == 0.0
+        assert portfolio[0]["totalCost"] == 800000.0
+        assert currency[0]["rate"] == 147.5
+        assert dividend == []
+
+    def test_パーサー未登録のシートは分かるエラーにする(self, fake_spreadsheet):
+        with pytest.raises(ValueError, match="UNKNOWN"):
+            snapshot.load_sheet("UNKNOWN")
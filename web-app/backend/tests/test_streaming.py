@@ -0,0 +1,82 @@
+"""NDJSON ストリーミングと orjson レスポンスのテスト"""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.sheets.cache import sheet_cache
+from main import app
+
+CURRENCY = [
+    {"date": f"2024-{m:02d}-末", "pair": "USD/JPY", "rate": 140.0 + m,
+     "changeRate": None, "high": None, "low": None}
+    for m in range(1, 4)
+]
+
+PERFORMANCE = [
+    {"date": f"2024-{m:02d}-末", "code": "NVDA", "name": "NVIDIA", "cost": 100.0,
+     "value": 100.0 + m, "profit": float(m), "profitRate": float(m),
+     "currency": "USD", "stockProfit": float(m), "fxProfit": 0.0}
+    for m in range(1, 4)
+]
+
+
+@pytest.fixture
+def client():
+    sheet_cache.invalidate()
+    sheet_cache.set("CURRENCY", CURRENCY, version="c1")
+    sheet_cache.set("PERFORMANCE", PERFORMANCE, version="p1")
+    sheet_cache.set("DIVIDEND", [], version="d1")
+    yield TestClient(app)
+    sheet_cache.invalidate()
+
+
+def _lines(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+class TestNdjson:
+    def test_formatクエリでNDJSONを返す(self, client):
+        response = client.get("/api/currency?format=ndjson")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert _lines(response) == CURRENCY
+
+    def test_AcceptヘッダーでNDJSONを返す(self, client):
+        response = client.get(
+            "/api/currency", headers={"Accept": "application/x-ndjson"}
+        )
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert len(_lines(response)) == 3
+
+    def test_ETagを引き継ぎJSONとは別の値になる(self, client):
+        json_etag = client.get("/api/currency").headers["etag"]
+        ndjson = client.get(
+            "/api/currency", headers={"Accept": "application/x-ndjson"}
+        )
+        assert ndjson.headers["etag"] != json_etag
+        assert ndjson.headers["vary"] == "Accept, Accept-Encoding"
+
+    def test_historyはスキーマの項目だけを送り次ページはヘッダー(self, client):
+        response = client.get("/api/history?format=ndjson&limit=2")
+        rows = _lines(response)
+        assert len(rows) == 2
+        assert "cost" not in rows[0]
+        assert rows[0]["date"] == "2024-01-末"
+        assert response.headers["x-next-cursor"] == "2"
+
+    def test_空データは空の本文(self, client):
+        response = client.get("/api/dividend?format=ndjson")
+        assert response.status_code == 200
+        assert response.text == ""
+
+    def test_不正なformatは422(self, client):
+        assert client.get("/api/currency?format=csv").status_code == 422
+
+
+class TestOrjsonDefault:
+    def test_通常のJSONレスポンスは変わらない(self, client):
+        body = client.get("/api/currency").json()
+        assert body["data"] == CURRENCY
+        assert body["latestRate"] == 143.0